@@ -0,0 +1,29 @@
+"""add knowledge_version counter
+
+Revision ID: 0003_knowledge_version
+Revises: 0002_knowledge_fts
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+# isort: skip_file
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_knowledge_version"
+down_revision = "0002_knowledge_fts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "knowledge_version",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+    )
+    op.execute("INSERT INTO knowledge_version (id, version) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    op.drop_table("knowledge_version")
@@ -0,0 +1,37 @@
+"""add knowledge_embeddings
+
+Revision ID: 0004_knowledge_embeddings
+Revises: 0003_knowledge_version
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+# isort: skip_file
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_knowledge_embeddings"
+down_revision = "0003_knowledge_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "knowledge_embeddings",
+        sa.Column(
+            "item_id",
+            sa.Integer(),
+            sa.ForeignKey("knowledge_items.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("model", sa.String(length=100), nullable=False),
+        sa.Column("dim", sa.Integer(), nullable=False),
+        sa.Column("vector", sa.LargeBinary(), nullable=False),
+    )
+    op.create_index("ix_knowledge_embeddings_model", "knowledge_embeddings", ["model"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_knowledge_embeddings_model", table_name="knowledge_embeddings")
+    op.drop_table("knowledge_embeddings")
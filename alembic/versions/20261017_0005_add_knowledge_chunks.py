@@ -0,0 +1,130 @@
+"""add knowledge_chunks and chunk FTS5
+
+Revision ID: 0005_knowledge_chunks
+Revises: 0004_knowledge_embeddings
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+# isort: skip_file
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_knowledge_chunks"
+down_revision = "0004_knowledge_embeddings"
+branch_labels = None
+depends_on = None
+
+# Passage size at this revision. The splitter below is a copy of
+# backend.app.services.chunking.split_passages as of this revision, so later changes to the
+# app's settings or chunking code do not change what this migration writes.
+_CHUNK_CHARS = 500
+_CHUNK_OVERLAP_CHARS = 100
+
+
+def _split_passages(text: str, max_chars: int, overlap_chars: int) -> list[str]:
+    words = text.split()
+    passages: list[str] = []
+    start = 0
+    while start < len(words):
+        end = start + 1
+        length = len(words[start])
+        while end < len(words) and length + 1 + len(words[end]) <= max_chars:
+            length += 1 + len(words[end])
+            end += 1
+        passages.append(" ".join(words[start:end]))
+        if end == len(words):
+            break
+        back = end
+        carried = 0
+        while back > start + 1 and carried + 1 + len(words[back - 1]) <= overlap_chars:
+            back -= 1
+            carried += 1 + len(words[back])
+        start = back
+    return passages
+
+
+def upgrade() -> None:
+    op.create_table(
+        "knowledge_chunks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "item_id",
+            sa.Integer(),
+            sa.ForeignKey("knowledge_items.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+    )
+    op.create_index("ix_knowledge_chunks_item_id", "knowledge_chunks", ["item_id"])
+
+    # Standalone FTS5 table: title/tags come from the parent item, which the chunk row lacks.
+    # Chunks are rewritten whenever their item's title, tags or content change.
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_chunks_fts USING fts5(
+            title, content, tags
+        );
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS knowledge_chunks_ai AFTER INSERT ON knowledge_chunks BEGIN
+            INSERT INTO knowledge_chunks_fts(rowid, title, content, tags)
+            SELECT new.id, ki.title, new.content, ki.tags
+            FROM knowledge_items ki WHERE ki.id = new.item_id;
+        END;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS knowledge_chunks_ad AFTER DELETE ON knowledge_chunks BEGIN
+            DELETE FROM knowledge_chunks_fts WHERE rowid = old.id;
+        END;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS knowledge_chunks_au AFTER UPDATE ON knowledge_chunks BEGIN
+            DELETE FROM knowledge_chunks_fts WHERE rowid = old.id;
+            INSERT INTO knowledge_chunks_fts(rowid, title, content, tags)
+            SELECT new.id, ki.title, new.content, ki.tags
+            FROM knowledge_items ki WHERE ki.id = new.item_id;
+        END;
+        """
+    )
+
+    _backfill_chunks()
+
+
+def _backfill_chunks() -> None:
+    # Items stored before this revision need passages, or chunk retrieval finds nothing.
+    # The insert trigger above indexes each chunk in knowledge_chunks_fts.
+    bind = op.get_bind()
+    items = sa.table(
+        "knowledge_items", sa.column("id"), sa.column("content")
+    )
+    chunks = sa.table(
+        "knowledge_chunks", sa.column("item_id"), sa.column("position"), sa.column("content")
+    )
+    rows = [
+        {"item_id": item_id, "position": position, "content": passage}
+        for item_id, content in bind.execute(sa.select(items.c.id, items.c.content))
+        for position, passage in enumerate(
+            _split_passages(content or "", _CHUNK_CHARS, _CHUNK_OVERLAP_CHARS)
+        )
+    ]
+    if rows:
+        op.bulk_insert(chunks, rows)
+        # Retire caches keyed on the knowledge version in any process still running
+        op.execute("UPDATE knowledge_version SET version = version + 1")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS knowledge_chunks_ai;")
+    op.execute("DROP TRIGGER IF EXISTS knowledge_chunks_ad;")
+    op.execute("DROP TRIGGER IF EXISTS knowledge_chunks_au;")
+    op.execute("DROP TABLE IF EXISTS knowledge_chunks_fts;")
+    op.drop_index("ix_knowledge_chunks_item_id", table_name="knowledge_chunks")
+    op.drop_table("knowledge_chunks")
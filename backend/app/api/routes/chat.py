@@ -1,19 +1,94 @@
 from __future__ import annotations
 
-from typing import Annotated
+from typing import Annotated, AsyncIterator, List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from backend.app.db.session import get_session
-from backend.app.schemas.chat import ChatRequest, ChatResponse
+from backend.app.schemas.chat import ChatRequest, ChatResponse, ChatStreamEvent
+from backend.app.services.admission import AdmissionStats, QueueFull
+from backend.app.services.cache import CacheStats
+from backend.app.services.chat import (
+    answer_cache_stats,
+    chat_stream,
+    coalescing_stats,
+    llm_backend_stats,
+    llm_breaker_stats,
+    llm_queue_stats,
+)
 from backend.app.services.chat import chat as chat_service
+from backend.app.services.circuit_breaker import BreakerStats
+from backend.app.services.llm_router import LLMBackend
+from backend.app.services.single_flight import SingleFlightStats
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 SessionDep = Annotated[Session, Depends(get_session)]
 
 
+StreamParam = Annotated[
+    bool,
+    Query(description="Stream NDJSON events: sources, answer tokens, then timings."),
+]
+
+
+async def _ndjson_events(events: AsyncIterator[ChatStreamEvent]) -> AsyncIterator[str]:
+    async for event in events:
+        yield event.model_dump_json(exclude_none=True) + "\n"
+
+
 @router.post("/", response_model=ChatResponse)
-async def chat_endpoint(payload: ChatRequest, session: SessionDep) -> ChatResponse:
-    return await chat_service(session, payload.message, top_k=payload.top_k)
+async def chat_endpoint(payload: ChatRequest, session: SessionDep, stream: StreamParam = False):
+    try:
+        if stream:
+            events = await chat_stream(
+                session,
+                payload.message,
+                top_k=payload.top_k,
+                priority=payload.priority,
+                deadline_ms=payload.deadline_ms,
+            )
+            return StreamingResponse(_ndjson_events(events), media_type="application/x-ndjson")
+        return await chat_service(
+            session,
+            payload.message,
+            top_k=payload.top_k,
+            priority=payload.priority,
+            deadline_ms=payload.deadline_ms,
+        )
+    except QueueFull as exc:
+        raise HTTPException(
+            status_code=429, detail=str(exc), headers={"Retry-After": str(exc.retry_after)}
+        ) from exc
+
+
+@router.get("/cache", response_model=CacheStats)
+async def chat_cache_stats() -> CacheStats:
+    """Expose hit/miss/eviction counters for the LLM answer cache."""
+    return answer_cache_stats()
+
+
+@router.get("/coalescing", response_model=SingleFlightStats)
+async def chat_coalescing_stats() -> SingleFlightStats:
+    """Expose how many chat requests shared an identical in-flight LLM call."""
+    return coalescing_stats()
+
+
+@router.get("/queue", response_model=AdmissionStats)
+async def chat_queue_stats() -> AdmissionStats:
+    """Expose LLM admission queue depth, refusals and wait times."""
+    return llm_queue_stats()
+
+
+@router.get("/breaker", response_model=BreakerStats)
+async def chat_breaker_stats() -> BreakerStats:
+    """Expose the LLM circuit breaker state and transition counts."""
+    return llm_breaker_stats()
+
+
+@router.get("/backends", response_model=List[LLMBackend])
+async def chat_backend_stats() -> List[LLMBackend]:
+    """Expose per-backend health and load for the LLM router."""
+    return llm_backend_stats()
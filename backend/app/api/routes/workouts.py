@@ -1,18 +1,30 @@
-from functools import lru_cache
-from typing import Annotated, List
+import logging
+import secrets
+from typing import Annotated, Iterable, Iterator, List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
-from backend.app.schemas.workout import RecommendationRequest, RecommendationResponse
-from backend.app.services.recommendation import WorkoutRecommender
+from backend.app.core.config import settings
+from backend.app.schemas.workout import (
+    BatchRecommendationRequest,
+    BatchRecommendationResponse,
+    CatalogueReloadResponse,
+    RecommendationRequest,
+    RecommendationResponse,
+)
+from backend.app.services.cache import CacheStats
+from backend.app.services.catalogue import recommender_registry
+from backend.app.services.recommendation import BaseRecommender
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/workouts", tags=["Workouts"])
 
 
-@lru_cache
-def get_recommender() -> WorkoutRecommender:
-    """Provide a cached recommender instance."""
-    return WorkoutRecommender()
+def get_recommender() -> BaseRecommender:
+    """Provide the live recommender instance; reloads swap it without restarts."""
+    return recommender_registry.get()
 
 
 GoalParam = Annotated[str, Query(..., min_length=3, description="Primary training goal.")]
@@ -37,7 +49,11 @@ EquipmentParam = Annotated[
     List[str] | None,
     Query(description="Available equipment, repeated per item."),
 ]
-RecommenderDep = Annotated[WorkoutRecommender, Depends(get_recommender)]
+StreamParam = Annotated[
+    bool,
+    Query(description="Stream results as NDJSON, one response per line, in request order."),
+]
+RecommenderDep = Annotated[BaseRecommender, Depends(get_recommender)]
 
 
 @router.get("/recommendations", response_model=RecommendationResponse)
@@ -47,7 +63,7 @@ async def recommend_workouts(
     available_days: DaysParam,
     recommender: RecommenderDep,
     equipment: EquipmentParam = None,
-) -> RecommendationResponse:
+) -> Response:
     """Return science-based workout templates that align with the request."""
     request_payload = RecommendationRequest(
         goal=goal,
@@ -55,4 +71,65 @@ async def recommend_workouts(
         available_days=available_days,
         equipment=equipment or [],
     )
-    return recommender.recommend(request_payload)
+    return Response(
+        content=recommender.recommend_json(request_payload), media_type="application/json"
+    )
+
+
+@router.get("/recommendations/cache", response_model=CacheStats)
+async def recommendation_cache_stats(recommender: RecommenderDep) -> CacheStats:
+    """Expose hit/miss/eviction counters for the recommendation response cache."""
+    return recommender.cache_stats()
+
+
+def _ndjson_lines(responses: Iterable[RecommendationResponse]) -> Iterator[str]:
+    for response in responses:
+        yield response.model_dump_json() + "\n"
+
+
+@router.post("/recommendations/batch", response_model=BatchRecommendationResponse)
+def recommend_workouts_batch(
+    payload: BatchRecommendationRequest,
+    recommender: RecommenderDep,
+    stream: StreamParam = False,
+):
+    """Resolve many recommendation requests in one call, preserving their order.
+
+    Ranking is CPU-bound, so this is a sync route (FastAPI runs it in the threadpool) and a
+    streamed body is iterated there too, keeping the event loop free for other requests.
+    """
+    results = recommender.recommend_many(payload.requests)
+    if stream:
+        return StreamingResponse(_ndjson_lines(results), media_type="application/x-ndjson")
+    return BatchRecommendationResponse(results=list(results))
+
+
+def require_reload_token(
+    token: Annotated[Optional[str], Header(alias="X-Reload-Token")] = None,
+) -> None:
+    """Admin gate for catalogue reloads; the endpoint is off unless a token is configured."""
+    expected = settings.catalogue_reload_token
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if token is None or not secrets.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid reload token")
+
+
+@router.post(
+    "/catalogue/reload",
+    response_model=CatalogueReloadResponse,
+    dependencies=[Depends(require_reload_token)],
+)
+def reload_catalogue() -> CatalogueReloadResponse:
+    """Rebuild the recommender from the template source and swap it in atomically.
+
+    Only the worker that handles this request reloads. With several workers, set
+    ``CATALOGUE_POLL_SECONDS`` so each one picks up source changes on its own.
+    """
+    try:
+        return recommender_registry.reload()
+    except Exception as exc:
+        logger.exception("Catalogue reload failed; keeping the current templates")
+        raise HTTPException(
+            status_code=503, detail="Catalogue reload failed; still serving the previous catalogue"
+        ) from exc
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -12,6 +13,41 @@ class Settings(BaseSettings):
     data_path: Path = Field(
         default=Path(__file__).resolve().parent.parent / "data" / "workouts.json"
     )
+    snapshot_path: Optional[Path] = Field(
+        default=None,
+        description="Binary catalogue snapshot (scripts/compile_catalogue.py); JSON if stale",
+    )
+    materialized_path: Optional[Path] = Field(
+        default=None,
+        description="Precomputed recommendation table (scripts/materialize_recommendations.py)",
+    )
+    materialize_on_reload: bool = Field(
+        default=False,
+        description="Rebuild a stale materialized table in the background after a catalogue "
+        "(re)load; live ranking serves requests meanwhile",
+    )
+    recommender_source: Literal["json", "database"] = Field(
+        default="json",
+        description="Load templates from data_path into memory, or query workout_templates",
+    )
+    catalogue_poll_seconds: float = Field(
+        default=0.0,
+        description=(
+            "Seconds between checks of data_path (or workout_templates) for changes"
+            " (0 disables polling)"
+        ),
+    )
+    catalogue_reload_token: Optional[str] = Field(
+        default=None,
+        description="Token required (X-Reload-Token header) by POST /workouts/catalogue/reload;"
+        " unset disables the endpoint",
+    )
+    recommendation_cache_size: int = Field(
+        default=4096, description="Max cached recommendation payloads (0 disables caching)"
+    )
+    recommendation_cache_ttl_seconds: float = Field(
+        default=300.0, description="Seconds a cached recommendation payload stays valid"
+    )
     cors_origins: list[str] = Field(
         default=["http://localhost:3000", "http://127.0.0.1:3000"],
         description="Allowed CORS origins for browsers",
@@ -28,7 +64,115 @@ class Settings(BaseSettings):
         default="llama3.2:3b",
         description="Model name for the local LLM",
     )
+    llm_backends: list[str] = Field(
+        default_factory=list,
+        description="Generate URLs of several Ollama servers to balance across (overrides "
+        "llm_base_url when set)",
+    )
+    llm_health_check_seconds: float = Field(
+        default=10.0, description="Seconds between LLM backend health checks (0 disables)"
+    )
+    chunk_chars: int = Field(
+        default=500, description="Max characters per knowledge passage (fits the prompt budget)"
+    )
+    chunk_overlap_chars: int = Field(
+        default=100, description="Characters repeated between consecutive passages"
+    )
+    retrieval_mode: Literal["passage", "snippet"] = Field(
+        default="passage",
+        description="Return whole passages, or FTS5 snippet() windows around the query terms",
+    )
+    snippet_tokens: int = Field(
+        default=48, ge=1, le=64, description="Snippet window in tokens (FTS5 caps it at 64)"
+    )
+    retrieval_workers: int = Field(
+        default=4, ge=1, description="Threads running knowledge retrieval off the event loop"
+    )
+    retrieval_cache_size: int = Field(
+        default=1024, description="Max cached retrieval results (0 disables caching)"
+    )
+    retrieval_cache_ttl_seconds: float = Field(
+        default=600.0, description="Seconds a cached retrieval result stays valid"
+    )
+    embedding_enabled: bool = Field(
+        default=False, description="Fuse embedding similarity into knowledge retrieval"
+    )
+    embedding_base_url: str = Field(
+        default="http://localhost:11434/api/embed",
+        description="Embeddings endpoint of the local LLM API (Ollama)",
+    )
+    embedding_model: str = Field(default="nomic-embed-text", description="Embedding model name")
+    embedding_quantize: bool = Field(
+        default=True, description="Hold the in-memory embedding matrix as int8 codes"
+    )
+    embedding_probe_lists: int = Field(
+        default=16, description="Inverted lists scanned per query once the index is partitioned"
+    )
+    rrf_k: int = Field(
+        default=60, description="Reciprocal-rank fusion constant for lexical + vector rankings"
+    )
+    answer_cache_size: int = Field(
+        default=512, description="Max cached LLM answers (0 disables caching)"
+    )
+    answer_cache_ttl_seconds: float = Field(
+        default=3600.0, description="Seconds a cached LLM answer stays valid"
+    )
+    answer_cache_similarity: Optional[float] = Field(
+        default=None,
+        ge=0.0,
+        le=1.0,
+        description="Reuse answers for queries this cosine-similar (needs embeddings enabled)",
+    )
     llm_enabled: bool = Field(default=True, description="Enable/disable LLM calls")
+    llm_context_tokens: int = Field(
+        default=2048, ge=256, description="Model context window (num_ctx) prompts are packed to"
+    )
+    llm_answer_tokens: int = Field(
+        default=512, ge=1, description="Tokens reserved for, and capping, each answer"
+    )
+    deadline_min_answer_tokens: int = Field(
+        default=16,
+        ge=1,
+        description="Shortest LLM answer worth generating under a request deadline; below "
+        "this the retrieval-only answer is returned",
+    )
+    llm_keep_alive: str = Field(
+        default="30m", description="How long Ollama keeps the model loaded after a request"
+    )
+    llm_timeout_seconds: float = Field(
+        default=30.0, description="Read/write/pool timeout for LLM and embedding calls"
+    )
+    llm_connect_timeout_seconds: float = Field(
+        default=5.0, description="TCP connect timeout for LLM and embedding calls"
+    )
+    llm_max_connections: int = Field(
+        default=16, description="Max concurrent connections to the LLM server per worker"
+    )
+    llm_max_keepalive_connections: int = Field(
+        default=8, description="Idle connections kept open for reuse"
+    )
+    llm_keepalive_expiry_seconds: float = Field(
+        default=30.0, description="Seconds an idle pooled connection stays open"
+    )
+    llm_concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="LLM generations run at once (default: one per LLM backend); the rest "
+        "wait in a queue",
+    )
+    llm_queue_size: int = Field(
+        default=16, ge=0, description="Requests allowed to wait for an LLM slot"
+    )
+    llm_breaker_failure_threshold: int = Field(
+        default=5, ge=1, description="Consecutive LLM failures that open the circuit breaker"
+    )
+    llm_breaker_reset_seconds: float = Field(
+        default=15.0, gt=0, description="Seconds between health probes while the circuit is open"
+    )
+    llm_queue_overflow: Literal["fallback", "reject"] = Field(
+        default="fallback",
+        description="When the LLM queue is full: retrieval-only answer, or 429 with Retry-After",
+    )
 
     model_config = {
         "env_file": ".env",
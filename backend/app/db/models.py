@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
-from typing import Optional
+from typing import List, Optional
 
-from sqlalchemy import DateTime, Integer, String, Text
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, ForeignKey, Integer, LargeBinary, String, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.app.db.session import Base
 
@@ -45,3 +45,46 @@ class KnowledgeItem(Base):
     content: Mapped[str] = mapped_column(Text)
     source_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     tags: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+
+    chunks: Mapped[List[KnowledgeChunk]] = relationship(
+        back_populates="item",
+        cascade="all, delete-orphan",
+        order_by="KnowledgeChunk.position",
+    )
+
+
+class KnowledgeChunk(Base):
+    """Overlapping passage of a knowledge item's content; the unit retrieval returns."""
+
+    __tablename__ = "knowledge_chunks"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    item_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("knowledge_items.id", ondelete="CASCADE"), index=True
+    )
+    position: Mapped[int] = mapped_column(Integer)
+    content: Mapped[str] = mapped_column(Text)
+
+    item: Mapped[KnowledgeItem] = relationship(back_populates="chunks")
+
+
+class KnowledgeVersion(Base):
+    """Single-row counter bumped on every knowledge base write; keys retrieval caches."""
+
+    __tablename__ = "knowledge_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class KnowledgeEmbedding(Base):
+    """Embedding of a knowledge item, stored as little-endian float32 bytes."""
+
+    __tablename__ = "knowledge_embeddings"
+
+    item_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("knowledge_items.id", ondelete="CASCADE"), primary_key=True
+    )
+    model: Mapped[str] = mapped_column(String(100), index=True)
+    dim: Mapped[int] = mapped_column(Integer)
+    vector: Mapped[bytes] = mapped_column(LargeBinary)
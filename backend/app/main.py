@@ -1,3 +1,7 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -5,7 +9,37 @@ from backend.app.api.routes.chat import router as chat_router
 from backend.app.api.routes.feedback import router as feedback_router
 from backend.app.api.routes.workouts import router as workouts_router
 from backend.app.core.config import settings
-from backend.app.db.session import Base, engine
+from backend.app.db.session import Base, SessionLocal, engine
+from backend.app.services.catalogue import recommender_registry, watch_catalogue
+from backend.app.services.embeddings import warm_vector_index
+from backend.app.services.knowledge_index import warm_knowledge_index
+from backend.app.services.llm_client import close_llm_clients
+from backend.app.services.llm_router import llm_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Warm in-process indexes and run background maintenance for the app's lifetime."""
+    with SessionLocal() as session:
+        warm_knowledge_index(session)
+        warm_vector_index(session)
+    tasks = []
+    if settings.catalogue_poll_seconds > 0:
+        tasks.append(
+            asyncio.create_task(
+                watch_catalogue(recommender_registry, settings.catalogue_poll_seconds)
+            )
+        )
+    if settings.llm_enabled and settings.llm_health_check_seconds > 0:
+        tasks.append(
+            asyncio.create_task(llm_router.run_health_checks(settings.llm_health_check_seconds))
+        )
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await close_llm_clients()
 
 
 def create_application() -> FastAPI:
@@ -18,6 +52,7 @@ def create_application() -> FastAPI:
             "API that delivers resistance training programs inspired by Jeff "
             "Nippard's evidence-based principles."
         ),
+        lifespan=lifespan,
     )
     # CORS for frontend clients
     app.add_middleware(
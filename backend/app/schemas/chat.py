@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -14,9 +14,44 @@ class ChatSource(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     top_k: int = Field(default=3, ge=1, le=10)
+    priority: Literal["high", "normal", "low"] = Field(
+        default="normal", description="Order in the LLM queue under load"
+    )
+    deadline_ms: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=120_000,
+        description="Latency budget; the answer is shortened, or retrieval-only, to meet it",
+    )
+
+
+class ChatStage(BaseModel):
+    name: Literal["retrieval", "answer_cache", "generation", "fallback"]
+    outcome: Literal["ok", "hit", "miss", "skipped", "timeout", "rejected", "failed"]
+    duration_ms: float
 
 
 class ChatResponse(BaseModel):
     answer: str
     sources: List[ChatSource] = []
     model: Optional[str] = None
+    cached: bool = Field(
+        default=False, description="Served from the answer cache without calling the LLM"
+    )
+    stages: List[ChatStage] = Field(
+        default=[], description="Stages that ran for this request, in order, with timings"
+    )
+
+
+class ChatStreamEvent(BaseModel):
+    """One NDJSON line of a streamed chat answer: sources, tokens, then done (or error)."""
+
+    type: Literal["sources", "token", "done", "error"]
+    sources: Optional[List[ChatSource]] = None
+    text: Optional[str] = None
+    model: Optional[str] = None
+    cached: Optional[bool] = None
+    ttft_ms: Optional[float] = Field(default=None, description="Time to first answer token")
+    total_ms: Optional[float] = Field(default=None, description="Time to the full answer")
+    stages: Optional[List[ChatStage]] = None
+    detail: Optional[str] = None
@@ -44,3 +44,17 @@ class RecommendationRequest(BaseModel):
 class RecommendationResponse(BaseModel):
     items: List[WorkoutTemplate]
     rationale: str
+
+
+class BatchRecommendationRequest(BaseModel):
+    requests: List[RecommendationRequest] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[RecommendationResponse]
+
+
+class CatalogueReloadResponse(BaseModel):
+    template_count: int
+    duration_ms: float = Field(..., description="Time spent parsing and indexing the catalogue.")
+    source: str
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Tuple
+
+# Request priority name -> queue rank; lower ranks are admitted first
+PRIORITY_RANKS = {"high": 0, "normal": 1, "low": 2}
+
+# Weight of the latest sample in the moving average of slot hold time
+_HOLD_SMOOTHING = 0.2
+
+
+class QueueFull(Exception):
+    """No slot or waiting place is available; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"LLM queue full; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class AdmissionStats:
+    concurrency: int
+    max_waiting: int
+    active: int
+    waiting: int
+    admitted: int
+    rejected: int
+    wait_ms_avg: float
+    wait_ms_max: float
+
+
+class AdmissionQueue:
+    """At most ``concurrency`` holders at once, with a bounded priority queue behind them.
+
+    Waiters are admitted by priority rank, first come first served within a rank. When
+    the queue is full, a new request either displaces the lowest-ranked waiter (if it
+    outranks it) or is refused; either way the loser gets ``QueueFull`` immediately rather
+    than waiting out a timeout.
+    """
+
+    def __init__(self, concurrency: int, max_waiting: int) -> None:
+        self.concurrency = concurrency
+        self.max_waiting = max_waiting
+        self._active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._hold_seconds = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_RANKS["normal"]) -> AsyncIterator[None]:
+        await self._acquire(priority)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - started
+            self._hold_seconds += _HOLD_SMOOTHING * (held - self._hold_seconds)
+            self._release()
+
+    def retry_after(self) -> int:
+        """Seconds until a place is likely to free up, from the average hold time."""
+        rounds = (len(self._waiters) + 1) / self.concurrency
+        return max(1, math.ceil(self._hold_seconds * rounds))
+
+    def would_refuse(self, priority: int) -> bool:
+        """Whether a request at ``priority`` arriving now would get ``QueueFull``."""
+        if self._active < self.concurrency and not self._waiters:
+            return False
+        if len(self._waiters) < self.max_waiting:
+            return False
+        return not self._waiters or max(self._waiters)[0] <= priority
+
+    async def _acquire(self, priority: int) -> None:
+        started = time.perf_counter()
+        if self._active < self.concurrency and not self._waiters:
+            self._active += 1
+        else:
+            if len(self._waiters) >= self.max_waiting:
+                self._displace(priority)
+            future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            entry = (priority, next(self._sequence), future)
+            heapq.heappush(self._waiters, entry)
+            try:
+                # Resolved by _release, which hands its slot straight to this waiter
+                await future
+            except asyncio.CancelledError:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                elif not future.cancelled() and future.exception() is None:
+                    self._release()  # the slot arrived just as we gave up
+                raise
+        waited = time.perf_counter() - started
+        self.admitted += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    def _displace(self, priority: int) -> None:
+        worst = max(self._waiters, default=None)
+        if worst is None or worst[0] <= priority:
+            self.rejected += 1
+            raise QueueFull(self.retry_after())
+        self._waiters.remove(worst)
+        heapq.heapify(self._waiters)
+        self.rejected += 1
+        worst[2].set_exception(QueueFull(self.retry_after()))
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self) -> AdmissionStats:
+        return AdmissionStats(
+            concurrency=self.concurrency,
+            max_waiting=self.max_waiting,
+            active=self._active,
+            waiting=len(self._waiters),
+            admitted=self.admitted,
+            rejected=self.rejected,
+            wait_ms_avg=round(self._wait_total / self.admitted * 1000, 3) if self.admitted else 0.0,
+            wait_ms_max=round(self._wait_max * 1000, 3),
+        )
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.app.schemas.chat import ChatResponse
+from backend.app.services.cache import CacheStats, TTLCache
+
+# (database URL, knowledge version, retrieved source ids, LLM model)
+AnswerGroup = Tuple[str, int, Tuple[int, ...], str]
+# (group, sorted retrieval keywords)
+AnswerKey = Tuple[AnswerGroup, Tuple[str, ...]]
+
+# Most recent query embeddings remembered per group for similarity matching
+_MAX_SIMILAR_PER_GROUP = 32
+
+
+class AnswerCache:
+    """LLM answers keyed on what the prompt was built from.
+
+    An exact hit needs the same retrieval keywords and the same retrieved sources under the
+    same knowledge version, so any knowledge write retires every stored answer. With a
+    ``similarity`` threshold, a query whose embedding is at least that cosine-similar to an
+    earlier query with the same sources also hits, even when its keywords differ.
+    """
+
+    def __init__(
+        self, maxsize: int, ttl_seconds: float, similarity: Optional[float] = None
+    ) -> None:
+        self.similarity = similarity
+        self._answers: TTLCache[AnswerKey, ChatResponse] = TTLCache(maxsize, ttl_seconds)
+        self._similar: Dict[AnswerGroup, List[Tuple[np.ndarray, Tuple[str, ...]]]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        group: AnswerGroup,
+        keywords: Tuple[str, ...],
+        query_vector: Optional[np.ndarray] = None,
+    ) -> Optional[ChatResponse]:
+        answer = self._answers.get((group, keywords))
+        if answer is not None or query_vector is None or self.similarity is None:
+            return answer
+        with self._lock:
+            candidates = list(self._similar.get(group, ()))
+        for vector, other_keywords in candidates:
+            if float(vector @ query_vector) >= self.similarity:
+                answer = self._answers.get((group, other_keywords))
+                if answer is not None:
+                    return answer
+        return None
+
+    def set(
+        self,
+        group: AnswerGroup,
+        keywords: Tuple[str, ...],
+        response: ChatResponse,
+        query_vector: Optional[np.ndarray] = None,
+    ) -> None:
+        self._answers.set((group, keywords), response)
+        if query_vector is None or self.similarity is None or self._answers.maxsize <= 0:
+            return
+        with self._lock:
+            similar = self._similar.pop(group, [])
+            similar.append((query_vector, keywords))
+            del similar[:-_MAX_SIMILAR_PER_GROUP]
+            # Re-inserted last, so the oldest group is dropped first when over capacity
+            self._similar[group] = similar
+            # Groups from older knowledge versions can never hit again
+            for stale in [g for g in self._similar if g[0] == group[0] and g[1] < group[1]]:
+                del self._similar[stale]
+            while len(self._similar) > self._answers.maxsize:
+                del self._similar[next(iter(self._similar))]
+
+    def clear(self) -> None:
+        self._answers.clear()
+        with self._lock:
+            self._similar.clear()
+
+    def stats(self) -> CacheStats:
+        return self._answers.stats()
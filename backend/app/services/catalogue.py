@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import settings
+from backend.app.db.session import SessionLocal
+from backend.app.schemas.workout import CatalogueReloadResponse
+from backend.app.services.db_recommendation import DatabaseWorkoutRecommender, table_signature
+from backend.app.services.materialized import MaterializedRecommendations
+from backend.app.services.recommendation import BaseRecommender, WorkoutRecommender
+
+logger = logging.getLogger(__name__)
+
+Signature = Tuple[int, int]
+
+
+class RecommenderRegistry:
+    """Own the live recommender and swap in rebuilt instances atomically.
+
+    Rebuilds happen off to the side; readers keep whichever instance they already grabbed,
+    so an in-flight request never sees a partially built index.
+    """
+
+    def __init__(
+        self,
+        data_path: Optional[Path] = None,
+        source: Optional[str] = None,
+        materialized_path: Optional[Path] = None,
+        snapshot_path: Optional[Path] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.data_path = data_path or settings.data_path
+        self.source = source or settings.recommender_source
+        self.materialized_path = materialized_path or settings.materialized_path
+        self.snapshot_path = snapshot_path or settings.snapshot_path
+        self.session_factory = session_factory
+        self._current: Optional[BaseRecommender] = None
+        self._signature: Optional[Signature] = None
+        self._build_lock = threading.Lock()
+        # Serializes background table rebuilds; the latest one is kept for tests to join
+        self._materialize_lock = threading.Lock()
+        self.materializer: Optional[threading.Thread] = None
+
+    def get(self) -> BaseRecommender:
+        current = self._current
+        if current is None:
+            with self._build_lock:
+                if self._current is None:
+                    self._swap_in()
+                current = self._current
+        return current
+
+    def reload(self) -> CatalogueReloadResponse:
+        """Rebuild from the source unconditionally."""
+        with self._build_lock:
+            return self._swap_in()
+
+    def reload_if_changed(self) -> Optional[CatalogueReloadResponse]:
+        """Rebuild only when the source signature differs from the loaded catalogue's: file
+        mtime/size for JSON, row count/payload size for the database table."""
+        if self._current is not None and self._source_signature() == self._signature:
+            return None
+        with self._build_lock:
+            if self._current is not None and self._source_signature() == self._signature:
+                return None
+            return self._swap_in()
+
+    def _source_signature(self) -> Optional[Signature]:
+        if self.source == "database":
+            # Rows are read live, but cached responses are not: a new instance drops them.
+            return table_signature(self.session_factory)
+        try:
+            stat = self.data_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _swap_in(self) -> CatalogueReloadResponse:
+        started = time.perf_counter()
+        signature = self._source_signature()
+        recommender: BaseRecommender
+        rematerialize = False
+        if self.source == "database":
+            recommender = DatabaseWorkoutRecommender(self.session_factory)
+        else:
+            recommender = WorkoutRecommender(
+                data_path=self.data_path, snapshot_path=self.snapshot_path
+            )
+            if self.materialized_path is not None:
+                rematerialize = self._attach_materialized(recommender, self.materialized_path)
+        # Single reference assignment: readers see either the old or the new instance.
+        self._current = recommender
+        self._signature = signature
+        if rematerialize and self.materialized_path is not None:
+            self.materializer = threading.Thread(
+                target=self._rematerialize,
+                args=(recommender, self.materialized_path),
+                name="materialize",
+                daemon=True,
+            )
+            self.materializer.start()
+        duration_ms = (time.perf_counter() - started) * 1000
+        template_count = recommender.template_count
+        source = "database" if self.source == "database" else str(self.data_path)
+        logger.info(
+            "Loaded %d workout templates from %s in %.1f ms", template_count, source, duration_ms
+        )
+        return CatalogueReloadResponse(
+            template_count=template_count, duration_ms=round(duration_ms, 3), source=source
+        )
+
+    @staticmethod
+    def _attach_materialized(recommender: WorkoutRecommender, path: Path) -> bool:
+        """Attach the table at ``path``. True when it is missing or stale and should be rebuilt
+        in the background (started once the recommender is live)."""
+        table = MaterializedRecommendations.load(path, recommender.source_hash)
+        if table is not None:
+            recommender.use_materialized(table)
+            return False
+        if not settings.materialize_on_reload:
+            logger.warning(
+                "No current materialized table at %s; live ranking serves every request "
+                "until it is rebuilt (scripts/materialize_recommendations.py)",
+                path,
+            )
+            return False
+        logger.warning(
+            "No current materialized table at %s; rebuilding it in the background", path
+        )
+        return True
+
+    def _rematerialize(self, recommender: WorkoutRecommender, path: Path) -> None:
+        with self._materialize_lock:
+            if self._current is not recommender:
+                return  # superseded by a later reload, which starts its own rebuild
+            try:
+                table = MaterializedRecommendations.build(self.data_path)
+                if table.source_hash != recommender.source_hash:
+                    return  # the source changed mid-build; its reload rebuilds again
+                table.save(path)
+                recommender.use_materialized(table)
+            except Exception:
+                logger.exception("Rebuilding %s failed; live ranking continues", path)
+                return
+        logger.info("Materialized %d request points into %s", len(table), path)
+
+
+async def watch_catalogue(registry: RecommenderRegistry, interval_seconds: float) -> None:
+    """Poll the catalogue source and rebuild in a worker thread when it changes."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(registry.reload_if_changed)
+        except Exception:
+            logger.exception("Catalogue reload failed; keeping the current templates")
+
+
+recommender_registry = RecommenderRegistry()
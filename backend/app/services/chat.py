@@ -1,49 +1,67 @@
 from __future__ import annotations
 # isort: skip_file
 
-import re
-from typing import List, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 import httpx
-from sqlalchemy import or_, select, text
+import numpy as np
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
 from backend.app.core.config import settings
-from backend.app.db.models import KnowledgeItem
-from backend.app.schemas.chat import ChatResponse, ChatSource
-
-
-_STOPWORDS = {
-    "the",
-    "is",
-    "a",
-    "an",
-    "and",
-    "or",
-    "of",
-    "to",
-    "in",
-    "for",
-    "on",
-    "with",
-    "at",
-    "by",
-    "what",
-    "who",
-    "when",
-    "how",
-    "why",
-    "are",
-    "his",
-    "her",
-    "their",
-}
+from backend.app.db.models import KnowledgeChunk, KnowledgeItem
+from backend.app.schemas.chat import ChatResponse, ChatSource, ChatStreamEvent
+from backend.app.services.admission import (
+    PRIORITY_RANKS,
+    AdmissionQueue,
+    AdmissionStats,
+    QueueFull,
+)
+from backend.app.services.answer_cache import AnswerCache, AnswerGroup
+from backend.app.services.cache import CacheStats, TTLCache
+from backend.app.services.circuit_breaker import BreakerStats, CircuitBreaker
+from backend.app.services.deadline import GenerationEstimate, StageClock
+from backend.app.services.embeddings import embed_texts, get_vector_index
+from backend.app.services.knowledge_index import (
+    get_knowledge_index,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+from backend.app.services.knowledge_version import get_knowledge_version
+from backend.app.services.llm_client import get_llm_client
+from backend.app.services.llm_router import LLMBackend, llm_router
+from backend.app.services.prompt_budget import approx_tokens, pack_passages
+from backend.app.services.single_flight import SingleFlight, SingleFlightStats
+
+logger = logging.getLogger(__name__)
+
+# Minimum candidates taken from each ranking before fusion
+_FUSION_DEPTH = 20
+# Passages fetched per requested result, so one item's passages cannot crowd out others
+_PASSAGES_PER_RESULT = 3
+_PASSAGE_COLUMNS = (
+    KnowledgeChunk.item_id,
+    KnowledgeItem.title,
+    KnowledgeChunk.content,
+    KnowledgeItem.source_url,
+    KnowledgeItem.tags,
+)
+
+# (database URL, knowledge version, query signature, top_k)
+RetrievalKey = Tuple[str, int, Tuple[str, ...], int]
 
 
 def _keywords_from_query(query: str, max_tokens: int = 8) -> List[str]:
     # Lowercase, strip punctuation, split, remove stopwords/short tokens
-    tokens = re.findall(r"[a-zA-Z][a-zA-Z\-]{1,}\b", query.lower())
-    filtered = [t for t in tokens if t not in _STOPWORDS and len(t) > 2]
+    filtered = tokenize(query)
     # Deduplicate preserving order
     seen = set()
     uniq: List[str] = []
@@ -54,133 +72,711 @@ def _keywords_from_query(query: str, max_tokens: int = 8) -> List[str]:
     return uniq[:max_tokens]
 
 
+_retrieval_cache: TTLCache[RetrievalKey, Tuple[Tuple[KnowledgeItem, float], ...]] = TTLCache(
+    maxsize=settings.retrieval_cache_size,
+    ttl_seconds=settings.retrieval_cache_ttl_seconds,
+)
+
+
 def retrieve_knowledge(
-    session: Session, query: str, top_k: int = 3
+    session: Session,
+    query: str,
+    top_k: int = 3,
+    query_vector: Optional[np.ndarray] = None,
 ) -> List[Tuple[KnowledgeItem, float]]:
-    """Simple retrieval using SQLite FTS5 when available; falls back to LIKE search.
-    Returns list of (KnowledgeItem, score)
+    """Simple retrieval using SQLite FTS5 when available; falls back to an in-process
+    BM25 index (any database). With embeddings enabled, the lexical ranking is fused with
+    vector similarity by reciprocal rank. Returns list of (KnowledgeItem, score), one per
+    item, where the detached item's ``content`` is its best-matching passage.
+
+    Results are cached by query signature and knowledge base version, so phrasings
+    that reduce to the same keywords share one lookup until the next knowledge write.
+    Pass ``query_vector`` when the caller already embedded ``query``, so it is not embedded
+    again on a cache miss.
     """
     # Build relaxed token query to improve recall
     tokens = _keywords_from_query(query)
+    version = get_knowledge_version(session)
+    if settings.embedding_enabled:
+        # Vector ranking sees the whole phrasing, not just its keywords
+        signature = tuple(query.lower().split())
+    else:
+        signature = tuple(sorted(tokens))
+    if version is None or not signature:
+        return _search_knowledge(session, query, tokens, top_k, version, query_vector)[0]
+
+    key = (str(session.get_bind().url), version, signature, top_k)
+    cached = _retrieval_cache.get(key)
+    if cached is None:
+        results, complete = _search_knowledge(
+            session, query, tokens, top_k, version, query_vector
+        )
+        # Cache detached copies so hits never touch the originating session.
+        cached = tuple(
+            (
+                KnowledgeItem(
+                    id=item.id,
+                    title=item.title,
+                    content=item.content,
+                    source_url=item.source_url,
+                    tags=item.tags,
+                ),
+                score,
+            )
+            for item, score in results
+        )
+        if complete:
+            # Degraded (lexical-only) hybrid results are not pinned for the cache TTL
+            _retrieval_cache.set(key, cached)
+    return list(cached)
+
+
+def _search_knowledge(
+    session: Session,
+    query: str,
+    tokens: List[str],
+    top_k: int,
+    version: Optional[int],
+    query_vector: Optional[np.ndarray] = None,
+) -> Tuple[List[Tuple[KnowledgeItem, float]], bool]:
+    """Ranked results, and whether every enabled ranking contributed to them."""
+    if not settings.embedding_enabled:
+        return _search_lexical(session, query, tokens, top_k, version), True
+
+    # Fuse deeper candidate lists than requested so each ranking can promote the other's hits
+    depth = max(top_k * 4, _FUSION_DEPTH)
+    lexical = _search_lexical(session, query, tokens, depth, version)
+    vector_hits = _search_vectors(session, query, version, depth, query_vector)
+    if vector_hits is None:
+        return lexical[:top_k], False
+
+    fused = reciprocal_rank_fusion(
+        [[item.id for item, _ in lexical], [doc_id for doc_id, _ in vector_hits]],
+        k=settings.rrf_k,
+    )[:top_k]
+    by_id = {item.id: item for item, _ in lexical}
+    missing = [doc_id for doc_id, _ in fused if doc_id not in by_id]
+    if missing:
+        # Vector-only hits have no matching passage; lead with the item's opening one
+        by_id.update(
+            (doc_id, item) for doc_id, (item, _) in _first_passages(session, missing).items()
+        )
+    return [(by_id[doc_id], score) for doc_id, score in fused if doc_id in by_id], True
+
+
+def _embed_query(query: str) -> Optional[np.ndarray]:
+    try:
+        return embed_texts([query])[0]
+    except (httpx.HTTPError, KeyError, ValueError):
+        logger.debug("Query embedding failed", exc_info=True)
+        return None
+
+
+def _search_vectors(
+    session: Session,
+    query: str,
+    version: Optional[int],
+    top_k: int,
+    query_vector: Optional[np.ndarray] = None,
+) -> Optional[List[Tuple[int, float]]]:
+    if query_vector is None:
+        query_vector = _embed_query(query)
+    if query_vector is None:
+        # Embeddings endpoint unavailable; lexical ranking alone still answers
+        return None
+    return get_vector_index(session, version).search(query_vector, top_k)
+
+
+def _search_lexical(
+    session: Session, query: str, tokens: List[str], top_k: int, version: Optional[int] = None
+) -> List[Tuple[KnowledgeItem, float]]:
     fts_query = " OR ".join(tokens) if tokens else query
+    depth = top_k * _PASSAGES_PER_RESULT
+
+    if settings.retrieval_mode == "snippet":
+        # Bounded window around the matched terms, cut by SQLite; passage text never leaves it
+        passage = "snippet(knowledge_chunks_fts, 1, '', '', '...', :window)"
+    else:
+        passage = "c.content"
 
-    # Try FTS5 (searches title/content/tags)
+    # Try FTS5 over passages (title/tags are indexed with every passage of an item)
     try:
         rows = session.execute(
             text(
                 (
-                    "SELECT ki.id, ki.title, ki.content, ki.source_url, ki.tags, "
-                    "bm25(knowledge_fts) as score\n"
+                    f"SELECT c.item_id, ki.title, {passage}, ki.source_url, ki.tags, "
+                    "bm25(knowledge_chunks_fts) as score\n"
                 )
-                + "FROM knowledge_fts JOIN knowledge_items ki ON knowledge_fts.rowid = ki.id\n"
-                + "WHERE knowledge_fts MATCH :q ORDER BY score LIMIT :k"
+                + "FROM knowledge_chunks_fts "
+                + "JOIN knowledge_chunks c ON knowledge_chunks_fts.rowid = c.id\n"
+                + "JOIN knowledge_items ki ON ki.id = c.item_id\n"
+                + "WHERE knowledge_chunks_fts MATCH :q ORDER BY score LIMIT :k"
             ),
-            {"q": fts_query, "k": top_k},
+            {"q": fts_query, "k": depth, "window": settings.snippet_tokens},
         ).all()
-        results: List[Tuple[KnowledgeItem, float]] = []
-        for rid, title, content, source_url, tags, score in rows:
-            item = KnowledgeItem(
-                id=rid, title=title, content=content, source_url=source_url, tags=tags
-            )
-            results.append((item, float(score)))
-        if results:
-            return results
+        # FTS5 searched every passage for these terms: BM25 over the same passages cannot
+        # find more, so a miss is final and never builds the in-process index
+        if rows or tokens:
+            return _passage_results(rows, top_k)
     except Exception:
-        # Fallback to LIKE search
-        pass
+        # No FTS5 here (e.g. non-SQLite); clear the failed statement and use BM25
+        session.rollback()
 
-    # Broaden LIKE over tokens across title/content/tags using OR
     if tokens:
-        like_conditions = []
-        for t in tokens:
-            pat = f"%{t}%"
-            like_conditions.extend(
-                [
-                    KnowledgeItem.title.ilike(pat),
-                    KnowledgeItem.content.ilike(pat),
-                    KnowledgeItem.tags.ilike(pat),
-                ]
-            )
-        stmt = select(KnowledgeItem).where(or_(*like_conditions)).limit(top_k)
-    else:
-        stmt = select(KnowledgeItem).where(KnowledgeItem.content.ilike(f"%{query}%")).limit(top_k)
+        hits = get_knowledge_index(session, version).search(tokens, depth)
+        if not hits:
+            return []
+        rows = session.execute(
+            select(KnowledgeChunk.id, *_PASSAGE_COLUMNS)
+            .join(KnowledgeChunk.item)
+            .where(KnowledgeChunk.id.in_([chunk_id for chunk_id, _ in hits]))
+        ).all()
+        by_id = {row[0]: row[1:] for row in rows}
+        return _passage_results(
+            ((*by_id[chunk_id], score) for chunk_id, score in hits if chunk_id in by_id), top_k
+        )
 
-    like_rows = session.execute(stmt).scalars()
-    return [(row, 1.0) for row in like_rows]
+    stmt = (
+        select(*_PASSAGE_COLUMNS)
+        .join(KnowledgeChunk.item)
+        .where(KnowledgeChunk.content.ilike(f"%{query}%"))
+        .order_by(KnowledgeChunk.item_id, KnowledgeChunk.position)
+        .limit(depth)
+    )
+    return _passage_results(((*row, 1.0) for row in session.execute(stmt)), top_k)
 
 
-async def call_llm(prompt: str) -> str:
-    if not settings.llm_enabled:
-        raise RuntimeError("LLM disabled")
+def _first_passages(
+    session: Session, item_ids: List[int]
+) -> Dict[int, Tuple[KnowledgeItem, float]]:
+    stmt = (
+        select(*_PASSAGE_COLUMNS)
+        .join(KnowledgeChunk.item)
+        .where(KnowledgeChunk.item_id.in_(item_ids), KnowledgeChunk.position == 0)
+    )
+    passages = _passage_results(((*row, 0.0) for row in session.execute(stmt)), len(item_ids))
+    return {item.id: (item, score) for item, score in passages}
+
 
-    payload = {
+def _passage_results(
+    rows: Iterable[Sequence[Any]], top_k: int
+) -> List[Tuple[KnowledgeItem, float]]:
+    """Best passage per item, as detached items whose ``content`` is that passage.
+
+    Rows are (item_id, title, passage, source_url, tags, score) in rank order.
+    """
+    results: List[Tuple[KnowledgeItem, float]] = []
+    seen: Set[int] = set()
+    for item_id, title, passage, source_url, tags, score in rows:
+        if item_id in seen:
+            continue
+        seen.add(item_id)
+        item = KnowledgeItem(
+            id=item_id, title=title, content=passage, source_url=source_url, tags=tags
+        )
+        results.append((item, float(score)))
+        if len(results) == top_k:
+            break
+    return results
+
+
+# Retrieval is synchronous (ORM, FTS5, in-process indexes); run it here so a slow query
+# never blocks the event loop. The bound also caps concurrent database work per worker.
+_retrieval_pool = ThreadPoolExecutor(
+    max_workers=settings.retrieval_workers, thread_name_prefix="retrieval"
+)
+
+
+async def retrieve_knowledge_async(
+    session: Session, query: str, top_k: int = 3
+) -> List[Tuple[KnowledgeItem, float]]:
+    """``retrieve_knowledge`` on the retrieval thread pool.
+
+    The session must not be used by anything else until the result is awaited.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_retrieval_pool, retrieve_knowledge, session, query, top_k)
+
+
+# Sent as Ollama's ``system`` field rather than inlined: it renders first in the chat
+# template, so the evaluated prefix is identical across requests and stays in the KV cache.
+PERSONA = (
+    "You are a friendly gym buddy who speaks in a supportive, concise tone. "
+    "Ground your advice in evidence-based strength training principles (Jeff Nippard style). "
+    "Be practical, avoid medical claims, and include 1-2 short actionable suggestions. "
+    "Cite sources with bracket numbers like [1], [2] that refer to the provided context items."
+)
+# Chat template role markers and separators around the system, context and question
+_TEMPLATE_TOKENS = 32
+
+
+def generate_payload(
+    prompt: str, stream: bool, num_predict: Optional[int] = None
+) -> Dict[str, Any]:
+    return {
         "model": settings.llm_model,
+        "system": PERSONA,
         "prompt": prompt,
-        "stream": False,
-        "options": {"temperature": 0.7},
+        "stream": stream,
+        # Keep the model (and its cached persona prefix) loaded between requests
+        "keep_alive": settings.llm_keep_alive,
+        "options": {
+            "temperature": 0.7,
+            "num_ctx": settings.llm_context_tokens,
+            "num_predict": num_predict or settings.llm_answer_tokens,
+        },
     }
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.post(settings.llm_base_url, json=payload)
+
+
+# Learned decode rate and prompt overhead, for fitting answers into request deadlines
+_generation_estimate = GenerationEstimate()
+
+
+def _log_prompt_eval(data: Dict[str, Any]) -> None:
+    # Final Ollama response: prompt_eval_count tokens evaluated in prompt_eval_duration ns.
+    # Tokens served from the cached prefix are not counted, so a warm persona shows here.
+    if "prompt_eval_duration" in data:
+        logger.info(
+            "LLM prompt eval: %s tokens in %.1f ms",
+            data.get("prompt_eval_count", 0),
+            data["prompt_eval_duration"] / 1e6,
+        )
+
+
+async def stream_llm(prompt: str, num_predict: Optional[int] = None) -> AsyncIterator[str]:
+    """Yield answer fragments as Ollama generates them (``"stream": true``)."""
+    if not settings.llm_enabled:
+        raise RuntimeError("LLM disabled")
+
+    payload = generate_payload(prompt, stream=True, num_predict=num_predict)
+    async with (
+        llm_router.backend() as url,
+        get_llm_client().stream("POST", url, json=payload) as resp,
+    ):
         resp.raise_for_status()
-        data = resp.json()
-        # Ollama returns {'response': '...'}
-        return data.get("response") or data.get("text") or ""
+        # One JSON object per line: {"response": "...", "done": false}
+        async for line in resp.aiter_lines():
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            if data.get("response"):
+                yield data["response"]
+            if data.get("done"):
+                _log_prompt_eval(data)
+                _generation_estimate.observe(data)
+                break
+
+
+async def call_llm(prompt: str, num_predict: Optional[int] = None) -> str:
+    if not settings.llm_enabled:
+        raise RuntimeError("LLM disabled")
+
+    payload = generate_payload(prompt, stream=False, num_predict=num_predict)
+    async with llm_router.backend() as url:
+        resp = await get_llm_client().post(url, json=payload)
+        resp.raise_for_status()
+    data = resp.json()
+    _log_prompt_eval(data)
+    _generation_estimate.observe(data)
+    # Ollama returns {'response': '...'}
+    return data.get("response") or data.get("text") or ""
+
+
+def context_token_budget(user_message: str) -> int:
+    """Tokens left for retrieved passages once the model's context window holds the persona,
+    the question, the answer and the template around them."""
+    reserved = (
+        approx_tokens(PERSONA)
+        + approx_tokens(user_message)
+        + settings.llm_answer_tokens
+        + _TEMPLATE_TOKENS
+    )
+    return max(settings.llm_context_tokens - reserved, 0)
 
 
 def build_prompt(
     user_message: str, docs: List[Tuple[KnowledgeItem, float]]
 ) -> Tuple[str, List[ChatSource]]:
-    context_lines = []
-    sources: List[ChatSource] = []
-    for i, (doc, score) in enumerate(docs, start=1):
-        snippet = doc.content.strip()
-        # Keep it compact
-        if len(snippet) > 500:
-            snippet = snippet[:500] + "..."
-        context_lines.append(f"[{i}] Title: {doc.title}\n{snippet}")
-        sources.append(ChatSource(title=doc.title, url=doc.source_url, score=score))
-
-    persona = (
-        "You are a friendly gym buddy who speaks in a supportive, concise tone. "
-        "Ground your advice in evidence-based strength training principles (Jeff Nippard style). "
-        "Be practical, avoid medical claims, and include 1-2 short actionable suggestions. "
-        "Cite sources with bracket numbers like [1], [2] that refer to the provided context items."
-    )
+    """Prompt (sent alongside ``PERSONA``) and the sources it cites.
 
+    Passages are packed best first into the context token budget; any that do not fit are
+    left out of both the prompt and the sources, so citation numbers stay aligned.
+    """
+    blocks = pack_passages(
+        [(doc.title, doc.content) for doc, _ in docs], context_token_budget(user_message)
+    )
+    sources = [
+        ChatSource(title=doc.title, url=doc.source_url, score=score)
+        for doc, score in docs[: len(blocks)]
+    ]
     prompt = (
-        f"System: {persona}\n\n"
-        f"Context sources (use for citations):\n{chr(10).join(context_lines)}\n\n"
-        f"User: {user_message}\n\nAssistant:"
+        f"Context sources (use for citations):\n{chr(10).join(blocks)}\n\n"
+        f"User: {user_message}"
     )
     return prompt, sources
 
 
-async def chat(session: Session, message: str, top_k: int = 3) -> ChatResponse:
-    docs = retrieve_knowledge(session, message, top_k=top_k)
-    prompt, sources = build_prompt(message, docs)
+_answer_cache = AnswerCache(
+    maxsize=settings.answer_cache_size,
+    ttl_seconds=settings.answer_cache_ttl_seconds,
+    similarity=settings.answer_cache_similarity,
+)
+
+
+@dataclass
+class _ChatContext:
+    """Everything retrieved for one chat turn, plus its answer cache coordinates."""
+
+    docs: List[Tuple[KnowledgeItem, float]]
+    keywords: Tuple[str, ...]
+    group: Optional[AnswerGroup]
+    query_vector: Optional[np.ndarray]
+
+    @property
+    def cacheable(self) -> bool:
+        # Keyword-free messages ("hi", "thanks") are too coarse a key to share answers
+        return self.group is not None and bool(self.keywords)
+
+    def cached_answer(self) -> Optional[ChatResponse]:
+        if not self.cacheable:
+            return None
+        cached = _answer_cache.get(self.group, self.keywords, self.query_vector)
+        return None if cached is None else cached.model_copy(update={"cached": True})
+
+    def store(self, response: ChatResponse) -> None:
+        # Only LLM answers are stored; retrieval-only fallbacks are cheap to rebuild
+        if self.cacheable:
+            _answer_cache.set(self.group, self.keywords, response, self.query_vector)
+
+
+def _retrieve_for_answer(session: Session, message: str, top_k: int) -> _ChatContext:
+    """Retrieval plus the answer cache group and query embedding; runs on the retrieval pool."""
+    keywords = tuple(sorted(_keywords_from_query(message)))
+    version = get_knowledge_version(session)
+    query_vector = None
+    if _answer_cache.similarity is not None and settings.embedding_enabled:
+        # Embedded once: the answer cache matches on it and retrieval ranks with it
+        query_vector = _embed_query(message)
+    docs = retrieve_knowledge(session, message, top_k=top_k, query_vector=query_vector)
+    if version is None:
+        # Without a version counter, knowledge writes could not retire cached answers
+        return _ChatContext(docs, keywords, None, None)
+    group = (
+        str(session.get_bind().url),
+        version,
+        tuple(item.id for item, _ in docs),
+        settings.llm_model,
+    )
+    return _ChatContext(docs, keywords, group, query_vector)
+
+
+async def _prepare_chat(session: Session, message: str, top_k: int) -> _ChatContext:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _retrieval_pool, _retrieve_for_answer, session, message, top_k
+    )
+
+
+def answer_cache_stats() -> CacheStats:
+    return _answer_cache.stats()
+
+
+# Identical prompts in flight at once (a question going viral) share one generation
+_llm_flight: SingleFlight[str] = SingleFlight()
+
+
+def _prompt_key(prompt: str) -> str:
+    return hashlib.sha256(f"{settings.llm_model}\0{prompt}".encode()).hexdigest()
+
+
+def llm_concurrency() -> int:
+    """Generations allowed at once: ``llm_concurrency``, or one per configured backend."""
+    return settings.llm_concurrency or len(settings.llm_backends) or 1
+
+
+# A local Ollama serves roughly one generation at a time; the rest wait here, bounded
+_llm_queue = AdmissionQueue(llm_concurrency(), settings.llm_queue_size)
+
+
+async def _probe_llm() -> None:
+    if not await llm_router.check_health():
+        raise RuntimeError("No LLM backend passed its health check")
+
+
+# After repeated transport/HTTP failures, skip the LLM (and its timeout) until a background
+# probe sees the server answering again
+_llm_breaker = CircuitBreaker(
+    failure_threshold=settings.llm_breaker_failure_threshold,
+    reset_timeout=settings.llm_breaker_reset_seconds,
+    probe=_probe_llm,
+    failures=(httpx.HTTPError,),
+)
+
+
+async def _call_llm_admitted(prompt: str, priority: int, num_predict: Optional[int]) -> str:
+    # The breaker is checked before queueing, so an open circuit never waits for a slot
+    async with _llm_breaker.guard(), _llm_queue.slot(priority):
+        return await call_llm(prompt, num_predict=num_predict)
+
+
+async def call_llm_coalesced(
+    prompt: str, priority: int = PRIORITY_RANKS["normal"], num_predict: Optional[int] = None
+) -> str:
+    """``call_llm`` through the admission queue; concurrent calls with the same prompt (and
+    answer length cap) await a single request. Raises ``QueueFull`` when no place in the
+    queue is free."""
+    return await _llm_flight.run(
+        f"{_prompt_key(prompt)}:{num_predict}",
+        lambda: _call_llm_admitted(prompt, priority, num_predict),
+    )
+
+
+def coalescing_stats() -> SingleFlightStats:
+    return _llm_flight.stats()
+
+
+def llm_queue_stats() -> AdmissionStats:
+    return _llm_queue.stats()
+
+
+def llm_breaker_stats() -> BreakerStats:
+    return _llm_breaker.stats()
+
+
+def llm_backend_stats() -> List[LLMBackend]:
+    return llm_router.stats()
+
+
+def _overflow_response(
+    exc: QueueFull, docs: List[Tuple[KnowledgeItem, float]], sources: List[ChatSource]
+) -> ChatResponse:
+    if settings.llm_queue_overflow == "reject":
+        raise exc
+    logger.info("LLM queue full; answering from retrieval only")
+    return _fallback_response(docs, sources)
+
+
+def _fallback_response(
+    docs: List[Tuple[KnowledgeItem, float]], sources: List[ChatSource]
+) -> ChatResponse:
+    # Fallback: retrieval-only concise summary
+    if not docs:
+        return ChatResponse(
+            answer=(
+                "I don't have enough context yet to answer that. Try asking about hypertrophy, "
+                "strength, or beginner routines."
+            ),
+            sources=[],
+            model=None,
+        )
+    # Build a friendly summary from top docs
+    bullets = []
+    for doc, _ in docs[:2]:
+        bullets.append(f"- {doc.title}")
+    fallback = (
+        "Here’s a quick, evidence-based take based on what I have: \n" + "\n".join(bullets) +
+        "\n(Enable a local LLM like Ollama for a fuller, chatty answer with citations.)"
+    )
+    return ChatResponse(answer=fallback, sources=sources, model=None)
+
+
+def _answer_budget(clock: StageClock) -> Tuple[bool, Optional[int]]:
+    """Whether to call the LLM under the request's deadline, and its answer token cap."""
+    remaining = clock.remaining()
+    if remaining is None:
+        return True, None
+    tokens = min(_generation_estimate.max_tokens(remaining), settings.llm_answer_tokens)
+    return tokens >= settings.deadline_min_answer_tokens, tokens
+
+
+def _full_length(num_predict: Optional[int]) -> bool:
+    """Whether an answer was allowed the configured length; deadline-shortened answers are
+    not cached, or requests without a deadline would be served them."""
+    return num_predict is None or num_predict >= settings.llm_answer_tokens
+
+
+def _fallback_with_stages(
+    clock: StageClock, docs: List[Tuple[KnowledgeItem, float]], sources: List[ChatSource]
+) -> ChatResponse:
+    response = _fallback_response(docs, sources)
+    clock.record("fallback", "ok")
+    return response.model_copy(update={"stages": clock.stages})
+
+
+async def chat(
+    session: Session,
+    message: str,
+    top_k: int = 3,
+    priority: str = "normal",
+    deadline_ms: Optional[int] = None,
+) -> ChatResponse:
+    """Answer a chat message, reporting the stages that ran and their timings.
+
+    With ``deadline_ms``, generation gets whatever retrieval leaves of the budget: the
+    answer is capped to the tokens that fit, and when not even a short answer fits (or the
+    LLM overruns) the retrieval-only answer is returned instead. Raises ``QueueFull`` only
+    when the LLM queue is full and ``llm_queue_overflow`` is ``"reject"``.
+    """
+    clock = StageClock(deadline_ms)
+    context = await _prepare_chat(session, message, top_k)
+    clock.record("retrieval", "ok")
+    cached = context.cached_answer()
+    if cached is not None:
+        clock.record("answer_cache", "hit")
+        return cached.model_copy(update={"stages": clock.stages})
+    if context.cacheable:
+        clock.record("answer_cache", "miss")
+
+    prompt, sources = build_prompt(message, context.docs)
+    feasible, num_predict = _answer_budget(clock)
+    if not feasible:
+        clock.record("generation", "skipped")
+        return _fallback_with_stages(clock, context.docs, sources)
 
     try:
-        answer = await call_llm(prompt)
+        answer = await asyncio.wait_for(
+            call_llm_coalesced(prompt, PRIORITY_RANKS[priority], num_predict), clock.remaining()
+        )
         if not answer.strip():
             raise RuntimeError("Empty LLM response")
-        return ChatResponse(answer=answer.strip(), sources=sources, model=settings.llm_model)
+    except asyncio.TimeoutError:
+        clock.record("generation", "timeout")
+        return _fallback_with_stages(clock, context.docs, sources)
+    except QueueFull as exc:
+        clock.record("generation", "rejected")
+        response = _overflow_response(exc, context.docs, sources)
+        return response.model_copy(update={"stages": clock.stages})
     except Exception:
-        # Fallback: retrieval-only concise summary
-        if not docs:
-            return ChatResponse(
-                answer=(
-                    "I don't have enough context yet to answer that. Try asking about hypertrophy, "
-                    "strength, or beginner routines."
-                ),
-                sources=[],
-                model=None,
-            )
-        # Build a friendly summary from top docs
-        bullets = []
-        for doc, _ in docs[:2]:
-            bullets.append(f"- {doc.title}")
-        fallback = (
-            "Here’s a quick, evidence-based take based on what I have: \n" + "\n".join(bullets) +
-            "\n(Enable a local LLM like Ollama for a fuller, chatty answer with citations.)"
+        clock.record("generation", "failed")
+        return _fallback_with_stages(clock, context.docs, sources)
+
+    response = ChatResponse(answer=answer.strip(), sources=sources, model=settings.llm_model)
+    if _full_length(num_predict):
+        context.store(response)
+    clock.record("generation", "ok")
+    return response.model_copy(update={"stages": clock.stages})
+
+
+async def chat_stream(
+    session: Session,
+    message: str,
+    top_k: int = 3,
+    priority: str = "normal",
+    deadline_ms: Optional[int] = None,
+) -> AsyncIterator[ChatStreamEvent]:
+    """Streaming ``chat``: sources first, then answer tokens, then a ``done`` event with
+    time-to-first-token, total latency and stage timings.
+
+    Retrieval finishes before this returns, so the stream itself never touches the session.
+    Like ``chat``, raises ``QueueFull`` up front when the LLM queue would refuse the request,
+    and fits the answer to ``deadline_ms``.
+    """
+    clock = StageClock(deadline_ms)
+    rank = PRIORITY_RANKS[priority]
+    context = await _prepare_chat(session, message, top_k)
+    clock.record("retrieval", "ok")
+    # Looked up once here: every lookup counts towards the cache's hit/miss stats
+    cached = context.cached_answer()
+    if cached is None and settings.llm_queue_overflow == "reject":
+        if _llm_queue.would_refuse(rank):
+            raise QueueFull(_llm_queue.retry_after())
+    return _stream_answer(message, context, cached, clock, rank)
+
+
+def _elapsed_ms(started: float, until: Optional[float] = None) -> float:
+    return round(((until or time.perf_counter()) - started) * 1000, 3)
+
+
+async def _stream_answer(
+    message: str,
+    context: _ChatContext,
+    cached: Optional[ChatResponse],
+    clock: StageClock,
+    priority: int,
+) -> AsyncIterator[ChatStreamEvent]:
+    started = clock.started
+    if cached is not None:
+        clock.record("answer_cache", "hit")
+        yield ChatStreamEvent(type="sources", sources=cached.sources)
+        yield ChatStreamEvent(type="token", text=cached.answer)
+        elapsed = _elapsed_ms(started)
+        yield ChatStreamEvent(
+            type="done",
+            model=cached.model,
+            cached=True,
+            ttft_ms=elapsed,
+            total_ms=elapsed,
+            stages=clock.stages,
         )
-        return ChatResponse(answer=fallback, sources=sources, model=None)
+        return
+    if context.cacheable:
+        clock.record("answer_cache", "miss")
+
+    prompt, sources = build_prompt(message, context.docs)
+    yield ChatStreamEvent(type="sources", sources=sources)
+
+    parts: List[str] = []
+    first_token_at: Optional[float] = None
+    feasible, num_predict = _answer_budget(clock)
+    outcome = "skipped"
+    try:
+        if feasible:
+            outcome = "failed"
+            async with AsyncExitStack() as stack:
+                # Until the first token goes out a fallback can still replace the answer, so
+                # the deadline bounds the breaker, the queue wait and the first token
+                async with asyncio.timeout(clock.remaining()):
+                    await stack.enter_async_context(_llm_breaker.guard())
+                    await stack.enter_async_context(_llm_queue.slot(priority))
+                    tokens = stream_llm(prompt, num_predict=num_predict)
+                    stack.push_async_callback(tokens.aclose)
+                    token = await anext(tokens, None)
+                while token is not None:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    parts.append(token)
+                    yield ChatStreamEvent(type="token", text=token)
+                    token = await anext(tokens, None)
+            outcome = "ok"
+    except TimeoutError:
+        # Only raised before the first token (see above): nothing was sent yet
+        outcome = "timeout"
+    except QueueFull as exc:
+        outcome = "rejected"
+        # Lost the race for a place after the up-front check: the stream has started, so
+        # a refusal can only be reported in-band
+        if settings.llm_queue_overflow == "reject":
+            yield ChatStreamEvent(type="error", detail=str(exc))
+            return
+    except Exception:
+        if parts:
+            # Tokens already reached the client; a fallback answer cannot replace them
+            logger.warning("LLM stream interrupted", exc_info=True)
+            yield ChatStreamEvent(type="error", detail="LLM stream interrupted")
+            return
+        logger.debug("LLM stream unavailable; sending retrieval-only answer", exc_info=True)
+    clock.record("generation", outcome)
+
+    answer = "".join(parts).strip()
+    if answer:
+        model: Optional[str] = settings.llm_model
+        if _full_length(num_predict):
+            context.store(ChatResponse(answer=answer, sources=sources, model=model))
+    else:
+        fallback = _fallback_response(context.docs, sources)
+        first_token_at = time.perf_counter()
+        model = fallback.model
+        yield ChatStreamEvent(type="token", text=fallback.answer)
+        clock.record("fallback", "ok")
+
+    ttft_ms = _elapsed_ms(started, first_token_at)
+    total_ms = _elapsed_ms(started)
+    logger.info("Chat stream: first token %.1f ms, total %.1f ms", ttft_ms, total_ms)
+    yield ChatStreamEvent(
+        type="done",
+        model=model,
+        cached=False,
+        ttft_ms=ttft_ms,
+        total_ms=total_ms,
+        stages=clock.stages,
+    )
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import List
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import settings
+from backend.app.db.models import KnowledgeChunk, KnowledgeItem
+
+_CHUNKED_FIELDS = ("title", "content", "tags")
+
+
+def split_passages(text: str, max_chars: int = 500, overlap_chars: int = 100) -> List[str]:
+    """Split text into word-aligned passages of at most ``max_chars`` characters.
+
+    Consecutive passages share roughly ``overlap_chars`` of text so a sentence cut at a
+    boundary still appears whole in one of them. Works on unpunctuated transcripts too.
+    """
+    words = text.split()
+    passages: List[str] = []
+    start = 0
+    while start < len(words):
+        end = start + 1
+        length = len(words[start])
+        while end < len(words) and length + 1 + len(words[end]) <= max_chars:
+            length += 1 + len(words[end])
+            end += 1
+        passages.append(" ".join(words[start:end]))
+        if end == len(words):
+            break
+        # Step back over trailing words, always advancing at least one word
+        back = end
+        carried = 0
+        while back > start + 1 and carried + 1 + len(words[back - 1]) <= overlap_chars:
+            back -= 1
+            carried += 1 + len(words[back])
+        start = back
+    return passages
+
+
+def chunk_item(item: KnowledgeItem) -> None:
+    """Replace the item's passages with ones cut from its current content."""
+    item.chunks = [
+        KnowledgeChunk(position=position, content=passage)
+        for position, passage in enumerate(
+            split_passages(item.content, settings.chunk_chars, settings.chunk_overlap_chars)
+        )
+    ]
+
+
+def chunk_missing(session: Session) -> int:
+    """Chunk items stored before passages existed. Returns the number of items chunked."""
+    stmt = select(KnowledgeItem).where(~KnowledgeItem.chunks.any()).order_by(KnowledgeItem.id)
+    items = session.execute(stmt).scalars().all()
+    for item in items:
+        chunk_item(item)
+    session.commit()
+    return len(items)
+
+
+@event.listens_for(Session, "before_flush")
+def _rechunk_changed_items(session: Session, flush_context, instances) -> None:
+    # Re-chunk in the same flush as the item write, whichever code path made it. Title and
+    # tags are indexed with every passage, so changing them re-chunks too.
+    for obj in [*session.new, *session.dirty]:
+        if not isinstance(obj, KnowledgeItem):
+            continue
+        state = inspect(obj)
+        if state.pending or any(
+            state.attrs[name].history.has_changes() for name in _CHUNKED_FIELDS
+        ):
+            chunk_item(obj)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, Literal, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpen(Exception):
+    """The backend is considered down; the call was not attempted."""
+
+
+@dataclass
+class BreakerStats:
+    state: BreakerState
+    consecutive_failures: int
+    failure_threshold: int
+    reset_timeout_seconds: float
+    transitions: Dict[str, int]
+    short_circuited: int
+    last_error: Optional[str]
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker around calls to one backend.
+
+    ``failure_threshold`` consecutive failures open the circuit, and calls are refused with
+    ``CircuitOpen`` without touching the backend. While open, ``probe`` is retried in the
+    background every ``reset_timeout`` seconds; once it succeeds the circuit goes half-open
+    and a single trial call decides between closing it and opening it again. Without a
+    probe, the circuit goes half-open on the first call after ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        probe: Optional[Callable[[], Awaitable[object]]] = None,
+        failures: Tuple[Type[BaseException], ...] = (Exception,),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._probe = probe
+        self._failures = failures
+        self._clock = clock
+        self.state: BreakerState = "closed"
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._probe_task: Optional[asyncio.Task[None]] = None
+        self.transitions = {"opened": 0, "half_opened": 0, "closed": 0}
+        self.short_circuited = 0
+        self.last_error: Optional[str] = None
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """Run the body as one call through the breaker, raising ``CircuitOpen`` if refused."""
+        self.check()
+        trial = self.state == "half_open"
+        if trial:
+            self._trial_running = True
+        try:
+            yield
+        except self._failures as exc:
+            self.record_failure(exc)
+            raise
+        else:
+            self.record_success()
+        finally:
+            if trial:
+                self._trial_running = False
+
+    def check(self) -> None:
+        if self.state == "open":
+            if self._probe is None:
+                if self._clock() - self._opened_at >= self.reset_timeout:
+                    self._transition("half_open")
+            else:
+                self._ensure_probe()
+        if self.state == "open" or (self.state == "half_open" and self._trial_running):
+            self.short_circuited += 1
+            raise CircuitOpen(f"LLM circuit {self.state}; last error: {self.last_error}")
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state != "closed":
+            self._transition("closed")
+
+    def record_failure(self, exc: BaseException) -> None:
+        self.consecutive_failures += 1
+        self.last_error = f"{type(exc).__name__}: {exc}"
+        if self.state == "half_open" or (
+            self.state == "closed" and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._transition("open")
+        self._ensure_probe()
+
+    def _transition(self, state: BreakerState) -> None:
+        logger.warning("LLM circuit %s -> %s", self.state, state)
+        self.state = state
+        self.transitions[{"open": "opened", "half_open": "half_opened"}.get(state, state)] += 1
+
+    def _ensure_probe(self) -> None:
+        if self._probe is None:
+            return
+        task = self._probe_task
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # A probe left on a finished event loop is dead; start one on this loop
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._probe_task = loop.create_task(self._probe_until_healthy())
+
+    async def _probe_until_healthy(self) -> None:
+        assert self._probe is not None
+        while self.state == "open":
+            await asyncio.sleep(max(0.0, self._opened_at + self.reset_timeout - self._clock()))
+            if self.state != "open":
+                return
+            try:
+                await self._probe()
+            except Exception as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                self._opened_at = self._clock()
+            else:
+                self._transition("half_open")
+
+    def reset(self) -> None:
+        """Close the circuit and forget failures; counters are kept."""
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._trial_running = False
+        if self._probe_task is not None and not self._probe_task.done():
+            self._probe_task.cancel()
+        self._probe_task = None
+
+    def stats(self) -> BreakerStats:
+        return BreakerStats(
+            state=self.state,
+            consecutive_failures=self.consecutive_failures,
+            failure_threshold=self.failure_threshold,
+            reset_timeout_seconds=self.reset_timeout,
+            transitions=dict(self.transitions),
+            short_circuited=self.short_circuited,
+            last_error=self.last_error,
+        )
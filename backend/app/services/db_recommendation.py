@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import heapq
+from typing import Any, Callable, Iterator, List, Sequence, Set, Tuple
+
+from sqlalchemy import JSON, ColumnElement, Row, cast, func, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from backend.app.db.models import WorkoutTemplate as WorkoutTemplateRecord
+from backend.app.db.session import SessionLocal
+from backend.app.schemas.workout import (
+    RecommendationRequest,
+    RecommendationResponse,
+    WorkoutTemplate,
+)
+from backend.app.services.recommendation import BaseRecommender
+
+
+def _features(session: Session) -> Tuple[Any, ...]:
+    """Just the ranking inputs, extracted by the database: the full payload (training split,
+    notes) is only read and decoded for the templates that are returned."""
+    payload: ColumnElement[Any]
+    if session.get_bind().dialect.name == "postgresql":
+        # ``payload`` is TEXT there, and ``text -> 'key'`` does not exist: parse it first
+        payload = cast(WorkoutTemplateRecord.payload, JSONB)
+    else:
+        # SQLite and MySQL apply their JSON functions to text directly
+        payload = type_coerce(WorkoutTemplateRecord.payload, JSON)
+    return (
+        WorkoutTemplateRecord.id,
+        WorkoutTemplateRecord.experience_level,
+        payload["weekly_frequency_options"].label("weekly_frequency_options"),
+        payload["equipment"].label("equipment"),
+    )
+
+
+def table_signature(session_factory: Callable[[], Session] = SessionLocal) -> Tuple[int, int]:
+    """Row count and total payload length of ``workout_templates``.
+
+    Cheap to poll and shared by every worker; it moves on inserts and deletes, and on any
+    edit that changes a payload's length.
+    """
+    with session_factory() as session:
+        count, size = session.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(func.length(WorkoutTemplateRecord.payload)), 0),
+            )
+        ).one()
+    return count, size
+
+
+class DatabaseWorkoutRecommender(BaseRecommender):
+    """Recommend from the ``workout_templates`` table instead of an in-memory catalogue.
+
+    Goal and experience filters resolve to ``IN`` lists over their indexed columns, and rows
+    are streamed in batches carrying only the ranking fields extracted from ``payload``. The
+    full JSON is fetched and validated only for returned templates. Rows are visited in
+    ``id`` order.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = 500,
+    ) -> None:
+        super().__init__()
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+
+    @property
+    def template_count(self) -> int:
+        with self._session_factory() as session:
+            return session.scalar(select(func.count()).select_from(WorkoutTemplateRecord)) or 0
+
+    def recommend(self, request: RecommendationRequest) -> RecommendationResponse:
+        available = {item.lower() for item in request.equipment}
+        with self._session_factory() as session:
+            goals = self._matching_goals(session, request.goal)
+            levels = self._eligible_levels(session, request.experience_level)
+            features = _features(session)
+
+            match_ids: List[str] = []
+            total = 0
+            if goals and levels:
+                stmt = (
+                    select(*features)
+                    .where(
+                        WorkoutTemplateRecord.goal.in_(goals),
+                        WorkoutTemplateRecord.experience_level.in_(levels),
+                    )
+                    .order_by(WorkoutTemplateRecord.id)
+                )
+                for row in self._stream(session, stmt):
+                    if self._is_frequency_and_equipment_match(row, request, available):
+                        total += 1
+                        if len(match_ids) < 3:
+                            match_ids.append(row.id)
+
+            if total:
+                return self._exact_response(request, self._templates(session, match_ids), total)
+
+            stmt = select(*features).order_by(WorkoutTemplateRecord.id)
+            request_rank = self._experience_rank(request.experience_level)
+            best = heapq.nlargest(
+                3,
+                self._stream(session, stmt),
+                key=lambda row: self._score(row, request, available, request_rank),
+            )
+            return self._fallback_response(self._templates(session, [row.id for row in best]))
+
+    def _stream(self, session: Session, stmt: Any) -> Iterator[Row[Any]]:
+        return iter(session.execute(stmt.execution_options(yield_per=self._batch_size)))
+
+    @staticmethod
+    def _templates(session: Session, ids: Sequence[str]) -> List[WorkoutTemplate]:
+        payloads = dict(
+            session.execute(
+                select(WorkoutTemplateRecord.id, WorkoutTemplateRecord.payload).where(
+                    WorkoutTemplateRecord.id.in_(ids)
+                )
+            ).all()
+        )
+        return [WorkoutTemplate.model_validate_json(payloads[template_id]) for template_id in ids]
+
+    @staticmethod
+    def _matching_goals(session: Session, goal: str) -> List[str]:
+        wanted = goal.lower()
+        return [
+            stored
+            for stored in session.scalars(select(WorkoutTemplateRecord.goal).distinct())
+            if wanted in stored.lower() or stored.lower() in wanted
+        ]
+
+    @classmethod
+    def _eligible_levels(cls, session: Session, experience_level: str) -> List[str]:
+        request_rank = cls._experience_rank(experience_level)
+        return [
+            stored
+            for stored in session.scalars(
+                select(WorkoutTemplateRecord.experience_level).distinct()
+            )
+            if cls._experience_rank(stored) <= request_rank
+        ]
+
+    @staticmethod
+    def _equipment(row: Row[Any]) -> Set[str]:
+        return {item.lower() for item in row.equipment or []}
+
+    @classmethod
+    def _is_frequency_and_equipment_match(
+        cls, row: Row[Any], request: RecommendationRequest, available: Set[str]
+    ) -> bool:
+        if request.available_days not in (row.weekly_frequency_options or []):
+            return False
+        needed = cls._equipment(row)
+        if not needed:
+            return True
+        if not available:
+            return False
+        return len(needed & available) / len(needed) >= 0.6
+
+    @classmethod
+    def _score(
+        cls,
+        row: Row[Any],
+        request: RecommendationRequest,
+        available: Set[str],
+        request_rank: int,
+    ) -> float:
+        options = row.weekly_frequency_options or []
+        best_gap = min((abs(freq - request.available_days) for freq in options), default=4)
+        freq_gap = min(best_gap / 4.0, 1.0)
+
+        needed = cls._equipment(row)
+        if not needed:
+            equip_score = 1.0
+        elif not available:
+            equip_score = 0.0
+        else:
+            equip_score = len(needed & available) / len(needed)
+
+        experience_gap = abs(cls._experience_rank(row.experience_level) - request_rank)
+        return (1.0 - freq_gap) * 0.5 + equip_score * 0.35 + (1.0 - experience_gap * 0.4) * 0.15
+
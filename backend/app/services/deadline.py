@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional
+
+from backend.app.schemas.chat import ChatStage
+
+# Weight of the latest response in the moving averages
+_SMOOTHING = 0.2
+# Share of the remaining time planned for generation; the rest absorbs estimate error
+_HEADROOM = 0.9
+
+
+class GenerationEstimate:
+    """How long an answer of n tokens takes, learned from Ollama's response timings.
+
+    ``overhead_seconds`` covers model load and prompt evaluation; ``seconds_per_token`` is
+    the decode rate. The starting values are deliberately pessimistic (a 3B model on CPU),
+    so tight deadlines fall back to retrieval until real timings have been observed.
+    """
+
+    def __init__(self, overhead_seconds: float = 1.0, seconds_per_token: float = 0.05) -> None:
+        self.overhead_seconds = overhead_seconds
+        self.seconds_per_token = seconds_per_token
+
+    def observe(self, data: Dict[str, Any]) -> None:
+        # Durations in Ollama's final response are nanoseconds
+        total, decode, tokens = (
+            data.get("total_duration"),
+            data.get("eval_duration"),
+            data.get("eval_count"),
+        )
+        if not total or not decode or not tokens:
+            return
+        overhead = max(total - decode, 0) / 1e9
+        per_token = decode / tokens / 1e9
+        self.overhead_seconds += _SMOOTHING * (overhead - self.overhead_seconds)
+        self.seconds_per_token += _SMOOTHING * (per_token - self.seconds_per_token)
+
+    def max_tokens(self, seconds: float) -> int:
+        """Answer tokens that fit in ``seconds``; zero or less when not even the prompt does."""
+        return int((seconds * _HEADROOM - self.overhead_seconds) / self.seconds_per_token)
+
+
+class StageClock:
+    """Times consecutive stages of one chat request against an optional deadline."""
+
+    def __init__(self, deadline_ms: Optional[int] = None) -> None:
+        self.started = self._mark = time.perf_counter()
+        self.deadline = None if deadline_ms is None else self.started + deadline_ms / 1000
+        self.stages: List[ChatStage] = []
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (never negative), or None without one."""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.perf_counter(), 0.0)
+
+    def record(self, name: str, outcome: str) -> None:
+        """Close the stage that started at the previous record (or at creation)."""
+        now = time.perf_counter()
+        self.stages.append(
+            ChatStage(name=name, outcome=outcome, duration_ms=round((now - self._mark) * 1000, 3))
+        )
+        self._mark = now
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Engine, event, inspect, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import settings
+from backend.app.db.models import KnowledgeEmbedding, KnowledgeItem
+from backend.app.services.knowledge_version import get_knowledge_version
+from backend.app.services.llm_client import get_llm_sync_client
+
+logger = logging.getLogger(__name__)
+
+# Below this many rows a flat scan is already sub-millisecond; above it, build IVF lists.
+_IVF_MIN_ROWS = 4096
+_KMEANS_ITERATIONS = 8
+_KMEANS_SAMPLE_PER_LIST = 64
+_ASSIGN_CHUNK = 8192
+# Item fields the embedded text is built from
+_EMBEDDED_FIELDS = ("title", "content")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def embed_texts(texts: Sequence[str]) -> np.ndarray:
+    """Embed texts with the local Ollama embeddings endpoint; rows are L2-normalised."""
+    response = get_llm_sync_client().post(
+        settings.embedding_base_url,
+        json={"model": settings.embedding_model, "input": list(texts)},
+    )
+    response.raise_for_status()
+    # Ollama /api/embed returns {"embeddings": [[...], ...]} in input order
+    return _normalize(np.array(response.json()["embeddings"], dtype=np.float32))
+
+
+def embed_missing(session: Session, batch_size: int = 32) -> int:
+    """Embed knowledge items with no vector for the configured model. Returns the count."""
+    stmt = (
+        select(KnowledgeItem.id, KnowledgeItem.title, KnowledgeItem.content)
+        .outerjoin(KnowledgeEmbedding, KnowledgeEmbedding.item_id == KnowledgeItem.id)
+        .where(
+            or_(
+                KnowledgeEmbedding.item_id.is_(None),
+                KnowledgeEmbedding.model != settings.embedding_model,
+            )
+        )
+        .order_by(KnowledgeItem.id)
+    )
+    rows = session.execute(stmt).all()
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        vectors = embed_texts([f"{title}\n{content}" for _, title, content in batch])
+        for (item_id, _, _), vector in zip(batch, vectors, strict=True):
+            session.merge(
+                KnowledgeEmbedding(
+                    item_id=item_id,
+                    model=settings.embedding_model,
+                    dim=int(vector.shape[0]),
+                    vector=vector.astype("<f4").tobytes(),
+                )
+            )
+        session.commit()
+    return len(rows)
+
+
+@event.listens_for(Session, "before_flush")
+def _drop_stale_embeddings(session: Session, flush_context, instances) -> None:
+    # An item rewritten in place (re-ingest) would keep the vector of its old text;
+    # dropping it in the same flush puts the item back in front of embed_missing.
+    changed = [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, KnowledgeItem)
+        and any(inspect(obj).attrs[name].history.has_changes() for name in _EMBEDDED_FIELDS)
+    ]
+    if not changed or not inspect(session.connection()).has_table(
+        KnowledgeEmbedding.__tablename__
+    ):
+        return
+    for obj in changed:
+        with session.no_autoflush:
+            embedding = session.get(KnowledgeEmbedding, obj.id)
+        if embedding is not None:
+            session.delete(embedding)
+
+
+def _kmeans(vectors: np.ndarray, lists: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means fitted on a sample; returns (centroids, assignment of every row)."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), lists * _KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, lists, replace=False)].copy()
+    for _ in range(_KMEANS_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.bincount(assignment, minlength=lists) == 0
+        # Empty lists keep their previous centroid rather than collapsing to zero
+        centroids = np.where(empty[:, None], centroids, _normalize(sums))
+    assignment = np.concatenate(
+        [
+            np.argmax(vectors[start : start + _ASSIGN_CHUNK] @ centroids.T, axis=1)
+            for start in range(0, len(vectors), _ASSIGN_CHUNK)
+        ]
+    )
+    return centroids, assignment
+
+
+class VectorIndex:
+    """Cosine-similarity search over knowledge item embeddings.
+
+    Rows are optionally held as int8 codes with a per-row scale, a quarter of the float32
+    footprint. Large indexes are partitioned into inverted lists around k-means centroids
+    and a query scans only the ``probe`` nearest lists; small ones are scanned in full.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[int],
+        vectors: np.ndarray,
+        quantize: bool = True,
+        probe: int = 16,
+        seed: int = 0,
+    ) -> None:
+        ids_array = np.asarray(ids, dtype=np.int64)
+        if len(ids_array):
+            vectors = _normalize(vectors).reshape(len(ids_array), -1)
+        else:
+            # No embeddings yet (fresh database or missing table): an empty index
+            vectors = np.zeros((0, 0), dtype=np.float32)
+        self.probe = probe
+        self._centroids: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        if len(ids_array) >= _IVF_MIN_ROWS:
+            lists = int(np.sqrt(len(ids_array)))
+            centroids, assignment = _kmeans(vectors, lists, seed)
+            # Store rows grouped by list so probing a list is a contiguous slice
+            order = np.argsort(assignment, kind="stable")
+            ids_array, vectors = ids_array[order], vectors[order]
+            counts = np.bincount(assignment, minlength=lists)
+            self._offsets = np.concatenate(([0], np.cumsum(counts)))
+            self._centroids = centroids
+        self._ids = ids_array
+        self._scales: Optional[np.ndarray] = None
+        if quantize:
+            scales = np.maximum(np.abs(vectors).max(axis=1, initial=0.0), 1e-12) / 127.0
+            self._codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+            self._scales = scales.astype(np.float32)
+        else:
+            self._codes = vectors
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self._codes.nbytes + (self._scales.nbytes if self._scales is not None else 0)
+
+    def _probe_slices(self, query: np.ndarray) -> List[slice]:
+        if self._centroids is None or self._offsets is None or self.probe >= len(self._centroids):
+            return [slice(0, len(self._ids))]
+        nearest = np.argpartition(-(self._centroids @ query), self.probe - 1)[: self.probe]
+        offsets = self._offsets
+        return [slice(offsets[i], offsets[i + 1]) for i in np.sort(nearest)]
+
+    def _score_slice(self, rows: slice, query: np.ndarray) -> np.ndarray:
+        # Contiguous slices avoid a fancy-index gather of the probed rows
+        scores = self._codes[rows].astype(np.float32, copy=False) @ query
+        if self._scales is not None:
+            scores *= self._scales[rows]
+        return scores
+
+    def search(self, query: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
+        """Return up to ``top_k`` (item id, cosine similarity) pairs, best first."""
+        if not len(self._ids) or top_k <= 0:
+            return []
+        query = _normalize(query)
+        probed = self._probe_slices(query)
+        scores = np.concatenate([self._score_slice(rows, query) for rows in probed])
+        ids = np.concatenate([self._ids[rows] for rows in probed])
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [
+            (int(doc_id), float(score))
+            for doc_id, score in zip(ids[best], scores[best], strict=True)
+        ]
+
+
+def _load_index(session: Session) -> VectorIndex:
+    ids: List[int] = []
+    vectors: List[np.ndarray] = []
+    try:
+        rows = session.execute(
+            select(KnowledgeEmbedding.item_id, KnowledgeEmbedding.vector)
+            .where(KnowledgeEmbedding.model == settings.embedding_model)
+            .order_by(KnowledgeEmbedding.item_id)
+            .execution_options(yield_per=1000)
+        )
+        for item_id, blob in rows:
+            ids.append(item_id)
+            vectors.append(np.frombuffer(blob, dtype="<f4"))
+    except SQLAlchemyError:
+        # No embeddings table in this database; vector ranking stays empty
+        session.rollback()
+        ids, vectors = [], []
+    matrix = np.stack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+    return VectorIndex(
+        ids, matrix, quantize=settings.embedding_quantize, probe=settings.embedding_probe_lists
+    )
+
+
+_indexes: Dict[str, Tuple[Optional[int], VectorIndex]] = {}
+_build_locks: Dict[str, threading.Lock] = {}
+# Background rebuild per database, kept so callers (and tests) can join it
+_rebuilds: Dict[str, threading.Thread] = {}
+_locks_lock = threading.Lock()
+
+
+def _build_index(session: Session, key: str, version: Optional[int]) -> VectorIndex:
+    with _locks_lock:
+        lock = _build_locks.setdefault(key, threading.Lock())
+    with lock:
+        current = _indexes.get(key)
+        if current is None or current[0] != version:
+            current = (version, _load_index(session))
+            _indexes[key] = current
+            logger.info("Built vector index over %d knowledge items", len(current[1]))
+        return current[1]
+
+
+def _rebuild_in_background(bind: Engine, key: str, version: Optional[int]) -> None:
+    try:
+        with Session(bind=bind) as session:
+            _build_index(session, key, version)
+    except Exception:
+        logger.exception("Rebuilding the vector index failed; the previous one stays in use")
+
+
+def get_vector_index(session: Session, version: Optional[int]) -> VectorIndex:
+    """Return the index for the session's database.
+
+    Only the first build runs in the caller. When the knowledge version moves, the index is
+    reloaded (and re-clustered) on a background thread while searches use the previous one.
+    """
+    bind = session.get_bind()
+    key = str(bind.url)
+    current = _indexes.get(key)
+    if current is None:
+        return _build_index(session, key, version)
+    if current[0] != version:
+        with _locks_lock:
+            rebuild = _rebuilds.get(key)
+            if rebuild is None or not rebuild.is_alive():
+                rebuild = threading.Thread(
+                    target=_rebuild_in_background,
+                    args=(bind, key, version),
+                    name="vector-index",
+                    daemon=True,
+                )
+                _rebuilds[key] = rebuild
+                rebuild.start()
+    return current[1]
+
+
+def warm_vector_index(session: Session) -> None:
+    """Build the index up front when hybrid retrieval is enabled."""
+    if settings.embedding_enabled:
+        get_vector_index(session, get_knowledge_version(session))
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from backend.app.db.models import KnowledgeChunk, KnowledgeItem
+from backend.app.services import chunking  # noqa: F401  (registers the re-chunk listener)
+from backend.app.services.knowledge_version import get_knowledge_version, written_versions
+
+STOPWORDS = {
+    "the",
+    "is",
+    "a",
+    "an",
+    "and",
+    "or",
+    "of",
+    "to",
+    "in",
+    "for",
+    "on",
+    "with",
+    "at",
+    "by",
+    "what",
+    "who",
+    "when",
+    "how",
+    "why",
+    "are",
+    "his",
+    "her",
+    "their",
+}
+
+_TOKEN_RE = re.compile(r"[a-zA-Z][a-zA-Z\-]{1,}\b")
+_PENDING_KEY = "knowledge_index_pending"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords and very short tokens removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and len(t) > 2]
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring over knowledge passages.
+
+    Only term frequencies and document lengths are kept; callers load the winning rows
+    by primary key. Scores are positive and higher is better.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._doc_terms: Dict[int, Counter[str]] = {}
+        self._doc_lengths: Dict[int, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.built = False
+        # Knowledge version the contents were loaded at (None: no version counter)
+        self.version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def upsert(self, doc_id: int, title: str, content: str, tags: Optional[str]) -> None:
+        terms = Counter(tokenize(" ".join(filter(None, [title, content, tags]))))
+        with self._lock:
+            self._remove_locked(doc_id)
+            self._add_locked(doc_id, terms)
+
+    def _add_locked(self, doc_id: int, terms: Counter[str]) -> None:
+        length = sum(terms.values())
+        self._doc_terms[doc_id] = terms
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+        for term, freq in terms.items():
+            self._postings[term][doc_id] = freq
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: int) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def rebuild(
+        self,
+        items: Iterable[Tuple[int, str, str, Optional[str]]],
+        version: Optional[int] = None,
+    ) -> None:
+        """Replace the contents; searches keep using the old postings until the swap."""
+        fresh = BM25Index(self.k1, self.b)
+        for doc_id, title, content, tags in items:
+            fresh.upsert(doc_id, title, content, tags)
+        with self._lock:
+            self._postings = fresh._postings
+            self._doc_terms = fresh._doc_terms
+            self._doc_lengths = fresh._doc_lengths
+            self._total_length = fresh._total_length
+        self.version = version
+        self.built = True
+
+    def search(self, terms: Iterable[str], top_k: int) -> List[Tuple[int, float]]:
+        with self._lock:
+            doc_count = len(self._doc_terms)
+            if not doc_count:
+                return []
+            avg_length = self._total_length / doc_count or 1.0
+            scores: Dict[int, float] = defaultdict(float)
+            for term in set(terms):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1.0 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, freq in postings.items():
+                    length = self._doc_lengths[doc_id]
+                    norm = self.k1 * (1.0 - self.b + self.b * length / avg_length)
+                    scores[doc_id] += idf * freq * (self.k1 + 1.0) / (freq + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[int]], k: int = 60
+) -> List[Tuple[int, float]]:
+    """Fuse ranked id lists by summing ``1 / (k + rank)``; ties keep first-seen order."""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+_indexes: Dict[str, BM25Index] = {}
+_indexes_lock = threading.Lock()
+
+
+def _bind_key(session: Session) -> str:
+    return str(session.get_bind().url)
+
+
+def get_knowledge_index(session: Session, version: Optional[int] = None) -> BM25Index:
+    """Return the index for the session's database, rebuilt when the knowledge version moves.
+
+    Commits in this process reach the index through the listeners below; writes from ingest
+    scripts or other workers only show up as a new version. While one thread rebuilds,
+    others keep searching the previous contents.
+    """
+    key = _bind_key(session)
+    with _indexes_lock:
+        index = _indexes.setdefault(key, BM25Index())
+    if index.built and (version is None or index.version == version):
+        return index
+    if not index.build_lock.acquire(blocking=not index.built):
+        return index
+    try:
+        if not index.built or (version is not None and index.version != version):
+            rows = session.execute(
+                select(
+                    KnowledgeChunk.id,
+                    KnowledgeItem.title,
+                    KnowledgeChunk.content,
+                    KnowledgeItem.tags,
+                )
+                .join(KnowledgeChunk.item)
+                .execution_options(yield_per=500)
+            )
+            index.rebuild((tuple(row) for row in rows), version)
+    finally:
+        index.build_lock.release()
+    return index
+
+
+def warm_knowledge_index(session: Session) -> None:
+    """Build the index up front when retrieval will need it (no FTS5 table present), so the
+    first request does not pay for the full build."""
+    if not inspect(session.get_bind()).has_table("knowledge_chunks_fts"):
+        get_knowledge_index(session, get_knowledge_version(session))
+
+
+# Keep built indexes in step with ORM writes to passages (see chunking). Changes are staged
+# per session and only applied once the transaction commits, so rolled-back writes never
+# reach the index.
+
+
+def _stage(target: KnowledgeChunk, deleted: bool) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    if deleted:
+        pending[target.id] = None
+    else:
+        pending[target.id] = (target.item.title, target.content, target.item.tags)
+
+
+@event.listens_for(KnowledgeChunk, "after_insert")
+@event.listens_for(KnowledgeChunk, "after_update")
+def _stage_upsert(mapper, connection, target: KnowledgeChunk) -> None:
+    _stage(target, deleted=False)
+
+
+@event.listens_for(KnowledgeChunk, "after_delete")
+def _stage_delete(mapper, connection, target: KnowledgeChunk) -> None:
+    _stage(target, deleted=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None) or {}
+    index = _indexes.get(_bind_key(session))
+    if index is None or not index.built:
+        return
+    for doc_id, fields in pending.items():
+        if fields is None:
+            index.remove(doc_id)
+        else:
+            index.upsert(doc_id, *fields)
+    # The index now matches what this commit wrote. If it already matched the version the
+    # commit started from, move it along so the next search does not rebuild; otherwise it
+    # also misses writes from elsewhere and the version check rebuilds it.
+    written = written_versions(session)
+    if written is not None and index.version is not None and index.version == written[0]:
+        index.version = written[1]
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+from sqlalchemy import Connection, event, insert, inspect, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from backend.app.db.models import (
+    KnowledgeChunk,
+    KnowledgeEmbedding,
+    KnowledgeItem,
+    KnowledgeVersion,
+)
+
+_ROW_ID = 1
+# session.info key: (version before, version after) the current transaction's ORM writes
+_WRITTEN_KEY = "knowledge_versions_written"
+
+
+def get_knowledge_version(session: Session) -> Optional[int]:
+    """Current knowledge base version, or None when the counter table is unavailable."""
+    try:
+        version = session.execute(
+            select(KnowledgeVersion.version).where(KnowledgeVersion.id == _ROW_ID)
+        ).scalar_one_or_none()
+    except SQLAlchemyError:
+        session.rollback()
+        return None
+    return version or 0
+
+
+def bump_knowledge_version(connection: Connection) -> Optional[int]:
+    """Increment the counter inside the caller's transaction and return the new version
+    (no-op returning None without the table)."""
+    if not inspect(connection).has_table(KnowledgeVersion.__tablename__):
+        return None
+    result = connection.execute(
+        update(KnowledgeVersion)
+        .where(KnowledgeVersion.id == _ROW_ID)
+        .values(version=KnowledgeVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(KnowledgeVersion).values(id=_ROW_ID, version=1))
+        return 1
+    return connection.execute(
+        select(KnowledgeVersion.version).where(KnowledgeVersion.id == _ROW_ID)
+    ).scalar_one()
+
+
+def written_versions(session: Session) -> Optional[Tuple[int, int]]:
+    """(version before, version after) this session's ORM knowledge writes in the current
+    transaction, or None when it made none. Still readable in ``after_commit`` listeners."""
+    return session.info.get(_WRITTEN_KEY)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_on_knowledge_writes(session: Session, flush_context, instances) -> None:
+    # Any ORM write to knowledge items, passages or embeddings (API or ingestion scripts) moves
+    # the version, in the same transaction as the write itself.
+    changed = (*session.new, *session.dirty, *session.deleted)
+    if any(isinstance(obj, (KnowledgeItem, KnowledgeChunk, KnowledgeEmbedding)) for obj in changed):
+        version = bump_knowledge_version(session.connection())
+        if version is not None:
+            before, _ = session.info.get(_WRITTEN_KEY, (version - 1, None))
+            session.info[_WRITTEN_KEY] = (before, version)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_written_versions(session: Session, transaction) -> None:
+    # Runs after after_commit/after_rollback, so commit listeners can still read the range
+    if transaction.parent is None:
+        session.info.pop(_WRITTEN_KEY, None)
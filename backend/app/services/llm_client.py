@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Optional
+
+import httpx
+
+from backend.app.core.config import settings
+
+# One pooled keep-alive client per process for Ollama calls (generation, embeddings), so
+# requests reuse open connections instead of paying a TCP handshake each time.
+
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds)
+
+
+def get_llm_client() -> httpx.AsyncClient:
+    """Shared async client for the running event loop.
+
+    Pooled connections belong to the loop that opened them, so a caller on another loop
+    (a script's second ``asyncio.run``) gets a fresh client rather than dead connections.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+        _async_client_loop = loop
+    return _async_client
+
+
+def get_llm_sync_client() -> httpx.Client:
+    """Shared thread-safe client for synchronous callers (embeddings on the retrieval pool)."""
+    global _sync_client
+    client = _sync_client
+    if client is None or client.is_closed:
+        with _sync_lock:
+            if _sync_client is None or _sync_client.is_closed:
+                _sync_client = httpx.Client(limits=_limits(), timeout=_timeout())
+            client = _sync_client
+    return client
+
+
+async def close_llm_clients() -> None:
+    """Close the shared clients; the next call opens new ones."""
+    global _async_client, _async_client_loop, _sync_client
+    async_client, loop = _async_client, _async_client_loop
+    _async_client, _async_client_loop = None, None
+    # Connections opened on another (finished) loop cannot be closed from this one
+    if async_client is not None and loop is asyncio.get_running_loop():
+        await async_client.aclose()
+    with _sync_lock:
+        sync_client, _sync_client = _sync_client, None
+    if sync_client is not None:
+        sync_client.close()
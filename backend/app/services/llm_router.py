@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Sequence
+from urllib.parse import urljoin
+
+import httpx
+
+from backend.app.core.config import settings
+from backend.app.services.llm_client import get_llm_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LLMBackend:
+    url: str
+    healthy: bool = True
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+
+
+def health_url(generate_url: str) -> str:
+    # Ollama's model list: cheap, and only answers when the server is up
+    return urljoin(generate_url, "/api/tags")
+
+
+def _marks_unhealthy(exc: httpx.HTTPError) -> bool:
+    # A 4xx (unknown model, bad payload) is our request's fault, not the server's
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return True
+
+
+class LLMRouter:
+    """Spread LLM calls across Ollama servers, sending each to the one with the fewest
+    requests in flight.
+
+    A server that fails a call is taken out of rotation until a health check finds it
+    answering again. If every server is out, all of them are tried rather than none.
+    """
+
+    def __init__(self, urls: Sequence[str]) -> None:
+        self.backends = [LLMBackend(url) for url in urls]
+        self._turn = 0
+
+    def _pick(self) -> LLMBackend:
+        candidates = [b for b in self.backends if b.healthy] or self.backends
+        # Start the scan at a rotating offset so ties spread out instead of hitting the first
+        start = self._turn % len(candidates)
+        self._turn += 1
+        return min(candidates[start:] + candidates[:start], key=lambda b: b.in_flight)
+
+    @asynccontextmanager
+    async def backend(self) -> AsyncIterator[str]:
+        """Reserve the least-loaded backend for one call; yields its generate URL."""
+        backend = self._pick()
+        backend.in_flight += 1
+        backend.requests += 1
+        try:
+            yield backend.url
+        except httpx.HTTPError as exc:
+            backend.failures += 1
+            if _marks_unhealthy(exc) and backend.healthy:
+                logger.warning("LLM backend %s out of rotation: %s", backend.url, exc)
+                backend.healthy = False
+            raise
+        finally:
+            backend.in_flight -= 1
+
+    async def check_health(self) -> int:
+        """Probe every backend and update rotation. Returns the number of healthy ones."""
+        results = await asyncio.gather(*(self._check(b) for b in self.backends))
+        return sum(results)
+
+    async def _check(self, backend: LLMBackend) -> bool:
+        try:
+            resp = await get_llm_client().get(
+                health_url(backend.url), timeout=settings.llm_connect_timeout_seconds
+            )
+            resp.raise_for_status()
+            healthy = True
+        except httpx.HTTPError:
+            healthy = False
+        if healthy != backend.healthy:
+            logger.warning(
+                "LLM backend %s %s rotation", backend.url, "back in" if healthy else "out of"
+            )
+        backend.healthy = healthy
+        return healthy
+
+    async def run_health_checks(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.check_health()
+
+    def stats(self) -> List[LLMBackend]:
+        return [LLMBackend(**vars(b)) for b in self.backends]
+
+
+llm_router = LLMRouter(settings.llm_backends or [settings.llm_base_url])
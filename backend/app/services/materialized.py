@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from backend.app.schemas.workout import RecommendationRequest
+from backend.app.services.recommendation import Selection, WorkoutRecommender
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+DAYS = range(2, 8)
+# One representative label per experience rank; any label maps onto one of these.
+RANK_LABELS = {0: "beginner", 1: "intermediate", 2: "advanced"}
+
+MaterializedKey = Tuple[str, int, int, int]
+
+_worker_recommender: Optional[WorkoutRecommender] = None
+
+
+def _init_worker(data_path: str) -> None:
+    global _worker_recommender
+    _worker_recommender = WorkoutRecommender(data_path=Path(data_path))
+
+
+def _materialize_partition(goal: str, rank: int) -> List[list]:
+    recommender = _worker_recommender
+    assert recommender is not None, "worker not initialised"
+    rows: List[list] = []
+    for days in DAYS:
+        request = RecommendationRequest(
+            goal=goal, experience_level=RANK_LABELS[rank], available_days=days
+        )
+        for mask in range(1 << len(recommender._vocabulary)):
+            total, positions = recommender._select_live(request, mask)
+            rows.append([goal, rank, days, mask, total, list(positions)])
+    return rows
+
+
+class MaterializedRecommendations:
+    """Precomputed selections for every (goal, experience rank, days, equipment mask).
+
+    Keys use the catalogue's own goals, so unseen goal strings miss and are ranked live.
+    The table records the SHA-256 of the catalogue it was built from and is ignored when
+    that no longer matches.
+    """
+
+    def __init__(self, source_hash: str, entries: Dict[MaterializedKey, Selection]) -> None:
+        self.source_hash = source_hash
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, goal: str, rank: int, days: int, mask: int) -> Optional[Selection]:
+        return self._entries.get((goal, rank, days, mask))
+
+    @classmethod
+    def build(
+        cls,
+        data_path: Path,
+        workers: Optional[int] = None,
+        max_equipment_items: int = 12,
+    ) -> MaterializedRecommendations:
+        """Enumerate the request domain, one (goal, rank) partition per worker task."""
+        recommender = WorkoutRecommender(data_path=data_path)
+        vocabulary_size = len(recommender._vocabulary)
+        if vocabulary_size > max_equipment_items:
+            raise ValueError(
+                f"{vocabulary_size} equipment items would need {1 << vocabulary_size} "
+                f"combinations per point; limit is {max_equipment_items} items"
+            )
+
+        goals = sorted({template.goal.lower() for template in recommender._templates})
+        partitions = [(goal, rank) for goal in goals for rank in RANK_LABELS]
+        entries: Dict[MaterializedKey, Selection] = {}
+        with ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(str(data_path),),
+            # Builds also run from a thread of the live server; forking a multi-threaded
+            # process can copy locks held by other threads into the workers
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            for rows in pool.map(_materialize_partition, *zip(*partitions, strict=True)):
+                for goal, rank, days, mask, total, positions in rows:
+                    entries[(goal, rank, days, mask)] = (total, tuple(positions))
+        return cls(recommender.source_hash, entries)
+
+    def save(self, path: Path) -> None:
+        document = {
+            "version": FORMAT_VERSION,
+            "source_sha256": self.source_hash,
+            "entries": [
+                [goal, rank, days, mask, total, list(positions)]
+                for (goal, rank, days, mask), (total, positions) in self._entries.items()
+            ],
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(document, separators=(",", ":")), encoding="utf-8")
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, source_hash: str) -> Optional[MaterializedRecommendations]:
+        """Load the table, or return None when it is missing or built from another source."""
+        if not path.exists():
+            return None
+        with path.open("r", encoding="utf-8") as handle:
+            document = json.load(handle)
+        if document.get("version") != FORMAT_VERSION:
+            logger.warning("Ignoring %s: unsupported format version", path)
+            return None
+        if document.get("source_sha256") != source_hash:
+            logger.warning("Ignoring %s: built from a different catalogue", path)
+            return None
+        entries: Dict[MaterializedKey, Selection] = {
+            (goal, rank, days, mask): (total, tuple(positions))
+            for goal, rank, days, mask, total, positions in document["entries"]
+        }
+        return cls(source_hash, entries)
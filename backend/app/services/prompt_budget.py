@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import itertools
+import re
+from typing import List, Sequence, Tuple
+
+# Word pieces of up to four characters, or single punctuation marks: close to what a BPE
+# tokenizer produces for English prose (~4 characters per token), at regex speed.
+_TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+
+_ELLIPSIS = "..."
+
+
+def approx_tokens(text: str) -> int:
+    """Approximate model token count of ``text``."""
+    return sum(1 for _ in _TOKEN_PATTERN.finditer(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to about ``max_tokens`` tokens (ellipsis included) at a word boundary."""
+    if max_tokens <= 0:
+        return ""
+    pieces = list(itertools.islice(_TOKEN_PATTERN.finditer(text), max_tokens + 1))
+    if len(pieces) <= max_tokens:
+        return text
+    keep = max(max_tokens - approx_tokens(_ELLIPSIS), 1)
+    end = pieces[keep - 1].end()
+    cut = text[:end]
+    if text[end].isalnum():
+        # Drop the trailing partial word unless it is the only one
+        head, space, _ = cut.rpartition(" ")
+        if space and head.strip():
+            cut = head
+    return cut.rstrip() + _ELLIPSIS
+
+
+def pack_passages(
+    passages: Sequence[Tuple[str, str]], budget: int, min_tokens: int = 32
+) -> List[str]:
+    """Number and pack ``(title, text)`` passages, best first, into ``budget`` tokens.
+
+    Packing stops at the first passage that does not fit whole; it is cut to the space
+    left if that is at least ``min_tokens``, so numbering always runs 1..n without gaps.
+    """
+    blocks: List[str] = []
+    remaining = budget
+    for number, (title, text) in enumerate(passages, start=1):
+        header = f"[{number}] Title: {title}\n"
+        body = text.strip()
+        cost = approx_tokens(header) + approx_tokens(body)
+        if cost <= remaining:
+            blocks.append(header + body)
+            remaining -= cost
+            continue
+        room = remaining - approx_tokens(header)
+        if room >= min_tokens:
+            blocks.append(header + truncate_tokens(body, room))
+        break
+    return blocks
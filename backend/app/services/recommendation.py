@@ -1,9 +1,24 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from dataclasses import dataclass
+from abc import ABC, abstractmethod
+from collections import defaultdict
 from pathlib import Path
-from typing import List
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
 
 from backend.app.core.config import settings
 from backend.app.schemas.workout import (
@@ -11,6 +26,16 @@ from backend.app.schemas.workout import (
     RecommendationResponse,
     WorkoutTemplate,
 )
+from backend.app.services.cache import CacheStats, TTLCache
+from backend.app.services.snapshot import read_snapshot, write_snapshot
+from backend.app.services.template_store import TemplateRecord
+
+if TYPE_CHECKING:
+    from backend.app.services.materialized import MaterializedRecommendations
+
+_MASK_WORD_BITS = 64
+# Padding for ragged frequency options; far enough away that the gap saturates.
+_FREQUENCY_PAD = 1000
 
 _EXPERIENCE_RANK = {
     "beginner": 0,
@@ -20,127 +45,370 @@ _EXPERIENCE_RANK = {
 }
 
 
-@dataclass
-class RankedTemplate:
-    template: WorkoutTemplate
-    score: float
+def _experience_rank(label: str) -> int:
+    return _EXPERIENCE_RANK.get(label.lower(), 1)
 
 
-class WorkoutRecommender:
-    """Recommend workout templates based on simple heuristic ranking."""
+def _mask_bits(mask: int) -> Iterable[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
 
-    def __init__(self, data_path: Path | None = None) -> None:
-        self.data_path = data_path or settings.data_path
-        self._templates = self._load_templates(self.data_path)
+
+Selection = Tuple[int, Tuple[int, ...]]
+
+
+class EquipmentVocabulary:
+    """Interned equipment names, each mapped to one bit of an integer mask."""
+
+    def __init__(self) -> None:
+        self._bits: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._bits)
+
+    def intern(self, items: Iterable[str]) -> int:
+        """Build a mask for catalogue equipment, assigning bits to unseen names."""
+        mask = 0
+        for item in items:
+            key = item.lower()
+            bit = self._bits.get(key)
+            if bit is None:
+                bit = self._bits[key] = len(self._bits)
+            mask |= 1 << bit
+        return mask
+
+    def mask(self, items: Iterable[str]) -> int:
+        """Build a mask for request equipment; names no template uses are dropped."""
+        mask = 0
+        for item in items:
+            bit = self._bits.get(item.lower())
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+
+class TemplateIndex:
+    """Inverted index over templates keyed by goal, experience, frequency and equipment.
+
+    Postings hold template positions so candidates keep catalogue order, which keeps
+    results identical to a linear scan over the templates.
+    """
+
+    def __init__(
+        self, templates: Sequence[TemplateRecord], equipment_masks: Sequence[int]
+    ) -> None:
+        self.by_goal: Dict[str, Set[int]] = defaultdict(set)
+        self.by_experience: Dict[int, Set[int]] = defaultdict(set)
+        self.by_frequency: Dict[int, Set[int]] = defaultdict(set)
+        self.by_equipment: Dict[int, Set[int]] = defaultdict(set)
+        self.equipment_free: Set[int] = set()
+
+        for position, (template, mask) in enumerate(
+            zip(templates, equipment_masks, strict=True)
+        ):
+            self.by_goal[template.goal.lower()].add(position)
+            self.by_experience[_experience_rank(template.experience_level)].add(position)
+            for freq in template.weekly_frequency_options:
+                self.by_frequency[freq].add(position)
+            if not mask:
+                self.equipment_free.add(position)
+            for bit in _mask_bits(mask):
+                self.by_equipment[bit].add(position)
+
+    def candidates(self, request: RecommendationRequest, request_mask: int) -> List[int]:
+        """Return positions passing goal, experience and frequency filters, and
+        sharing at least one equipment item (or needing none)."""
+        request_goal = request.goal.lower()
+        goal_postings: Set[int] = set()
+        for goal, postings in self.by_goal.items():
+            if request_goal in goal or goal in request_goal:
+                goal_postings |= postings
+
+        request_rank = _experience_rank(request.experience_level)
+        experience_postings: Set[int] = set()
+        for rank, postings in self.by_experience.items():
+            if rank <= request_rank:
+                experience_postings |= postings
+
+        equipment_postings = set(self.equipment_free)
+        for bit in _mask_bits(request_mask):
+            equipment_postings |= self.by_equipment.get(bit, set())
+
+        postings_lists = sorted(
+            [
+                goal_postings,
+                experience_postings,
+                self.by_frequency.get(request.available_days, set()),
+                equipment_postings,
+            ],
+            key=len,
+        )
+        matches = set(postings_lists[0])
+        for postings in postings_lists[1:]:
+            if not matches:
+                break
+            matches &= postings
+        return sorted(matches)
+
+
+class ScoringEngine:
+    """Columnar copy of the ranking features, scored for every template in one pass.
+
+    Equipment masks are split into 64-bit words so the vocabulary can grow past 64 items.
+    """
+
+    def __init__(
+        self,
+        templates: Sequence[TemplateRecord],
+        equipment_masks: Sequence[int],
+        vocabulary_size: int,
+    ) -> None:
+        count = len(templates)
+        width = max((len(t.weekly_frequency_options) for t in templates), default=1) or 1
+        self.frequency_options = np.full((count, width), _FREQUENCY_PAD, dtype=np.int16)
+        for row, template in enumerate(templates):
+            options = template.weekly_frequency_options
+            self.frequency_options[row, : len(options)] = options
+
+        self.words = max(1, -(-vocabulary_size // _MASK_WORD_BITS))
+        self.equipment_masks = np.array(
+            [self._split_mask(mask) for mask in equipment_masks], dtype=np.uint64
+        ).reshape(count, self.words)
+        self.equipment_counts = np.bitwise_count(self.equipment_masks).sum(axis=1)
+        self.experience_ranks = np.array(
+            [_experience_rank(t.experience_level) for t in templates], dtype=np.int8
+        )
+
+    def _split_mask(self, mask: int) -> List[int]:
+        word = (1 << _MASK_WORD_BITS) - 1
+        return [(mask >> (i * _MASK_WORD_BITS)) & word for i in range(self.words)]
+
+    def scores(self, available_days: int, request_mask: int, request_rank: int) -> np.ndarray:
+        best_gap = np.abs(self.frequency_options - available_days).min(axis=1)
+        freq_gap = np.minimum(best_gap / 4.0, 1.0)
+
+        if request_mask:
+            request_words = np.array(self._split_mask(request_mask), dtype=np.uint64)
+            overlap = np.bitwise_count(self.equipment_masks & request_words).sum(axis=1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                equip_score = np.where(
+                    self.equipment_counts > 0, overlap / self.equipment_counts, 1.0
+                )
+        else:
+            equip_score = np.where(self.equipment_counts > 0, 0.0, 1.0)
+
+        experience_gap = np.abs(self.experience_ranks.astype(np.int16) - request_rank)
+        return (
+            (1.0 - freq_gap) * 0.5
+            + equip_score * 0.35
+            + (1.0 - experience_gap * 0.4) * 0.15
+        )
 
     @staticmethod
-    def _load_templates(source: Path) -> List[WorkoutTemplate]:
-        if not source.exists():
-            raise FileNotFoundError(f"Workout template source not found: {source}")
+    def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Positions of the k best scores, highest first, ties in catalogue order."""
+        if k <= 0 or not len(scores):
+            return np.empty(0, dtype=np.intp)
+        if k >= len(scores):
+            return np.argsort(-scores, kind="stable")
 
-        with source.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
+        threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[: k - len(above)]
+        chosen = np.sort(np.concatenate([above, ties]))
+        return chosen[np.argsort(-scores[chosen], kind="stable")]
 
-        templates: List[WorkoutTemplate] = []
-        for raw_template in payload.get("templates", []):
-            templates.append(WorkoutTemplate.model_validate(raw_template))
-        return templates
 
+class BaseRecommender(ABC):
+    """Shared response caching, batching and rationale wording for recommenders."""
+
+    def __init__(self) -> None:
+        # Serialized responses are tied to this catalogue; a new catalogue means a new cache.
+        self._response_cache: TTLCache[Tuple[str, str, int, Tuple[str, ...]], bytes] = TTLCache(
+            maxsize=settings.recommendation_cache_size,
+            ttl_seconds=settings.recommendation_cache_ttl_seconds,
+        )
+
+    @property
+    @abstractmethod
+    def template_count(self) -> int:
+        """Number of templates the recommender serves from."""
+
+    @abstractmethod
     def recommend(self, request: RecommendationRequest) -> RecommendationResponse:
-        primary_matches = [
-            template
-            for template in self._templates
-            if self._is_goal_match(template, request)
-            and self._is_experience_match(template, request)
-            and self._is_frequency_match(template, request)
-            and self._is_equipment_match(template, request)
-        ]
+        """Rank templates for one request (uncached)."""
 
-        if primary_matches:
-            rationale = (
-                f"Identified {len(primary_matches)} template(s) aligned with goal "
-                f"'{request.goal}' and {request.available_days} weekly sessions."
+    def recommend_json(self, request: RecommendationRequest) -> bytes:
+        """Return the serialized response, skipping ranking and serialization on cache hits."""
+        # Raw goal, not lowercased: it is echoed in the cached rationale.
+        key = (
+            request.goal,
+            request.experience_level.lower(),
+            request.available_days,
+            tuple(sorted(item.lower() for item in request.equipment)),
+        )
+        payload = self._response_cache.get(key)
+        if payload is None:
+            payload = self.recommend(request).model_dump_json().encode("utf-8")
+            self._response_cache.set(key, payload)
+        return payload
+
+    def cache_stats(self) -> CacheStats:
+        return self._response_cache.stats()
+
+    def clear_cache(self) -> None:
+        self._response_cache.clear()
+
+    def recommend_many(
+        self, requests: Iterable[RecommendationRequest]
+    ) -> Iterator[RecommendationResponse]:
+        """Yield responses in request order, resolving each distinct request once per batch."""
+        resolved: Dict[Tuple[str, int, int, FrozenSet[str]], RecommendationResponse] = {}
+        for request in requests:
+            # Raw goal is part of the key because it is echoed in the rationale.
+            key = (
+                request.goal,
+                self._experience_rank(request.experience_level),
+                request.available_days,
+                frozenset(item.lower() for item in request.equipment),
             )
-            return RecommendationResponse(items=primary_matches[:3], rationale=rationale)
+            response = resolved.get(key)
+            if response is None:
+                response = resolved[key] = self.recommend(request)
+            yield response
+
+    @staticmethod
+    def _experience_rank(label: str) -> int:
+        return _experience_rank(label)
 
-        ranked = self._rank_templates(request)
-        fallback_templates = [item.template for item in ranked[:3]]
+    @staticmethod
+    def _exact_response(
+        request: RecommendationRequest, matches: Sequence[WorkoutTemplate], total: int
+    ) -> RecommendationResponse:
+        rationale = (
+            f"Identified {total} template(s) aligned with goal "
+            f"'{request.goal}' and {request.available_days} weekly sessions."
+        )
+        return RecommendationResponse(items=list(matches[:3]), rationale=rationale)
+
+    @staticmethod
+    def _fallback_response(templates: Sequence[WorkoutTemplate]) -> RecommendationResponse:
         rationale = (
             "No exact template fit. Returning closest options based on frequency, "
             "equipment coverage, and experience similarity."
         )
-        return RecommendationResponse(items=fallback_templates, rationale=rationale)
-
-    def _rank_templates(self, request: RecommendationRequest) -> List[RankedTemplate]:
-        ranked: List[RankedTemplate] = []
-        for template in self._templates:
-            freq_gap = self._frequency_gap(template, request)
-            equip_score = self._equipment_overlap(template, request)
-            experience_gap = abs(
-                self._experience_rank(template.experience_level)
-                - self._experience_rank(request.experience_level)
-            )
-            score = (
-                (1.0 - freq_gap) * 0.5
-                + equip_score * 0.35
-                + (1.0 - experience_gap * 0.4) * 0.15
-            )
-            ranked.append(RankedTemplate(template=template, score=score))
+        return RecommendationResponse(items=list(templates), rationale=rationale)
 
-        ranked.sort(key=lambda item: item.score, reverse=True)
-        return ranked
 
-    @staticmethod
-    def _is_goal_match(
-        template: WorkoutTemplate, request: RecommendationRequest
-    ) -> bool:
-        request_goal = request.goal.lower()
-        template_goal = template.goal.lower()
-        return request_goal in template_goal or template_goal in request_goal
+class WorkoutRecommender(BaseRecommender):
+    """Recommend workout templates based on simple heuristic ranking."""
 
-    def _is_experience_match(
-        self, template: WorkoutTemplate, request: RecommendationRequest
-    ) -> bool:
-        template_rank = self._experience_rank(template.experience_level)
-        request_rank = self._experience_rank(request.experience_level)
-        return template_rank <= request_rank
+    def __init__(self, data_path: Path | None = None, snapshot_path: Path | None = None) -> None:
+        super().__init__()
+        self.data_path = data_path or settings.data_path
+        self.source_hash, self._templates = self._load_templates(self.data_path, snapshot_path)
+        self._materialized: Optional[MaterializedRecommendations] = None
+        self._vocabulary = EquipmentVocabulary()
+        self._equipment_masks = [
+            self._vocabulary.intern(template.equipment) for template in self._templates
+        ]
+        self._index = TemplateIndex(self._templates, self._equipment_masks)
+        self._engine = ScoringEngine(
+            self._templates, self._equipment_masks, len(self._vocabulary)
+        )
+
+    @property
+    def template_count(self) -> int:
+        return len(self._templates)
 
     @staticmethod
-    def _is_frequency_match(
-        template: WorkoutTemplate, request: RecommendationRequest
-    ) -> bool:
-        return request.available_days in template.weekly_frequency_options
-
-    def _is_equipment_match(
-        self, template: WorkoutTemplate, request: RecommendationRequest
-    ) -> bool:
-        if not template.equipment:
-            return True
+    def _load_templates(
+        source: Path, snapshot_path: Path | None = None
+    ) -> Tuple[str, List[TemplateRecord]]:
+        if not source.exists():
+            raise FileNotFoundError(f"Workout template source not found: {source}")
 
-        if not request.equipment:
-            return False
+        raw = source.read_bytes()
+        source_hash = hashlib.sha256(raw).hexdigest()
+        if snapshot_path is not None:
+            snapshot = read_snapshot(snapshot_path, source_hash)
+            if snapshot is not None:
+                return source_hash, snapshot
 
-        overlap_ratio = self._equipment_overlap(template, request)
-        return overlap_ratio >= 0.6
+        payload = json.loads(raw)
+        # Validate one template at a time and keep only its compact record.
+        templates: List[TemplateRecord] = []
+        for raw_template in payload.get("templates", []):
+            templates.append(TemplateRecord.from_model(WorkoutTemplate.model_validate(raw_template)))
+        return source_hash, templates
 
-    @staticmethod
-    def _experience_rank(label: str) -> int:
-        return _EXPERIENCE_RANK.get(label.lower(), 1)
+    def write_snapshot(self, path: Path) -> None:
+        """Persist the validated catalogue so later loads can skip parsing and validation."""
+        write_snapshot(path, self.source_hash, self._templates)
 
-    @staticmethod
-    def _frequency_gap(template: WorkoutTemplate, request: RecommendationRequest) -> float:
-        best_gap = min(
-            abs(freq - request.available_days) for freq in template.weekly_frequency_options
+    def recommend(self, request: RecommendationRequest) -> RecommendationResponse:
+        total, positions = self._select(request, self._vocabulary.mask(request.equipment))
+        templates = [self._templates[pos].to_model() for pos in positions]
+        if total:
+            return self._exact_response(request, templates, total)
+        return self._fallback_response(templates)
+
+    def use_materialized(self, table: Optional[MaterializedRecommendations]) -> None:
+        """Serve known request points from a precomputed table built for this catalogue."""
+        if table is not None and table.source_hash != self.source_hash:
+            raise ValueError("Materialized recommendations were built from a different source")
+        self._materialized = table
+
+    def _select(self, request: RecommendationRequest, request_mask: int) -> Selection:
+        """Return (exact match count, positions of up to three templates).
+
+        A count of zero means no exact fit and the positions are the ranked fallback.
+        """
+        if self._materialized is not None:
+            hit = self._materialized.lookup(
+                request.goal.lower(),
+                self._experience_rank(request.experience_level),
+                request.available_days,
+                request_mask,
+            )
+            if hit is not None:
+                return hit
+        return self._select_live(request, request_mask)
+
+    def _select_live(self, request: RecommendationRequest, request_mask: int) -> Selection:
+        # Equipment overlap is a ratio, so postings only narrow it; confirm here.
+        matches = [
+            pos
+            for pos in self._index.candidates(request, request_mask)
+            if self._is_equipment_match(self._equipment_masks[pos], request_mask)
+        ]
+        if matches:
+            return len(matches), tuple(matches[:3])
+
+        scores = self._engine.scores(
+            request.available_days,
+            request_mask,
+            self._experience_rank(request.experience_level),
         )
-        return min(best_gap / 4.0, 1.0)
+        return 0, tuple(int(pos) for pos in self._engine.top_k(scores, 3))
+
+    @classmethod
+    def _is_equipment_match(cls, template_mask: int, request_mask: int) -> bool:
+        if not template_mask:
+            return True
+
+        if not request_mask:
+            return False
+
+        overlap_ratio = cls._equipment_overlap(template_mask, request_mask)
+        return overlap_ratio >= 0.6
 
     @staticmethod
-    def _equipment_overlap(template: WorkoutTemplate, request: RecommendationRequest) -> float:
-        template_equipment = {item.lower() for item in template.equipment}
-        available_equipment = {item.lower() for item in request.equipment}
-        if not template_equipment:
+    def _equipment_overlap(template_mask: int, request_mask: int) -> float:
+        if not template_mask:
             return 1.0
-        if not available_equipment:
+        if not request_mask:
             return 0.0
-        overlap = template_equipment & available_equipment
-        return len(overlap) / len(template_equipment)
+        return (template_mask & request_mask).bit_count() / template_mask.bit_count()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from functools import partial
+from typing import Awaitable, Callable, Dict, Generic, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int
+    coalesced: int
+    in_flight: int
+
+
+class SingleFlight(Generic[V]):
+    """Concurrent callers with the same key await one shared run of the work.
+
+    Nothing is remembered once the run finishes; the next caller starts a fresh one. A
+    failure is raised to every caller that was waiting on it. A caller that is cancelled
+    (disconnect, deadline) leaves the run going for the others, but when the last caller
+    leaves, the run is cancelled too rather than finishing for nobody.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Dict[str, asyncio.Task[V]] = {}
+        self._waiters: Dict[asyncio.Task[V], int] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, work: Callable[[], Awaitable[V]]) -> V:
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        # A task from another (finished) event loop cannot be awaited here
+        if task is not None and task.get_loop() is loop and not task.done():
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = loop.create_task(work())
+            self._tasks[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # Shielded so one caller disconnecting does not cancel the run the others await
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Nobody is left to use the result; later callers start a fresh run
+                    task.cancel()
+                    self._forget(key, task)
+
+    def _forget(self, key: str, task: asyncio.Task[V]) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if task.done() and not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            calls=self.calls, coalesced=self.coalesced, in_flight=len(self._tasks)
+        )
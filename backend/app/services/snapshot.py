@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import gc
+import logging
+import marshal
+import mmap
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from backend.app.services.template_store import TemplateRecord
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"WKSNAP"
+FORMAT_VERSION = 2
+# magic, format version, interpreter cache tag (marshal is interpreter-specific),
+# SHA-256 of the source JSON, body length, CRC-32 of the body.
+_HEADER = struct.Struct("<6sH16s32sQI")
+
+
+def _cache_tag() -> bytes:
+    return (sys.implementation.cache_tag or "").encode("ascii")[:16].ljust(16, b"\0")
+
+
+def write_snapshot(path: Path, source_hash: str, records: Sequence[TemplateRecord]) -> None:
+    """Write already validated records behind a header that pins them to their source."""
+    body = marshal.dumps(tuple(record.as_tuple() for record in records))
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        _cache_tag(),
+        bytes.fromhex(source_hash),
+        len(body),
+        zlib.crc32(body),
+    )
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(header)
+        handle.write(body)
+    tmp_path.replace(path)
+
+
+def read_snapshot(path: Path, source_hash: str) -> Optional[List[TemplateRecord]]:
+    """Map the snapshot and decode its records, or return None when it is missing, stale or
+    corrupt."""
+    if not path.exists() or path.stat().st_size < _HEADER.size:
+        return None
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, version, cache_tag, digest, length, checksum = _HEADER.unpack_from(mm)
+        if magic != MAGIC or version != FORMAT_VERSION or cache_tag != _cache_tag():
+            logger.warning("Ignoring %s: incompatible snapshot format", path)
+            return None
+        if digest.hex() != source_hash:
+            logger.warning("Ignoring %s: built from a different catalogue", path)
+            return None
+        if _HEADER.size + length > len(mm):
+            logger.warning("Ignoring %s: truncated snapshot", path)
+            return None
+        # Decoding creates only acyclic tuples; cyclic GC passes over them are pure overhead.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with memoryview(mm) as view, view[_HEADER.size : _HEADER.size + length] as body:
+                if zlib.crc32(body) != checksum:
+                    logger.warning("Ignoring %s: snapshot body checksum mismatch", path)
+                    return None
+                rows = marshal.loads(body)
+            return [TemplateRecord.from_tuple(row) for row in rows]
+        except (ValueError, EOFError, TypeError):
+            # Checksummed bytes that still do not decode: written by a broken build
+            logger.warning("Ignoring %s: undecodable snapshot", path, exc_info=True)
+            return None
+        finally:
+            if gc_was_enabled:
+                gc.enable()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import sys
+from typing import Any, Tuple
+
+from backend.app.schemas.workout import TrainingSession, WorkoutTemplate
+
+
+def _interned(values: list[str]) -> Tuple[str, ...]:
+    return tuple(sys.intern(value) for value in values)
+
+
+# (day, focus, primary_lifts, accessory_work); plain tuples keep snapshot loads cheap.
+SessionRecord = Tuple[str, str, Tuple[str, ...], Tuple[str, ...]]
+
+
+def _session_record(session: TrainingSession) -> SessionRecord:
+    return (
+        sys.intern(session.day),
+        sys.intern(session.focus),
+        _interned(session.primary_lifts),
+        _interned(session.accessory_work),
+    )
+
+
+def _session_model(record: SessionRecord) -> TrainingSession:
+    day, focus, primary_lifts, accessory_work = record
+    return TrainingSession.model_construct(
+        day=day,
+        focus=focus,
+        primary_lifts=list(primary_lifts),
+        accessory_work=list(accessory_work),
+    )
+
+
+class TemplateRecord:
+    """Compact hot-path form of a ``WorkoutTemplate``.
+
+    Strings are interned so repeated goals, equipment and lift names share one object across
+    the catalogue. Records are built from already validated models, so converting back with
+    ``model_construct`` skips a second validation.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "description",
+        "goal",
+        "experience_level",
+        "weekly_frequency_options",
+        "equipment",
+        "training_split",
+        "coaching_notes",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        description: str,
+        goal: str,
+        experience_level: str,
+        weekly_frequency_options: Tuple[int, ...],
+        equipment: Tuple[str, ...],
+        training_split: Tuple[SessionRecord, ...],
+        coaching_notes: Tuple[str, ...],
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.description = description
+        self.goal = goal
+        self.experience_level = experience_level
+        self.weekly_frequency_options = weekly_frequency_options
+        self.equipment = equipment
+        self.training_split = training_split
+        self.coaching_notes = coaching_notes
+
+    @classmethod
+    def from_model(cls, template: WorkoutTemplate) -> TemplateRecord:
+        return cls(
+            id=template.id,
+            name=template.name,
+            description=template.description,
+            goal=sys.intern(template.goal),
+            experience_level=sys.intern(template.experience_level),
+            weekly_frequency_options=tuple(template.weekly_frequency_options),
+            equipment=_interned(template.equipment),
+            training_split=tuple(_session_record(s) for s in template.training_split),
+            coaching_notes=_interned(template.coaching_notes),
+        )
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        """Plain nested tuples, suitable for ``marshal``."""
+        return (
+            self.id,
+            self.name,
+            self.description,
+            self.goal,
+            self.experience_level,
+            self.weekly_frequency_options,
+            self.equipment,
+            self.training_split,
+            self.coaching_notes,
+        )
+
+    @classmethod
+    def from_tuple(cls, values: Tuple[Any, ...]) -> TemplateRecord:
+        return cls(*values)
+
+    def to_model(self) -> WorkoutTemplate:
+        return WorkoutTemplate.model_construct(
+            id=self.id,
+            name=self.name,
+            description=self.description,
+            goal=self.goal,
+            experience_level=self.experience_level,
+            weekly_frequency_options=list(self.weekly_frequency_options),
+            equipment=list(self.equipment),
+            training_split=[_session_model(session) for session in self.training_split],
+            coaching_notes=list(self.coaching_notes),
+        )
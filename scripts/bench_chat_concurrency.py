@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+# Ensure project root on sys.path to import backend package when executed directly
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from backend.app.db.models import KnowledgeItem  # noqa: E402
+from backend.app.db.session import Base  # noqa: E402
+from backend.app.services.chat import (  # noqa: E402
+    retrieve_knowledge,
+    retrieve_knowledge_async,
+)
+
+VOCABULARY = [
+    "squat", "bench", "deadlift", "press", "row", "volume", "intensity", "tempo", "protein",
+    "sleep", "recovery", "deload", "hypertrophy", "strength", "fatigue", "progression",
+    "mobility", "cardio", "creatine", "calories", "frequency", "failure", "technique",
+    "bracing", "grip", "stance", "accessory", "warmup", "periodization", "rest",
+]  # fmt: skip
+
+Retrieve = Callable[[Session, str], Awaitable[object]]
+
+
+def build_database(path: Path, items: int, seed: int = 11) -> sessionmaker:
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with factory() as session:
+        for i in range(items):
+            words = " ".join(rng.choices(VOCABULARY, k=rng.randint(60, 160)))
+            session.add(KnowledgeItem(title=f"Note {i}", content=words))
+        session.commit()
+    return factory
+
+
+async def _inline(session: Session, query: str) -> object:
+    # What chat() used to do: synchronous database work on the event loop thread
+    return retrieve_knowledge(session, query)
+
+
+async def _offloaded(session: Session, query: str) -> object:
+    return await retrieve_knowledge_async(session, query)
+
+
+async def run_mixed_load(
+    factory: sessionmaker,
+    retrieve: Retrieve,
+    requests: int,
+    concurrency: int,
+    llm_seconds: float,
+    seed: int = 5,
+) -> dict:
+    """Chat-shaped requests (retrieval, then an awaited LLM call) next to a loop-lag probe."""
+    rng = random.Random(seed)
+    # Distinct keyword sets so the retrieval cache does not hide the database work
+    queries = [" ".join(rng.sample(VOCABULARY, 3)) + f" {'x' * i}" for i in range(requests)]
+    lags: List[float] = []
+    stop = asyncio.Event()
+    gate = asyncio.Semaphore(concurrency)
+
+    async def probe() -> None:
+        interval = 0.005
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - started - interval)
+
+    async def request(query: str) -> None:
+        async with gate:
+            with factory() as session:
+                await retrieve(session, query)
+            await asyncio.sleep(llm_seconds)  # stands in for the streamed LLM call
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(request(q) for q in queries))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    lags.sort()
+    return {
+        "elapsed_s": elapsed,
+        "lag_p50_ms": statistics.median(lags) * 1000,
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1] * 1000,
+        "lag_max_ms": lags[-1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Event-loop responsiveness of chat retrieval under concurrent load"
+    )
+    parser.add_argument("--items", type=int, default=5000, help="Knowledge items to generate")
+    parser.add_argument("--requests", type=int, default=200, help="Chat requests to simulate")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight")
+    parser.add_argument(
+        "--llm-ms", type=float, default=50.0, help="Simulated LLM latency per request"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        factory = build_database(Path(tmp) / "bench.db", args.items)
+        with factory() as session:
+            retrieve_knowledge(session, "warm up the index")
+        for label, retrieve in (("inline", _inline), ("thread pool", _offloaded)):
+            stats = asyncio.run(
+                run_mixed_load(
+                    factory, retrieve, args.requests, args.concurrency, args.llm_ms / 1000
+                )
+            )
+            print(
+                f"{label:<12} total {stats['elapsed_s']:.2f}s  loop lag p50 "
+                f"{stats['lag_p50_ms']:.2f} ms  p99 {stats['lag_p99_ms']:.2f} ms  "
+                f"max {stats['lag_max_ms']:.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Ensure project root on sys.path to import backend package when executed directly
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from backend.app.core.config import settings  # noqa: E402
+from backend.app.db.models import KnowledgeItem  # noqa: E402
+from backend.app.db.session import SessionLocal  # noqa: E402
+from backend.app.services.chat import (  # noqa: E402
+    PERSONA,
+    build_prompt,
+    generate_payload,
+    retrieve_knowledge,
+)
+from backend.app.services.llm_client import close_llm_clients, get_llm_client  # noqa: E402
+from backend.app.services.prompt_budget import approx_tokens  # noqa: E402
+
+QUESTIONS = [
+    "How many sets per week should I do for hypertrophy?",
+    "What rep range is best for strength?",
+    "How often should I deload?",
+    "Is training to failure necessary for muscle growth?",
+    "How much protein do I need to build muscle?",
+    "How long should I rest between sets?",
+]
+
+
+def legacy_payload(message: str, docs: List[Tuple[KnowledgeItem, float]]) -> Dict[str, Any]:
+    """The previous request shape: persona inlined, 500-character snippets, no keep_alive."""
+    context_lines = []
+    for i, (doc, _) in enumerate(docs, start=1):
+        snippet = doc.content.strip()
+        if len(snippet) > 500:
+            snippet = snippet[:500] + "..."
+        context_lines.append(f"[{i}] Title: {doc.title}\n{snippet}")
+    prompt = (
+        f"System: {PERSONA}\n\n"
+        f"Context sources (use for citations):\n{chr(10).join(context_lines)}\n\n"
+        f"User: {message}\n\nAssistant:"
+    )
+    return {
+        "model": settings.llm_model,
+        "prompt": prompt,
+        "stream": False,
+        "options": {"temperature": 0.7, "num_predict": settings.llm_answer_tokens},
+    }
+
+
+def packed_payload(message: str, docs: List[Tuple[KnowledgeItem, float]]) -> Dict[str, Any]:
+    prompt, _ = build_prompt(message, docs)
+    return generate_payload(prompt, stream=False)
+
+
+async def measure(label: str, payloads: List[Dict[str, Any]]) -> None:
+    evals: List[float] = []
+    counts: List[int] = []
+    for payload in payloads:
+        resp = await get_llm_client().post(settings.llm_base_url, json=payload, timeout=120.0)
+        resp.raise_for_status()
+        data = resp.json()
+        evals.append(data.get("prompt_eval_duration", 0) / 1e6)
+        counts.append(data.get("prompt_eval_count", 0))
+    print(
+        f"{label:<8} prompt eval mean {statistics.mean(evals):8.1f} ms  "
+        f"p50 {statistics.median(evals):8.1f} ms  tokens evaluated mean "
+        f"{statistics.mean(counts):6.0f}"
+    )
+
+
+def count(label: str, payloads: List[Dict[str, Any]]) -> None:
+    """Approximate prompt tokens per request, for when no Ollama server is available.
+
+    The ``system`` field is a fixed prefix that Ollama keeps cached between requests, so it
+    is reported both with and without that prefix.
+    """
+    full = [approx_tokens(p.get("system", "")) + approx_tokens(p["prompt"]) for p in payloads]
+    uncached = [approx_tokens(p["prompt"]) for p in payloads]
+    print(
+        f"{label:<8} approx prompt tokens mean {statistics.mean(full):6.0f}  "
+        f"max {max(full):6d}  excluding cached system prefix mean "
+        f"{statistics.mean(uncached):6.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Ollama prompt-eval time per chat request, before and after prompt packing"
+    )
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over the questions")
+    parser.add_argument("--top-k", type=int, default=3, help="Passages retrieved per question")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Only count approximate prompt tokens; no Ollama server needed",
+    )
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        retrieved = [(q, retrieve_knowledge(session, q, args.top_k)) for q in QUESTIONS]
+    questions = retrieved * args.rounds
+    before = [legacy_payload(q, docs) for q, docs in questions]
+    after = [packed_payload(q, docs) for q, docs in questions]
+    if args.offline:
+        count("before", before)
+        count("after", after)
+        return
+
+    async def run() -> None:
+        try:
+            await measure("before", before)
+            await measure("after", after)
+        finally:
+            await close_llm_clients()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
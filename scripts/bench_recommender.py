@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+# Ensure project root on sys.path to import backend package when executed directly
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from backend.app.schemas.workout import (  # noqa: E402
+    RecommendationRequest,
+    RecommendationResponse,
+    WorkoutTemplate,
+)
+from backend.app.services.recommendation import WorkoutRecommender  # noqa: E402
+from backend.app.services.template_store import TemplateRecord  # noqa: E402
+
+GOALS = ["strength", "hypertrophy", "fat loss", "powerbuilding", "endurance"]
+LEVELS = ["beginner", "intermediate", "advanced"]
+EQUIPMENT = [
+    "barbell",
+    "dumbbells",
+    "cables",
+    "machines",
+    "kettlebell",
+    "bands",
+    "bench",
+    "pull-up bar",
+]
+
+
+LIFTS = [
+    "Back Squat 4x5",
+    "Bench Press 4x6-8",
+    "Romanian Deadlift 3x8",
+    "Weighted Pull-Up 4x6-8",
+    "Overhead Press 3x6-8",
+    "Leg Press 3x10-12",
+    "Lateral Raise 3x12-15",
+    "Cable Row 3x10-12",
+]
+
+
+def synthetic_catalogue(count: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    templates = []
+    for i in range(count):
+        split = [
+            {
+                "day": f"Day {d + 1}",
+                "focus": rng.choice(["Upper", "Lower", "Push", "Pull", "Full Body"]),
+                "primary_lifts": rng.sample(LIFTS, 2),
+                "accessory_work": rng.sample(LIFTS, 3),
+            }
+            for d in range(rng.randint(2, 5))
+        ]
+        templates.append(
+            {
+                "id": f"tpl_{i}",
+                "name": f"Synthetic Template {i}",
+                "description": "Generated for benchmarking.",
+                "goal": rng.choice(GOALS),
+                "experience_level": rng.choice(LEVELS),
+                "weekly_frequency_options": sorted(rng.sample(range(2, 8), rng.randint(1, 3))),
+                "equipment": rng.sample(EQUIPMENT, rng.randint(0, 5)),
+                "training_split": split,
+                "coaching_notes": ["Add load when all sets hit the top of the rep range."],
+            }
+        )
+    return {"templates": templates}
+
+
+def build_recommender(count: int) -> WorkoutRecommender:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "workouts.json"
+        path.write_text(json.dumps(synthetic_catalogue(count)), encoding="utf-8")
+        return WorkoutRecommender(data_path=path)
+
+
+def measure(label: str, fn: Callable[[], object], repeat: int) -> None:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+    print(f"{label:<28} {elapsed_ms:9.3f} ms/call  peak alloc {peak / 1024:9.1f} KiB")
+
+
+def bench_equipment_overlap(recommender: WorkoutRecommender, repeat: int) -> None:
+    """Compare per-call set building against precompiled bitmasks."""
+    request = RecommendationRequest(
+        goal="strength",
+        experience_level="beginner",
+        available_days=3,
+        equipment=["Barbell", "dumbbells", "bench"],
+    )
+    templates = recommender._templates
+
+    def set_overlap() -> float:
+        total = 0.0
+        for template in templates:
+            needed = {item.lower() for item in template.equipment}
+            available = {item.lower() for item in request.equipment}
+            if not needed:
+                total += 1.0
+            elif available:
+                total += len(needed & available) / len(needed)
+        return total
+
+    def mask_overlap() -> float:
+        request_mask = recommender._vocabulary.mask(request.equipment)
+        total = 0.0
+        for mask in recommender._equipment_masks:
+            total += recommender._equipment_overlap(mask, request_mask)
+        return total
+
+    assert abs(set_overlap() - mask_overlap()) < 1e-6
+    print(f"equipment overlap over {len(templates)} templates")
+    print(f"  sets allocated per call: {2 * len(templates)} vs 0 with masks")
+    measure("  per-call sets", set_overlap, repeat)
+    measure("  interned bitmasks", mask_overlap, repeat)
+
+
+def bench_recommend_paths(recommender: WorkoutRecommender, repeat: int) -> None:
+    """Time the exact-match (index) path against the ranked fallback path."""
+    exact = RecommendationRequest(
+        goal="hypertrophy",
+        experience_level="advanced",
+        available_days=4,
+        equipment=EQUIPMENT,
+    )
+    fallback = RecommendationRequest(
+        goal="mobility",
+        experience_level="beginner",
+        available_days=3,
+        equipment=["bands"],
+    )
+    print(f"recommend() over {len(recommender._templates)} templates")
+    measure("  exact match", lambda: recommender.recommend(exact), repeat)
+    measure("  ranked fallback", lambda: recommender.recommend(fallback), repeat)
+
+
+def bench_template_store(count: int, repeat: int) -> None:
+    """Compare resident catalogue size and response cost for Pydantic models vs records."""
+    raw_templates = synthetic_catalogue(count)["templates"]
+
+    def load_models() -> list:
+        return [WorkoutTemplate.model_validate(raw) for raw in raw_templates]
+
+    def load_records() -> list:
+        return [
+            TemplateRecord.from_model(WorkoutTemplate.model_validate(raw)) for raw in raw_templates
+        ]
+
+    print(f"catalogue representation for {count} templates")
+    for label, loader in (("  pydantic models", load_models), ("  slotted records", load_records)):
+        tracemalloc.start()
+        started = time.perf_counter()
+        catalogue = loader()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        resident, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:<28} load {elapsed_ms:9.1f} ms  resident {resident / 2**20:8.1f} MiB")
+        del catalogue
+
+    models = load_models()[:3]
+    records = load_records()[:3]
+    measure(
+        "  respond from models",
+        lambda: RecommendationResponse(items=models, rationale="").model_dump_json(),
+        repeat * 100,
+    )
+    measure(
+        "  respond from records",
+        lambda: RecommendationResponse(
+            items=[r.to_model() for r in records], rationale=""
+        ).model_dump_json(),
+        repeat * 100,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the workout recommender")
+    parser.add_argument("--templates", type=int, default=20000, help="Synthetic catalogue size")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed iterations per case")
+    args = parser.parse_args()
+
+    recommender = build_recommender(args.templates)
+    bench_equipment_overlap(recommender, args.repeat)
+    bench_recommend_paths(recommender, args.repeat)
+    bench_template_store(args.templates, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
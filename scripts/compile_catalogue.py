@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root on sys.path to import backend package when executed directly
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from backend.app.core.config import settings  # noqa: E402
+from backend.app.services.recommendation import WorkoutRecommender  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Validate workouts.json and write a binary snapshot for fast worker startup"
+    )
+    parser.add_argument("--data-path", type=Path, default=settings.data_path)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=settings.snapshot_path,
+        help="Where to write the snapshot (defaults to SNAPSHOT_PATH)",
+    )
+    args = parser.parse_args()
+    if args.output is None:
+        parser.error("--output is required when SNAPSHOT_PATH is not set")
+
+    started = time.perf_counter()
+    recommender = WorkoutRecommender(data_path=args.data_path)
+    recommender.write_snapshot(args.output)
+    print(
+        f"Compiled {recommender.template_count} templates from {args.data_path} into "
+        f"{args.output} in {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,21 @@ import asyncio
 from pathlib import Path
 from typing import Iterable, Optional
 
-import httpx
 from sqlalchemy import select, text
 
 from backend.app.core.config import settings
-from backend.app.db.models import KnowledgeItem
+from backend.app.db.models import (
+    KnowledgeChunk,
+    KnowledgeEmbedding,
+    KnowledgeItem,
+    KnowledgeVersion,
+)
 from backend.app.db.session import SessionLocal, engine
+from backend.app.services.chunking import chunk_missing
+from backend.app.services.embeddings import embed_missing
+from backend.app.services.knowledge_version import bump_knowledge_version
+from backend.app.services.llm_client import close_llm_clients, get_llm_client
+from backend.app.services.llm_router import llm_router
 
 
 def read_files(paths: Iterable[Path]) -> list[tuple[str, str]]:
@@ -40,11 +49,12 @@ async def summarize(text_in: str, model: Optional[str] = None) -> str:
     payload = {"model": model_name, "prompt": prompt, "stream": False}
 
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(settings.llm_base_url, json=payload)
+        # Long inputs: allow more time than a chat reply on the shared pooled client
+        async with llm_router.backend() as url:
+            resp = await get_llm_client().post(url, json=payload, timeout=60.0)
             resp.raise_for_status()
-            data = resp.json()
-            return (data.get("response") or data.get("text") or "").strip() or text_in
+        data = resp.json()
+        return (data.get("response") or data.get("text") or "").strip() or text_in
     except Exception:
         return text_in
 
@@ -58,6 +68,9 @@ async def ingest_local_files(
 
     # Ensure main tables exist (useful for raw SQLite dev)
     KnowledgeItem.__table__.create(bind=engine, checkfirst=True)
+    KnowledgeChunk.__table__.create(bind=engine, checkfirst=True)
+    KnowledgeVersion.__table__.create(bind=engine, checkfirst=True)
+    KnowledgeEmbedding.__table__.create(bind=engine, checkfirst=True)
 
     inserted = 0
     async def process_item(title: str, raw: str) -> tuple[str, str]:
@@ -96,6 +109,8 @@ async def ingest_local_files(
                 )
                 inserted += 1
         session.commit()
+        # Items stored before passages existed; new ones are chunked on flush
+        chunk_missing(session)
 
         # Backfill FTS, best-effort
         try:
@@ -110,6 +125,26 @@ async def ingest_local_files(
         except Exception:
             pass
 
+        try:
+            session.execute(
+                text(
+                    "INSERT INTO knowledge_chunks_fts(rowid, title, content, tags) "
+                    "SELECT c.id, ki.title, c.content, ki.tags FROM knowledge_chunks c "
+                    "JOIN knowledge_items ki ON ki.id = c.item_id "
+                    "WHERE c.id NOT IN (SELECT rowid FROM knowledge_chunks_fts)"
+                )
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+
+        # The FTS backfill bypasses the ORM; bump the version so cached retrievals refresh
+        bump_knowledge_version(session.connection())
+        session.commit()
+
+        if settings.embedding_enabled:
+            embed_missing(session)
+
     return inserted
 
 
@@ -143,9 +178,15 @@ def main() -> None:
     source_url: Optional[str] = args.source_url
     do_summarize = not args.no_summarize
 
-    inserted = asyncio.run(
-        ingest_local_files(files=files, tags=tags, source_url=source_url, do_summarize=do_summarize)
-    )
+    async def run() -> int:
+        try:
+            return await ingest_local_files(
+                files=files, tags=tags, source_url=source_url, do_summarize=do_summarize
+            )
+        finally:
+            await close_llm_clients()
+
+    inserted = asyncio.run(run())
     print(f"Ingestion complete. Inserted/updated {inserted} new items.")
 
 
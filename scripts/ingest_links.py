@@ -7,7 +7,6 @@ import sys
 from pathlib import Path
 from typing import Optional
 
-import httpx
 import trafilatura
 from sqlalchemy import select, text
 
@@ -17,8 +16,18 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from backend.app.core.config import settings  # noqa: E402
-from backend.app.db.models import KnowledgeItem  # noqa: E402
+from backend.app.db.models import (  # noqa: E402
+    KnowledgeChunk,
+    KnowledgeEmbedding,
+    KnowledgeItem,
+    KnowledgeVersion,
+)
 from backend.app.db.session import SessionLocal, engine  # noqa: E402
+from backend.app.services.chunking import chunk_missing  # noqa: E402
+from backend.app.services.embeddings import embed_missing  # noqa: E402
+from backend.app.services.knowledge_version import bump_knowledge_version  # noqa: E402
+from backend.app.services.llm_client import close_llm_clients, get_llm_client  # noqa: E402
+from backend.app.services.llm_router import llm_router  # noqa: E402
 # isort: skip_file
 
 
@@ -78,11 +87,12 @@ async def summarize(text_in: str, model: Optional[str] = None) -> str:
     )
     payload = {"model": model_name, "prompt": prompt, "stream": False}
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(settings.llm_base_url, json=payload)
+        # Long inputs: allow more time than a chat reply on the shared pooled client
+        async with llm_router.backend() as url:
+            resp = await get_llm_client().post(url, json=payload, timeout=60.0)
             resp.raise_for_status()
-            data = resp.json()
-            return (data.get("response") or data.get("text") or "").strip() or text_in
+        data = resp.json()
+        return (data.get("response") or data.get("text") or "").strip() or text_in
     except Exception:
         return text_in
 
@@ -113,6 +123,9 @@ async def ingest_url(
     url: str, tags: Optional[str], do_summarize: bool, store_transcript: bool, use_auto_tags: bool
 ) -> int:
     KnowledgeItem.__table__.create(bind=engine, checkfirst=True)
+    KnowledgeChunk.__table__.create(bind=engine, checkfirst=True)
+    KnowledgeVersion.__table__.create(bind=engine, checkfirst=True)
+    KnowledgeEmbedding.__table__.create(bind=engine, checkfirst=True)
 
     title_base = url
     raw: Optional[str] = None
@@ -183,6 +196,8 @@ async def ingest_url(
                     )
                 )
         session.commit()
+        # Items stored before passages existed; new ones are chunked on flush
+        chunk_missing(session)
 
         try:
             session.execute(
@@ -196,9 +211,46 @@ async def ingest_url(
         except Exception:
             pass
 
+        try:
+            session.execute(
+                text(
+                    "INSERT INTO knowledge_chunks_fts(rowid, title, content, tags) "
+                    "SELECT c.id, ki.title, c.content, ki.tags FROM knowledge_chunks c "
+                    "JOIN knowledge_items ki ON ki.id = c.item_id "
+                    "WHERE c.id NOT IN (SELECT rowid FROM knowledge_chunks_fts)"
+                )
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+
+        # The FTS backfill bypasses the ORM; bump the version so cached retrievals refresh
+        bump_knowledge_version(session.connection())
+        session.commit()
+
+        if settings.embedding_enabled:
+            embed_missing(session)
+
     return 1
 
 
+async def ingest_urls(
+    urls: list[str],
+    tags: Optional[str],
+    do_summarize: bool,
+    store_transcript: bool,
+    use_auto_tags: bool,
+) -> int:
+    """Ingest URLs in one event loop so summaries share pooled LLM connections."""
+    inserted = 0
+    try:
+        for u in urls:
+            inserted += await ingest_url(u, tags, do_summarize, store_transcript, use_auto_tags)
+    finally:
+        await close_llm_clients()
+    return inserted
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Ingest URLs (articles/YouTube) into knowledge base"
@@ -226,9 +278,9 @@ def main() -> None:
     store_transcript = args.store_transcript
     use_auto_tags = args.auto_tags
 
-    inserted = 0
-    for u in urls:
-        inserted += asyncio.run(ingest_url(u, tags, do_summarize, store_transcript, use_auto_tags))
+    inserted = asyncio.run(
+        ingest_urls(urls, tags, do_summarize, store_transcript, use_auto_tags)
+    )
     print(f"Ingestion complete. Inserted/updated {inserted} items.")
 
 
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root on sys.path to import backend package when executed directly
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from backend.app.core.config import settings  # noqa: E402
+from backend.app.services.materialized import MaterializedRecommendations  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Precompute recommendations for every goal/experience/days/equipment point"
+    )
+    parser.add_argument("--data-path", type=Path, default=settings.data_path)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=settings.materialized_path,
+        help="Where to write the table (defaults to MATERIALIZED_PATH)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument(
+        "--max-equipment-items",
+        type=int,
+        default=12,
+        help="Refuse to build when the equipment vocabulary is larger than this",
+    )
+    args = parser.parse_args()
+    if args.output is None:
+        parser.error("--output is required when MATERIALIZED_PATH is not set")
+
+    started = time.perf_counter()
+    table = MaterializedRecommendations.build(
+        args.data_path, workers=args.workers, max_equipment_items=args.max_equipment_items
+    )
+    table.save(args.output)
+    print(
+        f"Materialized {len(table)} request points from {args.data_path} into {args.output} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,15 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
-from backend.app.db.models import KnowledgeItem, WorkoutTemplate  # noqa: E402
+from backend.app.db.models import (  # noqa: E402
+    KnowledgeChunk,
+    KnowledgeItem,
+    KnowledgeVersion,
+    WorkoutTemplate,
+)
 from backend.app.db.session import SessionLocal, engine  # noqa: E402
+from backend.app.services.chunking import chunk_missing  # noqa: E402
+from backend.app.services.knowledge_version import bump_knowledge_version  # noqa: E402
 
 
 def main() -> None:
@@ -29,6 +36,8 @@ def main() -> None:
 
     # Ensure table exists (useful for local dev with SQLite)
     WorkoutTemplate.__table__.create(bind=engine, checkfirst=True)
+    KnowledgeChunk.__table__.create(bind=engine, checkfirst=True)
+    KnowledgeVersion.__table__.create(bind=engine, checkfirst=True)
 
     inserted = 0
     with SessionLocal() as session:
@@ -123,6 +132,13 @@ def main() -> None:
                 curated_inserted += 1
             session.commit()
 
+    with SessionLocal() as session:
+        # Items stored before passages existed; new ones are chunked on flush
+        chunk_missing(session)
+        # The FTS backfill bypasses the ORM; bump the version so cached retrievals refresh
+        bump_knowledge_version(session.connection())
+        session.commit()
+
     print(
         (
             "Seed complete. Inserted {} templates, {} knowledge items from templates, "
@@ -1,8 +1,79 @@
 from __future__ import annotations
 
+import random
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT_DIR = Path(__file__).resolve().parent.parent
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
+
+
+def _synthetic_catalogue(count: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    goals = ["strength", "hypertrophy", "fat loss", "powerbuilding", "endurance"]
+    levels = ["beginner", "novice", "intermediate", "advanced", "elite"]
+    gear = ["barbell", "Dumbbells", "cables", "machines", "kettlebell", "bands", "bench"]
+    templates = []
+    for i in range(count):
+        templates.append(
+            {
+                # Zero-padded so id order matches catalogue order
+                "id": f"tpl_{i:05d}",
+                "name": f"Template {i}",
+                "description": "",
+                "goal": rng.choice(goals),
+                "experience_level": rng.choice(levels),
+                "weekly_frequency_options": sorted(rng.sample(range(2, 8), rng.randint(1, 3))),
+                "equipment": rng.sample(gear, rng.randint(0, 4)),
+                "training_split": [],
+                "coaching_notes": [],
+            }
+        )
+    return {"templates": templates}
+
+
+@pytest.fixture
+def synthetic_catalogue():
+    """Factory for randomised template catalogues of a given size."""
+    return _synthetic_catalogue
+
+
+@pytest.fixture
+def alembic_upgrade(tmp_path, monkeypatch):
+    """Upgrade a fresh SQLite database to a given Alembic revision; returns its URL."""
+    from alembic.command import upgrade
+    from alembic.config import Config
+
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    # No ini file: alembic/env.py then leaves the test run's logging configuration alone
+    config = Config()
+    config.set_main_option("script_location", str(ROOT_DIR / "alembic"))
+
+    def upgrade_to(revision: str = "head") -> str:
+        upgrade(config, revision)
+        return url
+
+    return upgrade_to
+
+
+@pytest.fixture
+def migrated_engine(alembic_upgrade):
+    """Engine for a fresh SQLite database upgraded with the Alembic migrations (FTS5 included)."""
+    from sqlalchemy import create_engine
+
+    engine = create_engine(alembic_upgrade())
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def closed_llm_breaker():
+    """Start every test with the LLM circuit closed, whatever earlier tests left behind."""
+    from backend.app.services import chat
+
+    chat._llm_breaker.reset()
+    yield
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.core.config import settings
+from backend.app.main import app
+from backend.app.services import chat as chat_module
+from backend.app.services.admission import AdmissionQueue, QueueFull
+
+
+def test_waiters_are_admitted_by_priority_then_arrival():
+    queue = AdmissionQueue(concurrency=1, max_waiting=4)
+    order = []
+
+    async def job(name, priority):
+        async with queue.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        first = asyncio.create_task(job("first", 1))
+        await asyncio.sleep(0)
+        rest = [job("low", 2), job("normal-a", 1), job("high", 0), job("normal-b", 1)]
+        await asyncio.gather(first, *rest)
+
+    asyncio.run(scenario())
+    assert order == ["first", "high", "normal-a", "normal-b", "low"]
+    stats = queue.stats()
+    assert (stats.active, stats.waiting, stats.admitted) == (0, 0, 5)
+    assert stats.wait_ms_max >= stats.wait_ms_avg > 0
+
+
+def test_full_queue_refuses_or_displaces_lower_priority():
+    queue = AdmissionQueue(concurrency=1, max_waiting=1)
+
+    async def hold(priority, seconds=0.05):
+        async with queue.slot(priority):
+            await asyncio.sleep(seconds)
+
+    async def scenario():
+        running = asyncio.create_task(hold(1))
+        await asyncio.sleep(0)
+        low = asyncio.create_task(hold(2))
+        await asyncio.sleep(0)
+        # Same or lower rank than the worst waiter: refused straight away
+        with pytest.raises(QueueFull) as refused:
+            await hold(2)
+        assert refused.value.retry_after >= 1
+        # Higher rank: takes the low waiter's place, and the low waiter fails fast
+        await asyncio.gather(running, hold(0))
+        with pytest.raises(QueueFull):
+            await low
+
+    asyncio.run(scenario())
+    assert queue.stats().rejected == 2
+
+
+def _saturated_queue():
+    queue = AdmissionQueue(concurrency=1, max_waiting=0)
+    queue._active = 1  # a generation already holds the only slot
+    return queue
+
+
+def test_full_queue_rejects_with_retry_after(monkeypatch):
+    monkeypatch.setattr(chat_module, "_llm_queue", _saturated_queue())
+    monkeypatch.setattr(settings, "llm_queue_overflow", "reject")
+    chat_module._answer_cache.clear()
+    client = TestClient(app)
+    payload = {"message": "How much protein do I need for muscle gain?"}
+
+    for params in ({}, {"stream": True}):
+        res = client.post("/api/chat/", params=params, json=payload)
+        assert res.status_code == 429
+        assert int(res.headers["Retry-After"]) >= 1
+
+    stats = client.get("/api/chat/queue").json()
+    assert stats["active"] == 1 and stats["rejected"] >= 1
+
+
+def test_full_queue_falls_back_to_retrieval_answer(monkeypatch):
+    monkeypatch.setattr(chat_module, "_llm_queue", _saturated_queue())
+    monkeypatch.setattr(settings, "llm_queue_overflow", "fallback")
+    chat_module._answer_cache.clear()
+
+    res = TestClient(app).post("/api/chat/", json={"message": "Best rep range for strength?"})
+    assert res.status_code == 200
+    assert res.json()["model"] is None and res.json()["answer"]
+
+
+def test_llm_concurrency_defaults_to_one_per_backend(monkeypatch):
+    monkeypatch.setattr(settings, "llm_concurrency", None)
+    monkeypatch.setattr(settings, "llm_backends", [])
+    assert chat_module.llm_concurrency() == 1
+
+    backends = ["http://10.0.0.2:11434/api/generate", "http://10.0.0.3:11434/api/generate"]
+    monkeypatch.setattr(settings, "llm_backends", backends)
+    assert chat_module.llm_concurrency() == 2
+
+    monkeypatch.setattr(settings, "llm_concurrency", 3)
+    assert chat_module.llm_concurrency() == 3
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.core.config import settings
+from backend.app.db.models import KnowledgeItem
+from backend.app.db.session import Base
+from backend.app.main import app
+from backend.app.schemas.chat import ChatResponse
+from backend.app.services import chat as chat_module
+from backend.app.services.answer_cache import AnswerCache
+
+
+def _knowledge_db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as s:
+        s.add(KnowledgeItem(title="Hypertrophy sets", content="Ten to twenty sets per muscle."))
+        s.commit()
+    return Session
+
+
+def test_repeated_question_is_answered_from_cache(tmp_path, monkeypatch):
+    Session = _knowledge_db(tmp_path)
+    prompts = []
+
+    async def fake_llm(prompt, num_predict=None):
+        prompts.append(prompt)
+        return f"answer {len(prompts)}"
+
+    monkeypatch.setattr(chat_module, "call_llm", fake_llm)
+
+    with Session() as s:
+        first = asyncio.run(chat_module.chat(s, "How many sets for hypertrophy?"))
+        # Same keywords in another phrasing, same sources: no LLM call
+        second = asyncio.run(chat_module.chat(s, "hypertrophy: how many sets"))
+        assert (first.cached, second.cached) == (False, True)
+        assert second.answer == first.answer == "answer 1"
+        assert len(prompts) == 1
+
+        # A knowledge write moves the version and retires the stored answer
+        s.add(KnowledgeItem(title="Rest periods", content="Rest two minutes between sets."))
+        s.commit()
+        third = asyncio.run(chat_module.chat(s, "How many sets for hypertrophy?"))
+        assert not third.cached and third.answer == "answer 2"
+
+    stats = TestClient(app).get("/api/chat/cache").json()
+    assert stats["hits"] >= 1 and stats["size"] >= 1
+
+
+def test_similar_query_embeddings_share_an_answer():
+    cache = AnswerCache(maxsize=8, ttl_seconds=60, similarity=0.95)
+    group = ("sqlite://", 3, (1, 2), "llama3.2:3b")
+    response = ChatResponse(answer="Ten to twenty sets.", sources=[], model="llama3.2:3b")
+    near = np.array([0.6, 0.8], dtype=np.float32)
+    cache.set(group, ("hypertrophy", "sets"), response, near)
+
+    close = np.array([0.64, 0.77], dtype=np.float32)
+    close /= np.linalg.norm(close)
+    far = np.array([0.8, -0.6], dtype=np.float32)
+    assert cache.get(group, ("growth", "muscle", "volume"), close) is response
+    assert cache.get(group, ("growth", "muscle", "volume"), far) is None
+    # Different sources (or knowledge version) never match, however similar the query
+    assert cache.get(("sqlite://", 4, (1, 2), "llama3.2:3b"), ("growth",), near) is None
+
+
+def test_query_is_embedded_once_per_chat(tmp_path, monkeypatch):
+    Session = _knowledge_db(tmp_path)
+    embedded = []
+
+    def fake_embed(texts):
+        embedded.extend(texts)
+        return [np.array([1.0, 0.0], dtype=np.float32) for _ in texts]
+
+    async def fake_llm(prompt, num_predict=None):
+        return "Ten to twenty sets."
+
+    monkeypatch.setattr(chat_module, "embed_texts", fake_embed)
+    monkeypatch.setattr(chat_module, "call_llm", fake_llm)
+    monkeypatch.setattr(settings, "embedding_enabled", True)
+    monkeypatch.setattr(
+        chat_module, "_answer_cache", AnswerCache(maxsize=8, ttl_seconds=60, similarity=0.95)
+    )
+    chat_module._retrieval_cache.clear()
+
+    with Session() as s:
+        response = asyncio.run(chat_module.chat(s, "How many sets for hypertrophy?"))
+    # One embedding serves both the answer cache match and vector retrieval
+    assert response.answer == "Ten to twenty sets."
+    assert embedded == ["How many sets for hypertrophy?"]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.core.config import settings
+from backend.app.main import app
+from backend.app.schemas.workout import RecommendationRequest
+from backend.app.services.catalogue import RecommenderRegistry, recommender_registry
+
+
+def _template(template_id: str) -> dict:
+    return {
+        "id": template_id,
+        "name": template_id,
+        "description": "",
+        "goal": "strength",
+        "experience_level": "beginner",
+        "weekly_frequency_options": [3],
+        "equipment": [],
+        "training_split": [],
+        "coaching_notes": [],
+    }
+
+
+def _write(path: Path, ids: list[str], mtime: int) -> None:
+    path.write_text(json.dumps({"templates": [_template(i) for i in ids]}), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_reload_if_changed_swaps_instance_only_on_change(tmp_path: Path):
+    source = tmp_path / "workouts.json"
+    _write(source, ["a"], mtime=1_000)
+    registry = RecommenderRegistry(data_path=source)
+    first = registry.get()
+
+    assert registry.reload_if_changed() is None
+    assert registry.get() is first
+
+    _write(source, ["a", "b"], mtime=2_000)
+    result = registry.reload_if_changed()
+    assert result is not None
+    assert result.template_count == 2
+    assert result.duration_ms >= 0
+    assert registry.get() is not first
+
+    # Instances handed out before the swap keep serving their own catalogue.
+    req = RecommendationRequest(goal="strength", experience_level="beginner", available_days=3)
+    assert [t.id for t in first.recommend(req).items] == ["a"]
+    assert [t.id for t in registry.get().recommend(req).items] == ["a", "b"]
+
+
+def test_failed_reload_keeps_current_instance(tmp_path: Path):
+    source = tmp_path / "workouts.json"
+    _write(source, ["a"], mtime=1_000)
+    registry = RecommenderRegistry(data_path=source)
+    current = registry.get()
+
+    source.write_text("{not json", encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        registry.reload()
+    assert registry.get() is current
+
+
+def test_reload_endpoint_reports_duration(monkeypatch):
+    monkeypatch.setattr(settings, "catalogue_reload_token", "s3cret")
+    client = TestClient(app)
+    res = client.post("/api/workouts/catalogue/reload", headers={"X-Reload-Token": "s3cret"})
+    assert res.status_code == 200
+    data = res.json()
+    assert data["template_count"] > 0
+    assert data["duration_ms"] >= 0
+
+
+def test_reload_endpoint_requires_configured_token(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "catalogue_reload_token", None)
+    assert client.post("/api/workouts/catalogue/reload").status_code == 404
+
+    monkeypatch.setattr(settings, "catalogue_reload_token", "s3cret")
+    assert client.post("/api/workouts/catalogue/reload").status_code == 403
+    res = client.post("/api/workouts/catalogue/reload", headers={"X-Reload-Token": "wrong"})
+    assert res.status_code == 403
+
+
+def test_failed_reload_endpoint_hides_the_error(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(settings, "catalogue_reload_token", "s3cret")
+    broken = tmp_path / "workouts.json"
+    broken.write_text("{not json", encoding="utf-8")
+    monkeypatch.setattr(recommender_registry, "data_path", broken)
+
+    res = TestClient(app).post(
+        "/api/workouts/catalogue/reload", headers={"X-Reload-Token": "s3cret"}
+    )
+    assert res.status_code == 503
+    assert "not json" not in res.text and "Expecting" not in res.text
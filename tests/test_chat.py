@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import threading
+import time
+
+import httpx
 from fastapi.testclient import TestClient
 
+from backend.app.core.config import settings
 from backend.app.main import app
+from backend.app.services import chat as chat_module
 
 
 def test_chat_endpoint_fallback_returns_answer_and_sources():
@@ -12,4 +20,98 @@ def test_chat_endpoint_fallback_returns_answer_and_sources():
     assert res.status_code == 200
     data = res.json()
     assert isinstance(data["answer"], str) and len(data["answer"]) > 0
-    assert isinstance(data["sources"], list)
\ No newline at end of file
+    assert isinstance(data["sources"], list)
+
+
+def test_retrieval_runs_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def slow_retrieve(session, message, top_k):
+        threads.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return chat_module._ChatContext([], (), None, None)
+
+    monkeypatch.setattr(chat_module, "_retrieve_for_answer", slow_retrieve)
+    monkeypatch.setattr(settings, "llm_enabled", False)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        # Through the endpoint, in this event loop, so the ticker shares it with the request
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            res = await client.post("/api/chat/", json={"message": "slow query"})
+        task.cancel()
+        return res, ticks
+
+    res, ticks = asyncio.run(scenario())
+    assert res.status_code == 200
+    # The loop kept scheduling other work while retrieval slept in the pool
+    assert ticks >= 5
+    assert threads[0].startswith("retrieval")
+
+
+def _stream_events(client, payload):
+    res = client.post("/api/chat/", params={"stream": True}, json=payload)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in res.text.splitlines() if line]
+
+
+def test_chat_stream_sends_sources_then_tokens_then_timings(monkeypatch):
+    async def fake_stream(prompt, num_predict=None):
+        for token in ("Train ", "each muscle ", "twice a week."):
+            await asyncio.sleep(0.01)
+            yield token
+
+    monkeypatch.setattr(chat_module, "stream_llm", fake_stream)
+    chat_module._answer_cache.clear()
+    payload = {"message": "How often should I train each muscle for hypertrophy?", "top_k": 2}
+    events = _stream_events(TestClient(app), payload)
+
+    assert events[0]["type"] == "sources"
+    assert [e["text"] for e in events[1:-1]] == ["Train ", "each muscle ", "twice a week."]
+    done = events[-1]
+    assert done["type"] == "done" and done["cached"] is False
+    assert 0 < done["ttft_ms"] <= done["total_ms"]
+
+    # The streamed answer is cached like a regular one
+    res = TestClient(app).post("/api/chat/", json=payload)
+    assert res.json()["answer"] == "Train each muscle twice a week."
+
+
+def test_chat_stream_looks_up_the_answer_cache_once(monkeypatch):
+    async def fake_stream(prompt, num_predict=None):
+        yield "Rest two minutes."
+
+    monkeypatch.setattr(chat_module, "stream_llm", fake_stream)
+    # The queue check also needs the cached answer; it must not be looked up (and counted) twice
+    monkeypatch.setattr(settings, "llm_queue_overflow", "reject")
+    chat_module._answer_cache.clear()
+    client = TestClient(app)
+    payload = {"message": "How long to rest between heavy sets?", "top_k": 2}
+
+    before = client.get("/api/chat/cache").json()
+    _stream_events(client, payload)
+    # A saturated queue is when the up-front check consults the cache
+    monkeypatch.setattr(chat_module._llm_queue, "would_refuse", lambda rank: True)
+    events = _stream_events(client, payload)
+    after = client.get("/api/chat/cache").json()
+
+    assert events[-1]["cached"] is True
+    assert (after["misses"] - before["misses"], after["hits"] - before["hits"]) == (1, 1)
+
+
+def test_chat_stream_falls_back_without_llm(monkeypatch):
+    monkeypatch.setattr(settings, "llm_enabled", False)
+    events = _stream_events(TestClient(app), {"message": "Beginner strength routine?"})
+    assert [e["type"] for e in events] == ["sources", "token", "done"]
+    assert events[1]["text"]
+    assert "model" not in events[2]  # no LLM answered
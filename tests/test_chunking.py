@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.core.config import settings
+from backend.app.db.models import KnowledgeChunk, KnowledgeItem
+from backend.app.services.chat import retrieve_knowledge
+from backend.app.services.chunking import split_passages
+
+
+def test_split_passages_bounds_length_and_overlaps():
+    text = " ".join(f"word{i:03d}" for i in range(200))
+    passages = split_passages(text, max_chars=100, overlap_chars=20)
+
+    assert all(len(p) <= 100 for p in passages)
+    assert passages[0].startswith("word000") and passages[-1].endswith("word199")
+    for current, following in zip(passages, passages[1:], strict=False):
+        # The next passage starts inside the current one: the seam is covered twice
+        assert following.split()[0] in current.split()
+        assert following.split()[0] != current.split()[0]
+
+    assert split_passages("") == []
+    assert split_passages("x" * 300, max_chars=100) == ["x" * 300]
+
+
+def test_retrieval_returns_matching_passage_of_long_item(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "chunk_chars", 120)
+    monkeypatch.setattr(settings, "chunk_overlap_chars", 30)
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    KnowledgeItem.__table__.create(bind=engine)
+    KnowledgeChunk.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    filler = " ".join(f"Filler line {i} on training." for i in range(30))
+    with Session() as s:
+        s.add(
+            KnowledgeItem(
+                title="Transcript: supplements",
+                content=f"{filler} Creatine monohydrate, 5 g daily, is well studied. {filler}",
+            )
+        )
+        s.commit()
+        assert s.scalar(select(func.count()).select_from(KnowledgeChunk)) > 5
+
+    with Session() as s:
+        [(passage, _)] = retrieve_knowledge(s, "creatine dose", top_k=3)
+        assert passage.title == "Transcript: supplements"
+        assert "Creatine monohydrate" in passage.content
+        assert len(passage.content) <= 120
+
+        # Editing the item re-chunks it in the same flush and the index follows on commit
+        item = s.get(KnowledgeItem, passage.id)
+        item.content = "Caffeine before training improves output."
+        s.commit()
+        assert retrieve_knowledge(s, "creatine dose") == []
+        assert [p.content for p, _ in retrieve_knowledge(s, "caffeine")] == [item.content]
+
+        s.delete(item)
+        s.commit()
+        assert s.scalar(select(func.count()).select_from(KnowledgeChunk)) == 0
+
+
+def test_snippet_mode_returns_bounded_window_from_fts(migrated_engine, monkeypatch):
+    Session = sessionmaker(bind=migrated_engine, expire_on_commit=False)
+    filler = " ".join(f"Filler line {i} on training." for i in range(15))
+    with Session() as s:
+        s.add(
+            KnowledgeItem(
+                title="Transcript: supplements",
+                content=f"{filler} Creatine monohydrate, 5 g daily, is well studied. {filler}",
+                source_url="https://example.com/supplements",
+            )
+        )
+        s.commit()
+
+    with Session() as s:
+        [(passage, score)] = retrieve_knowledge(s, "creatine", top_k=3)
+        assert "Creatine monohydrate" in passage.content and score < 0  # FTS5 bm25
+
+        monkeypatch.setattr(settings, "retrieval_mode", "snippet")
+        monkeypatch.setattr(settings, "snippet_tokens", 6)
+        [(snippet, _)] = retrieve_knowledge(s, "creatine supplement", top_k=3)
+        assert "Creatine" in snippet.content
+        assert len(snippet.content.replace("...", "").split()) <= 6
+        assert snippet.source_url == "https://example.com/supplements"
+
+
+def test_upgrade_chunks_items_stored_before_passages(alembic_upgrade):
+    engine = create_engine(alembic_upgrade("0004_knowledge_embeddings"))
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO knowledge_items (title, content, tags) "
+                "VALUES ('Deload weeks', 'Deload every fourth to sixth week of hard training.', '')"
+            )
+        )
+    alembic_upgrade("head")
+
+    with sessionmaker(bind=engine)() as s:
+        results = retrieve_knowledge(s, "how often to deload", top_k=1)
+        assert [item.title for item, _ in results] == ["Deload weeks"]
+    engine.dispose()
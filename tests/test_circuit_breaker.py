@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.services import chat as chat_module
+from backend.app.services.circuit_breaker import CircuitBreaker, CircuitOpen
+
+
+async def _fail():
+    raise httpx.ConnectError("connection refused")
+
+
+async def _through(breaker, work):
+    async with breaker.guard():
+        return await work()
+
+
+def test_breaker_opens_probes_in_background_and_closes():
+    healthy = False
+    probes = 0
+
+    async def probe():
+        nonlocal probes
+        probes += 1
+        if not healthy:
+            raise httpx.ConnectError("still down")
+
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.02, probe=probe)
+
+    async def ok():
+        return "ok"
+
+    async def scenario():
+        nonlocal healthy
+        for _ in range(3):
+            with pytest.raises(httpx.ConnectError):
+                await _through(breaker, _fail)
+        assert breaker.state == "open"
+
+        started = time.perf_counter()
+        with pytest.raises(CircuitOpen):
+            await _through(breaker, ok)
+        assert time.perf_counter() - started < 0.01
+
+        await asyncio.sleep(0.05)
+        assert breaker.state == "open" and probes >= 1
+        healthy = True
+        await asyncio.sleep(0.05)
+        assert breaker.state == "half_open"
+        assert await _through(breaker, ok) == "ok"
+
+    asyncio.run(scenario())
+    stats = breaker.stats()
+    assert stats.state == "closed"
+    assert stats.transitions == {"opened": 1, "half_opened": 1, "closed": 1}
+    assert stats.short_circuited == 1
+
+
+def test_half_open_admits_one_trial_and_reopens_on_failure():
+    clock = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: clock[0])
+
+    async def scenario():
+        with pytest.raises(httpx.ConnectError):
+            await _through(breaker, _fail)
+        clock[0] = 10.0
+        release = asyncio.Event()
+
+        async def slow_failure():
+            await release.wait()
+            raise httpx.ReadTimeout("timed out")
+
+        trial = asyncio.create_task(_through(breaker, slow_failure))
+        await asyncio.sleep(0)
+        assert breaker.state == "half_open"
+        # Only the trial reaches the backend
+        with pytest.raises(CircuitOpen):
+            await _through(breaker, _fail)
+        release.set()
+        with pytest.raises(httpx.ReadTimeout):
+            await trial
+
+    asyncio.run(scenario())
+    assert breaker.state == "open"
+    assert breaker.transitions["opened"] == 2
+
+
+def test_open_circuit_skips_the_llm_in_chat(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, failures=(httpx.HTTPError,))
+    monkeypatch.setattr(chat_module, "_llm_breaker", breaker)
+    calls = []
+
+    async def down(prompt, num_predict=None):
+        calls.append(prompt)
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(chat_module, "call_llm", down)
+    client = TestClient(app)
+    for question in ("squat depth cues", "bench arch safety", "deadlift grip options"):
+        res = client.post("/api/chat/", json={"message": question})
+        assert res.status_code == 200 and res.json()["model"] is None
+
+    assert len(calls) == 2
+    state = client.get("/api/chat/breaker").json()
+    assert state["state"] == "open"
+    assert state["short_circuited"] == 1
+    assert "ConnectError" in state["last_error"]
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.db.models import WorkoutTemplate as WorkoutTemplateRecord
+from backend.app.schemas.workout import RecommendationRequest, WorkoutTemplate
+from backend.app.services.catalogue import RecommenderRegistry
+from backend.app.services.db_recommendation import DatabaseWorkoutRecommender, _features
+from backend.app.services.recommendation import WorkoutRecommender
+
+
+def _seeded_session_factory(tmp_path: Path, templates: list[dict]):
+    engine = create_engine(f"sqlite:///{tmp_path / 'templates.db'}")
+    WorkoutTemplateRecord.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as session:
+        for tpl in templates:
+            session.add(
+                WorkoutTemplateRecord(
+                    id=tpl["id"],
+                    name=tpl["name"],
+                    goal=tpl["goal"],
+                    experience_level=tpl["experience_level"],
+                    payload=json.dumps(tpl),
+                )
+            )
+        session.commit()
+    return Session
+
+
+def test_database_recommender_matches_in_memory(tmp_path: Path, synthetic_catalogue):
+    catalogue = synthetic_catalogue(250, seed=13)
+    data_path = tmp_path / "workouts.json"
+    data_path.write_text(json.dumps(catalogue), encoding="utf-8")
+    in_memory = WorkoutRecommender(data_path=data_path)
+    from_db = DatabaseWorkoutRecommender(
+        session_factory=_seeded_session_factory(tmp_path, catalogue["templates"]),
+        batch_size=32,
+    )
+
+    assert from_db.template_count == 250
+    rng = random.Random(17)
+    for _ in range(60):
+        req = RecommendationRequest(
+            goal=rng.choice(["strength", "hypertrophy", "fat loss", "mobility"]),
+            experience_level=rng.choice(["beginner", "intermediate", "advanced"]),
+            available_days=rng.randint(2, 7),
+            equipment=rng.sample(["barbell", "dumbbells", "cables", "bands"], rng.randint(0, 3)),
+        )
+        assert from_db.recommend(req) == in_memory.recommend(req)
+
+
+def test_database_recommender_decodes_only_returned_payloads(
+    tmp_path: Path, synthetic_catalogue, monkeypatch
+):
+    catalogue = synthetic_catalogue(120, seed=5)
+    from_db = DatabaseWorkoutRecommender(
+        session_factory=_seeded_session_factory(tmp_path, catalogue["templates"])
+    )
+    decoded = []
+    original = WorkoutTemplate.model_validate_json
+
+    def _count(payload, *args, **kwargs):
+        decoded.append(payload)
+        return original(payload, *args, **kwargs)
+
+    monkeypatch.setattr(WorkoutTemplate, "model_validate_json", _count)
+    # Nothing fits exactly, so every row is ranked by the fallback
+    response = from_db.recommend(
+        RecommendationRequest(goal="powerlifting", experience_level="advanced", available_days=7)
+    )
+    assert response.rationale.startswith("No exact template fit")
+    assert len(response.items) == len(decoded) == 3
+
+
+def test_registry_reloads_database_catalogue_when_the_table_changes(
+    tmp_path: Path, synthetic_catalogue
+):
+    catalogue = synthetic_catalogue(20, seed=3)
+    Session = _seeded_session_factory(tmp_path, catalogue["templates"])
+    registry = RecommenderRegistry(source="database", session_factory=Session)
+    first = registry.get()
+    assert registry.reload_if_changed() is None
+
+    extra = {**catalogue["templates"][0], "id": "extra"}
+    with Session() as session:
+        session.add(
+            WorkoutTemplateRecord(
+                id="extra",
+                name=extra["name"],
+                goal=extra["goal"],
+                experience_level=extra["experience_level"],
+                payload=json.dumps(extra),
+            )
+        )
+        session.commit()
+
+    result = registry.reload_if_changed()
+    assert result is not None and result.template_count == 21
+    # The new instance starts with an empty response cache
+    assert registry.get() is not first
+
+
+def _compiled_features(dialect) -> str:
+    bind = SimpleNamespace(dialect=dialect)
+    session = SimpleNamespace(get_bind=lambda: bind)
+    return str(select(*_features(session)).compile(dialect=dialect))
+
+
+def test_ranking_features_extract_json_per_dialect():
+    # Postgres cannot index into TEXT: the payload is parsed as JSONB first
+    assert "(CAST(workout_templates.payload AS JSONB))[" in _compiled_features(
+        postgresql.dialect()
+    )
+    assert "JSON_EXTRACT(workout_templates.payload" in _compiled_features(sqlite.dialect())
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.core.config import settings
+from backend.app.db.session import Base
+from backend.app.main import app
+from backend.app.services import chat as chat_module
+from backend.app.services.admission import AdmissionQueue
+from backend.app.services.deadline import GenerationEstimate
+
+
+def _stages(data):
+    return [(stage["name"], stage["outcome"]) for stage in data["stages"]]
+
+
+def _fake_llm(monkeypatch, seconds=0.0):
+    calls = []
+
+    async def fake_llm(prompt, num_predict=None):
+        calls.append(num_predict)
+        await asyncio.sleep(seconds)
+        return "Three to five sets."
+
+    monkeypatch.setattr(chat_module, "call_llm", fake_llm)
+    monkeypatch.setattr(chat_module, "_answer_cache", chat_module.AnswerCache(0, 60))
+    return calls
+
+
+def test_unmeetable_deadline_answers_from_retrieval_without_calling_llm(monkeypatch):
+    calls = _fake_llm(monkeypatch)
+    # Until real timings arrive the estimate is pessimistic: a 300 ms answer cannot fit
+    monkeypatch.setattr(chat_module, "_generation_estimate", GenerationEstimate())
+    payload = {"message": "How many sets for strength?", "deadline_ms": 300}
+    data = TestClient(app).post("/api/chat/", json=payload).json()
+
+    assert calls == []
+    assert data["model"] is None
+    assert _stages(data)[0] == ("retrieval", "ok")
+    assert _stages(data)[-2:] == [("generation", "skipped"), ("fallback", "ok")]
+
+
+def test_answer_length_is_capped_to_the_time_left(monkeypatch):
+    calls = _fake_llm(monkeypatch)
+    # 20 ms overhead, 10 ms per token: about 70 tokens fit in 800 ms
+    monkeypatch.setattr(chat_module, "_generation_estimate", GenerationEstimate(0.02, 0.01))
+    client = TestClient(app)
+    data = client.post(
+        "/api/chat/", json={"message": "How many sets for strength?", "deadline_ms": 800}
+    ).json()
+
+    assert data["answer"] == "Three to five sets."
+    assert settings.deadline_min_answer_tokens <= calls[0] < 80
+    assert _stages(data)[-1] == ("generation", "ok")
+    assert all(stage["duration_ms"] >= 0 for stage in data["stages"])
+
+    # Without a deadline the configured answer length applies
+    client.post("/api/chat/", json={"message": "How many sets for strength?"})
+    assert calls[1] is None
+
+
+def test_llm_overrunning_the_deadline_falls_back(monkeypatch):
+    _fake_llm(monkeypatch, seconds=1.0)
+    monkeypatch.setattr(chat_module, "_generation_estimate", GenerationEstimate(0.01, 0.001))
+    started = time.perf_counter()
+    data = TestClient(app).post(
+        "/api/chat/", json={"message": "How long should I rest?", "deadline_ms": 250}
+    ).json()
+
+    assert time.perf_counter() - started < 0.9
+    assert _stages(data)[-2:] == [("generation", "timeout"), ("fallback", "ok")]
+
+
+def test_estimate_learns_from_ollama_timings():
+    estimate = GenerationEstimate(overhead_seconds=1.0, seconds_per_token=0.05)
+    for _ in range(30):
+        # 100 ms prompt/load overhead, 100 tokens decoded in 1 s
+        estimate.observe({"total_duration": 1.1e9, "eval_duration": 1e9, "eval_count": 100})
+    assert abs(estimate.overhead_seconds - 0.1) < 0.01
+    assert abs(estimate.seconds_per_token - 0.01) < 0.001
+    assert 60 <= estimate.max_tokens(0.8) <= 62
+
+
+def test_deadline_cancels_the_abandoned_generation(tmp_path, monkeypatch):
+    monkeypatch.setattr(chat_module, "_answer_cache", chat_module.AnswerCache(0, 60))
+    monkeypatch.setattr(chat_module, "_generation_estimate", GenerationEstimate(0.01, 0.001))
+    monkeypatch.setattr(chat_module, "_llm_queue", AdmissionQueue(concurrency=1, max_waiting=8))
+    started, cancelled = [], []
+
+    async def slow_llm(prompt, num_predict=None):
+        started.append(prompt)
+        try:
+            await asyncio.sleep(3)
+        except asyncio.CancelledError:
+            cancelled.append(prompt)
+            raise
+        return "too late"
+
+    monkeypatch.setattr(chat_module, "call_llm", slow_llm)
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    async def one(question):
+        with Session() as s:
+            return await chat_module.chat(s, question, deadline_ms=100)
+
+    async def burst():
+        responses = await asyncio.gather(*(one(f"deload question {i}") for i in range(4)))
+        await asyncio.sleep(0.05)  # let the cancellations unwind, well before 3 s
+        # Checked inside the loop: asyncio.run would cancel leftovers on its way out
+        return responses, list(cancelled), chat_module.llm_queue_stats()
+
+    began = time.perf_counter()
+    responses, cancelled_in_time, stats = asyncio.run(burst())
+    assert time.perf_counter() - began < 1.0
+    assert all(r.stages[-2].outcome == "timeout" for r in responses)
+    # Every generation that got a slot was cancelled at its request's deadline
+    assert started and sorted(started) == sorted(cancelled_in_time)
+    assert (stats.active, stats.waiting) == (0, 0)
+
+
+def test_deadline_shortened_answers_are_not_cached(monkeypatch):
+    calls = _fake_llm(monkeypatch)
+    monkeypatch.setattr(chat_module, "_answer_cache", chat_module.AnswerCache(8, 60))
+    monkeypatch.setattr(chat_module, "_generation_estimate", GenerationEstimate(0.02, 0.01))
+    client = TestClient(app)
+    message = "How many sets for a strength block?"
+
+    short = client.post("/api/chat/", json={"message": message, "deadline_ms": 800}).json()
+    assert calls[0] < settings.llm_answer_tokens and short["cached"] is False
+    # Without a deadline the request gets a full-length answer of its own, not the short one
+    full = client.post("/api/chat/", json={"message": message}).json()
+    assert full["cached"] is False and calls[1] is None
+    again = client.post("/api/chat/", json={"message": message}).json()
+    assert again["cached"] is True and len(calls) == 2
+
+
+def test_stream_deadline_bounds_the_wait_for_a_slot(tmp_path, monkeypatch):
+    monkeypatch.setattr(chat_module, "_answer_cache", chat_module.AnswerCache(0, 60))
+    monkeypatch.setattr(chat_module, "_generation_estimate", GenerationEstimate(0.01, 0.001))
+    queue = AdmissionQueue(concurrency=1, max_waiting=8)
+    monkeypatch.setattr(chat_module, "_llm_queue", queue)
+
+    async def fake_stream(prompt, num_predict=None):
+        yield "too late"
+
+    monkeypatch.setattr(chat_module, "stream_llm", fake_stream)
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def occupy():
+            async with queue.slot():
+                await release.wait()
+
+        async def collect():
+            with Session() as s:
+                stream = await chat_module.chat_stream(s, "rest periods", deadline_ms=300)
+                return [event async for event in stream]
+
+        holder = asyncio.create_task(occupy())
+        await asyncio.sleep(0)
+        try:
+            # The slot is held until after the stream ends: only the deadline can end it
+            return await asyncio.wait_for(collect(), 2.0)
+        finally:
+            release.set()
+            await holder
+
+    began = time.perf_counter()
+    events = asyncio.run(scenario())
+    assert time.perf_counter() - began < 1.0
+    done = events[-1]
+    assert [e.type for e in events] == ["sources", "token", "done"]
+    assert events[1].text != "too late" and done.model is None
+    stages = [(stage.name, stage.outcome) for stage in done.stages]
+    assert stages[-2:] == [("generation", "timeout"), ("fallback", "ok")]
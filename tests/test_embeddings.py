@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.core.config import settings
+from backend.app.db.models import (
+    KnowledgeChunk,
+    KnowledgeEmbedding,
+    KnowledgeItem,
+    KnowledgeVersion,
+)
+from backend.app.services import embeddings
+from backend.app.services.chat import retrieve_knowledge
+from backend.app.services.embeddings import VectorIndex, embed_missing
+from backend.app.services.knowledge_index import reciprocal_rank_fusion
+from backend.app.services.knowledge_version import get_knowledge_version
+
+# Stub embedder: words in the same concept share a dimension
+CONCEPTS = {
+    "hypertrophy": 0,
+    "muscle": 0,
+    "growth": 0,
+    "sleep": 1,
+    "recovery": 1,
+    "rest": 1,
+    "protein": 2,
+    "nutrition": 2,
+}
+
+
+def _stub_embed(texts):
+    vectors = np.full((len(texts), 4), 0.01, dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().replace(".", " ").split():
+            if word in CONCEPTS:
+                vectors[row, CONCEPTS[word]] += 1.0
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]], k=60)
+    assert [doc_id for doc_id, _ in fused] == [1, 3, 2, 4]
+    assert fused[0][1] == 1 / 61 + 1 / 62
+
+
+def test_vector_index_partitioned_search_matches_exact_neighbours():
+    rng = np.random.default_rng(3)
+    centers = rng.standard_normal((40, 32)).astype(np.float32)
+    vectors = centers[rng.integers(0, 40, 6000)] + 0.2 * rng.standard_normal((6000, 32))
+    ids = np.arange(6000) + 1000
+    index = VectorIndex(ids, vectors, quantize=True, probe=8)
+    assert index._centroids is not None
+    assert index.nbytes < vectors.astype(np.float32).nbytes / 3
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    recalls = []
+    for query in vectors[rng.choice(6000, 20)]:
+        exact = set(ids[np.argsort(-(unit @ (query / np.linalg.norm(query))))[:10]])
+        hits = index.search(query, 10)
+        assert [score for _, score in hits] == sorted((s for _, s in hits), reverse=True)
+        recalls.append(len(exact & {doc_id for doc_id, _ in hits}) / 10)
+    assert np.mean(recalls) >= 0.9
+
+
+def test_hybrid_retrieval_finds_semantic_matches(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    for model in (KnowledgeItem, KnowledgeChunk, KnowledgeVersion, KnowledgeEmbedding):
+        model.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(embeddings, "embed_texts", _stub_embed)
+    monkeypatch.setattr("backend.app.services.chat.embed_texts", _stub_embed)
+    monkeypatch.setattr(settings, "embedding_enabled", True)
+
+    with Session() as s:
+        s.add(KnowledgeItem(title="Hypertrophy volume", content="Ten to twenty hard sets."))
+        s.add(KnowledgeItem(title="Sleep", content="Sleep drives recovery."))
+        s.add(KnowledgeItem(title="Protein", content="Protein spread over meals."))
+        s.commit()
+        assert embed_missing(s) == 3
+        assert embed_missing(s) == 0
+
+    with Session() as s:
+        # No keyword overlap with the stored item: only the vector ranking can find it
+        results = retrieve_knowledge(s, "muscle growth", top_k=1)
+        assert [item.title for item, _ in results] == ["Hypertrophy volume"]
+
+        # Agreement between lexical and vector rankings puts the item first
+        results = retrieve_knowledge(s, "rest and sleep", top_k=2)
+        assert results[0][0].title == "Sleep"
+
+    # Query embedding failures degrade to lexical ranking
+    def _unavailable(texts):
+        raise ValueError("no embeddings")
+
+    monkeypatch.setattr("backend.app.services.chat.embed_texts", _unavailable)
+    with Session() as s:
+        assert retrieve_knowledge(s, "tips for muscle growth", top_k=1) == []
+        assert [i.title for i, _ in retrieve_knowledge(s, "protein intake")] == ["Protein"]
+
+
+def test_empty_index_searches_to_nothing(tmp_path):
+    for quantize in (True, False):
+        index = VectorIndex([], np.empty((0, 0), dtype=np.float32), quantize=quantize)
+        assert len(index) == 0
+        assert index.search(np.ones(4, dtype=np.float32), top_k=3) == []
+
+    # Fresh database: no embeddings table at all, then an empty one
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    Session = sessionmaker(bind=engine)
+    with Session() as s:
+        assert embeddings._load_index(s).search(np.ones(4, dtype=np.float32), 3) == []
+    KnowledgeEmbedding.__table__.create(bind=engine)
+    with Session() as s:
+        assert len(embeddings.get_vector_index(s, None)) == 0
+
+
+def test_reingested_items_are_embedded_again(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    for model in (KnowledgeItem, KnowledgeChunk, KnowledgeVersion, KnowledgeEmbedding):
+        model.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    embedded = []
+
+    def _recording_embed(texts):
+        embedded.extend(texts)
+        return _stub_embed(texts)
+
+    monkeypatch.setattr(embeddings, "embed_texts", _recording_embed)
+
+    with Session() as s:
+        s.add(KnowledgeItem(title="Sleep", content="Sleep drives recovery."))
+        s.add(KnowledgeItem(title="Protein", content="Protein spread over meals."))
+        s.commit()
+        assert embed_missing(s) == 2
+
+    with Session() as s:
+        # Re-ingest rewrites the content in place; a tag-only change keeps the vector
+        sleep = s.query(KnowledgeItem).filter_by(title="Sleep").one()
+        sleep.content = "Hypertrophy needs muscle growth stimulus."
+        s.query(KnowledgeItem).filter_by(title="Protein").one().tags = "nutrition"
+        s.commit()
+        embedded.clear()
+        assert embed_missing(s) == 1
+        assert embedded == ["Sleep\nHypertrophy needs muscle growth stimulus."]
+        vector = np.frombuffer(s.get(KnowledgeEmbedding, sleep.id).vector, dtype="<f4")
+        assert int(np.argmax(vector)) == CONCEPTS["hypertrophy"]
+
+
+def test_vector_index_rebuilds_off_the_request_path(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    for model in (KnowledgeItem, KnowledgeChunk, KnowledgeVersion, KnowledgeEmbedding):
+        model.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(embeddings, "embed_texts", _stub_embed)
+    key = str(engine.url)
+
+    with Session() as s:
+        s.add(KnowledgeItem(title="Sleep", content="Sleep drives recovery."))
+        s.commit()
+        embed_missing(s)
+        first = embeddings.get_vector_index(s, get_knowledge_version(s))
+        assert len(first) == 1
+
+        s.add(KnowledgeItem(title="Protein", content="Protein spread over meals."))
+        s.commit()
+        embed_missing(s)
+        version = get_knowledge_version(s)
+        # The caller keeps searching the previous index while it is rebuilt
+        assert embeddings.get_vector_index(s, version) is first
+        embeddings._rebuilds[key].join(timeout=5)
+        rebuilt = embeddings.get_vector_index(s, version)
+        assert rebuilt is not first and len(rebuilt) == 2
+        assert embeddings.get_vector_index(s, version) is rebuilt
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.db.models import KnowledgeChunk, KnowledgeItem, KnowledgeVersion
+from backend.app.services.chat import retrieve_knowledge
+from backend.app.services.knowledge_index import BM25Index
+
+
+def test_bm25_ranks_by_term_rarity_and_frequency():
+    index = BM25Index()
+    index.upsert(1, "Squat basics", "Squat depth and bracing for the squat.", "legs")
+    index.upsert(2, "Bench basics", "Bench press setup and leg drive.", "chest")
+    index.upsert(3, "General training", "Training volume, squat once a week.", None)
+
+    hits = index.search(["squat"], top_k=3)
+    assert [doc_id for doc_id, _ in hits] == [1, 3]
+    assert hits[0][1] > hits[1][1] > 0
+
+    index.upsert(2, "Bench basics", "Pause squat variations for bench lifters.", "chest")
+    index.remove(1)
+    assert {doc_id for doc_id, _ in index.search(["squat"], top_k=3)} == {2, 3}
+    assert index.search(["deadlift"], top_k=3) == []
+
+
+def test_retrieval_without_fts_uses_ranked_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    KnowledgeItem.__table__.create(bind=engine)
+    KnowledgeChunk.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    with Session() as s:
+        s.add(KnowledgeItem(title="Protein timing", content="Protein intake spread over meals."))
+        s.add(
+            KnowledgeItem(
+                title="Hypertrophy volume",
+                content="Hypertrophy needs volume; hypertrophy responds to sets near failure.",
+                tags="hypertrophy",
+            )
+        )
+        s.commit()
+
+    with Session() as s:
+        results = retrieve_knowledge(s, "How much volume for hypertrophy?", top_k=3)
+        assert [item.title for item, _ in results] == ["Hypertrophy volume"]
+        assert results[0][1] > 0
+
+        # Committed writes reach the built index without a rebuild
+        s.add(KnowledgeItem(title="Deload weeks", content="Deload when fatigue accumulates."))
+        s.commit()
+        assert [i.title for i, _ in retrieve_knowledge(s, "when to deload")] == ["Deload weeks"]
+
+        # Rolled-back writes do not
+        s.add(KnowledgeItem(title="Cardio", content="Zone two cardio for recovery."))
+        s.flush()
+        s.rollback()
+        assert retrieve_knowledge(s, "cardio recovery") == []
+
+
+def test_retrieval_cache_hits_until_knowledge_changes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    KnowledgeItem.__table__.create(bind=engine)
+    KnowledgeChunk.__table__.create(bind=engine)
+    KnowledgeVersion.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    item_queries = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "knowledge_items" in statement:
+            item_queries.append(statement)
+
+    with Session() as s:
+        s.add(KnowledgeItem(title="Sleep", content="Sleep drives recovery between sessions."))
+        s.commit()
+
+    with Session() as s:
+        first = retrieve_knowledge(s, "sleep recovery", top_k=3)
+        queries_after_miss = len(item_queries)
+        # Same keywords in another order and phrasing: served from the cache
+        again = retrieve_knowledge(s, "Recovery and sleep?", top_k=3)
+        assert [i.title for i, _ in again] == [i.title for i, _ in first] == ["Sleep"]
+        assert len(item_queries) == queries_after_miss
+
+        # A knowledge write bumps the version, so the next lookup goes to the database
+        s.add(KnowledgeItem(title="Naps", content="Short naps support recovery."))
+        s.commit()
+        titles = {i.title for i, _ in retrieve_knowledge(s, "sleep recovery", top_k=3)}
+        assert titles == {"Sleep", "Naps"}
+        assert len(item_queries) > queries_after_miss
+
+
+def test_ranked_index_rebuilds_for_writes_from_other_processes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    KnowledgeItem.__table__.create(bind=engine)
+    KnowledgeChunk.__table__.create(bind=engine)
+    KnowledgeVersion.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    with Session() as s:
+        s.add(KnowledgeItem(title="Sleep", content="Sleep drives recovery between sessions."))
+        s.commit()
+        assert [i.title for i, _ in retrieve_knowledge(s, "sleep recovery")] == ["Sleep"]
+
+    # Another worker or an ingest script writes with plain SQL: no ORM events fire here
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO knowledge_items (id, title, content) "
+                "VALUES (100, 'Deload weeks', 'Deload when fatigue accumulates.')"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO knowledge_chunks (item_id, position, content) "
+                "VALUES (100, 0, 'Deload when fatigue accumulates.')"
+            )
+        )
+        conn.execute(text("UPDATE knowledge_version SET version = version + 1"))
+
+    with Session() as s:
+        assert [i.title for i, _ in retrieve_knowledge(s, "when to deload")] == ["Deload weeks"]
+
+
+def test_ranked_index_follows_in_process_commits_without_rebuilding(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    KnowledgeItem.__table__.create(bind=engine)
+    KnowledgeChunk.__table__.create(bind=engine)
+    KnowledgeVersion.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    rebuilds = []
+    original = BM25Index.rebuild
+
+    def counting_rebuild(self, *args, **kwargs):
+        rebuilds.append(kwargs.get("version"))
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(BM25Index, "rebuild", counting_rebuild)
+
+    with Session() as s:
+        s.add(KnowledgeItem(title="Sleep", content="Sleep drives recovery between sessions."))
+        s.commit()
+        assert [i.title for i, _ in retrieve_knowledge(s, "sleep recovery")] == ["Sleep"]
+        assert len(rebuilds) == 1
+
+        s.add(KnowledgeItem(title="Deload weeks", content="Deload when fatigue accumulates."))
+        s.flush()
+        s.add(KnowledgeItem(title="Tempo", content="Slow tempo eccentrics for control."))
+        s.commit()
+        assert [i.title for i, _ in retrieve_knowledge(s, "when to deload")] == ["Deload weeks"]
+        assert [i.title for i, _ in retrieve_knowledge(s, "tempo eccentrics")] == ["Tempo"]
+        assert len(rebuilds) == 1
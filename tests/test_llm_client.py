@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import asyncio
+
+from backend.app.core.config import settings
+from backend.app.services import llm_client
+
+
+def test_async_client_is_shared_per_event_loop(monkeypatch):
+    monkeypatch.setattr(settings, "llm_connect_timeout_seconds", 1.5)
+
+    async def twice():
+        return llm_client.get_llm_client(), llm_client.get_llm_client()
+
+    first, again = asyncio.run(twice())
+    assert first is again
+    assert first.timeout.connect == 1.5
+
+    # A later asyncio.run cannot reuse connections bound to the finished loop
+    other, _ = asyncio.run(twice())
+    assert other is not first
+
+    async def close():
+        client = llm_client.get_llm_client()
+        await llm_client.close_llm_clients()
+        return client
+
+    closed = asyncio.run(close())
+    assert closed.is_closed
+
+
+def test_sync_client_is_shared_and_reopened_after_close():
+    client = llm_client.get_llm_sync_client()
+    assert llm_client.get_llm_sync_client() is client
+    asyncio.run(llm_client.close_llm_clients())
+    assert client.is_closed
+    assert llm_client.get_llm_sync_client() is not client
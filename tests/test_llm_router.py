@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import time
+from collections import Counter
+
+import httpx
+from fastapi.testclient import TestClient
+
+from backend.app.core.config import settings
+from backend.app.main import app
+from backend.app.services import chat as chat_module
+from backend.app.services import llm_router as router_module
+from backend.app.services.llm_router import LLMRouter
+
+GENERATION_SECONDS = 0.05
+
+
+def _stub_servers(down=()):
+    """Mock Ollama servers that each run one generation at a time, like a single GPU."""
+    locks = {}
+    served = Counter()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if host in down:
+            raise httpx.ConnectError("connection refused", request=request)
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": []})
+        async with locks.setdefault(host, asyncio.Lock()):
+            await asyncio.sleep(GENERATION_SECONDS)
+        served[host] += 1
+        return httpx.Response(200, json={"response": f"from {host}"})
+
+    return httpx.MockTransport(handler), served
+
+
+def _run_burst(monkeypatch, backends, requests=8):
+    transport, served = _stub_servers()
+    monkeypatch.setattr(chat_module, "llm_router", LLMRouter(backends))
+    monkeypatch.setattr(settings, "llm_enabled", True)
+
+    async def burst():
+        # Collect earlier tests' garbage first: a full collection mid-burst skews the timing
+        gc.collect()
+        async with httpx.AsyncClient(transport=transport) as client:
+            monkeypatch.setattr(chat_module, "get_llm_client", lambda: client)
+            started = time.perf_counter()
+            await asyncio.gather(*(chat_module.call_llm(f"q{i}") for i in range(requests)))
+            return time.perf_counter() - started
+
+    return asyncio.run(burst()), served
+
+
+def test_throughput_scales_with_backends(monkeypatch):
+    urls = [f"http://ollama-{i}:11434/api/generate" for i in range(4)]
+    one, _ = _run_burst(monkeypatch, urls[:1])
+    two, _ = _run_burst(monkeypatch, urls[:2])
+    four, served = _run_burst(monkeypatch, urls)
+
+    # Eight serialized generations: ~8x, ~4x and ~2x the per-generation time
+    assert one >= 8 * GENERATION_SECONDS
+    assert two < one * 0.75
+    assert four < two * 0.75
+    # Least outstanding requests spreads the burst evenly
+    assert sorted(served.values()) == [2, 2, 2, 2]
+
+
+def test_failed_backend_leaves_rotation_until_healthy(monkeypatch):
+    router = LLMRouter(["http://up:11434/api/generate", "http://down:11434/api/generate"])
+    transport, served = _stub_servers(down={"down"})
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=transport) as client:
+            monkeypatch.setattr(router_module, "get_llm_client", lambda: client)
+            assert await router.check_health() == 1
+            for _ in range(4):
+                async with router.backend() as url:
+                    resp = await client.post(url, json={})
+                    resp.raise_for_status()
+
+    asyncio.run(scenario())
+    assert served == {"up": 4}
+    assert [b.healthy for b in router.backends] == [True, False]
+
+    backends = TestClient(app).get("/api/chat/backends").json()
+    assert backends and {"url", "healthy", "in_flight", "requests"} <= set(backends[0])
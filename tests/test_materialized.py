@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import logging
+import random
+from pathlib import Path
+
+from backend.app.core.config import settings
+from backend.app.schemas.workout import RecommendationRequest
+from backend.app.services.catalogue import RecommenderRegistry
+from backend.app.services.materialized import MaterializedRecommendations
+from backend.app.services.recommendation import WorkoutRecommender
+
+
+def test_materialized_table_matches_live_ranking(tmp_path: Path, synthetic_catalogue):
+    data_path = tmp_path / "workouts.json"
+    data_path.write_text(json.dumps(synthetic_catalogue(120, seed=21)), encoding="utf-8")
+    table_path = tmp_path / "materialized.json"
+
+    MaterializedRecommendations.build(data_path, workers=2).save(table_path)
+    live = WorkoutRecommender(data_path=data_path)
+    served = WorkoutRecommender(data_path=data_path)
+    table = MaterializedRecommendations.load(table_path, served.source_hash)
+    assert table is not None and len(table) > 0
+    served.use_materialized(table)
+
+    rng = random.Random(4)
+    for _ in range(80):
+        req = RecommendationRequest(
+            goal=rng.choice(["Strength", "hypertrophy", "fat loss", "yoga flow"]),
+            experience_level=rng.choice(["beginner", "novice", "intermediate", "advanced"]),
+            available_days=rng.randint(2, 7),
+            equipment=rng.sample(["barbell", "dumbbells", "cables", "bands", "sled"], 2),
+        )
+        assert served.recommend(req) == live.recommend(req)
+
+
+def test_stale_table_is_ignored(tmp_path: Path, synthetic_catalogue):
+    data_path = tmp_path / "workouts.json"
+    data_path.write_text(json.dumps(synthetic_catalogue(20)), encoding="utf-8")
+    table_path = tmp_path / "materialized.json"
+    MaterializedRecommendations.build(data_path, workers=1).save(table_path)
+
+    data_path.write_text(json.dumps(synthetic_catalogue(21)), encoding="utf-8")
+    changed = WorkoutRecommender(data_path=data_path)
+    assert MaterializedRecommendations.load(table_path, changed.source_hash) is None
+
+
+def test_reload_rebuilds_a_stale_table_in_the_background(
+    tmp_path: Path, synthetic_catalogue, monkeypatch
+):
+    data_path = tmp_path / "workouts.json"
+    data_path.write_text(json.dumps(synthetic_catalogue(20)), encoding="utf-8")
+    table_path = tmp_path / "materialized.json"
+    MaterializedRecommendations.build(data_path, workers=1).save(table_path)
+    monkeypatch.setattr(settings, "materialize_on_reload", True)
+    registry = RecommenderRegistry(data_path=data_path, materialized_path=table_path)
+    assert registry.get()._materialized is not None
+    assert registry.materializer is None
+
+    data_path.write_text(json.dumps(synthetic_catalogue(21)), encoding="utf-8")
+    registry.reload()
+    recommender = registry.get()
+    # Serving live while the rebuild runs, then from the fresh table
+    registry.materializer.join(timeout=60)
+    assert recommender._materialized is not None
+    assert recommender._materialized.source_hash == recommender.source_hash
+    assert MaterializedRecommendations.load(table_path, recommender.source_hash) is not None
+
+
+def test_stale_table_on_reload_is_reported(tmp_path: Path, synthetic_catalogue, caplog):
+    data_path = tmp_path / "workouts.json"
+    data_path.write_text(json.dumps(synthetic_catalogue(5)), encoding="utf-8")
+    registry = RecommenderRegistry(
+        data_path=data_path, materialized_path=tmp_path / "missing.json"
+    )
+    with caplog.at_level(logging.WARNING, logger="backend.app.services.catalogue"):
+        registry.reload()
+    assert "No current materialized table" in caplog.text
+    assert registry.materializer is None
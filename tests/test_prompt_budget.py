@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+
+from backend.app.core.config import settings
+from backend.app.db.models import KnowledgeItem
+from backend.app.services import chat as chat_module
+from backend.app.services.llm_router import LLMRouter
+from backend.app.services.prompt_budget import approx_tokens, pack_passages, truncate_tokens
+
+TEXT = "Progressive overload means adding load, reps, or sets over time. " * 20
+
+
+def test_truncation_fits_the_budget_at_a_word_boundary():
+    cut = truncate_tokens(TEXT, 25)
+    assert approx_tokens(cut) <= 25
+    assert cut.endswith("...") and TEXT.startswith(cut[:-3])
+    assert TEXT[len(cut) - 3] in " ,."  # no half word before the ellipsis
+    assert truncate_tokens("short text", 25) == "short text"
+
+
+def test_packing_keeps_best_passages_within_budget():
+    passages = [(f"Note {i}", TEXT) for i in range(1, 5)]
+    whole = approx_tokens("[1] Title: Note 1\n" + TEXT.strip())
+
+    blocks = pack_passages(passages, budget=whole * 2 + 50)
+    assert len(blocks) == 3
+    assert blocks[0].startswith("[1] Title: Note 1") and blocks[2].endswith("...")
+    assert sum(approx_tokens(b) for b in blocks) <= whole * 2 + 50
+    # Too little room left for a useful cut: the third passage is dropped instead
+    assert len(pack_passages(passages, budget=whole * 2 + 10)) == 2
+
+
+def test_prompt_is_packed_and_persona_sent_as_system(monkeypatch):
+    monkeypatch.setattr(settings, "llm_enabled", True)
+    monkeypatch.setattr(settings, "llm_context_tokens", 1024)
+    monkeypatch.setattr(settings, "llm_answer_tokens", 256)
+    docs = [
+        (KnowledgeItem(title=f"Note {i}", content=TEXT, source_url=f"https://x/{i}"), 1.0)
+        for i in range(6)
+    ]
+    prompt, sources = chat_module.build_prompt("How should I progress?", docs)
+    # Only passages that made it into the prompt are cited
+    assert 0 < len(sources) < len(docs)
+    assert f"[{len(sources)}] Title:" in prompt and f"[{len(sources) + 1}]" not in prompt
+    assert chat_module.PERSONA not in prompt
+    assert approx_tokens(prompt) <= 1024 - 256 - approx_tokens(chat_module.PERSONA)
+
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content))
+        return httpx.Response(
+            200, json={"response": "ok", "prompt_eval_count": 12, "prompt_eval_duration": 3e6}
+        )
+
+    async def call():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            monkeypatch.setattr(chat_module, "get_llm_client", lambda: client)
+            return await chat_module.call_llm(prompt)
+
+    monkeypatch.setattr(chat_module, "llm_router", LLMRouter(["http://ollama/api/generate"]))
+    assert asyncio.run(call()) == "ok"
+    payload = sent[0]
+    assert payload["system"] == chat_module.PERSONA
+    assert payload["keep_alive"] == settings.llm_keep_alive
+    assert payload["options"]["num_ctx"] == 1024
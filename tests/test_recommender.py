@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import json
+import random
 from pathlib import Path
 
 from backend.app.core.config import settings
-from backend.app.schemas.workout import RecommendationRequest
-from backend.app.services.recommendation import WorkoutRecommender
+from backend.app.schemas.workout import RecommendationRequest, WorkoutTemplate
+from backend.app.services.recommendation import EquipmentVocabulary, WorkoutRecommender
 
 
 def test_exact_match_returns_top_template(tmp_path: Path):
@@ -79,3 +80,114 @@ def test_experience_gating_prefers_lower_complexity(tmp_path: Path):
     # Ensure beginner template surfaces ahead of advanced
     ids = [t.id for t in res.items]
     assert ids[0] == "beg_gains"
+
+
+def _reference_scan(templates, req: RecommendationRequest) -> list:
+    # Original linear-scan semantics, kept independent of the recommender internals.
+    ranks = {"beginner": 0, "novice": 0, "intermediate": 1, "advanced": 2}
+    request_rank = ranks.get(req.experience_level.lower(), 1)
+    available = {e.lower() for e in req.equipment}
+    matches = []
+    for t in templates:
+        goal, wanted = t.goal.lower(), req.goal.lower()
+        if not (wanted in goal or goal in wanted):
+            continue
+        if ranks.get(t.experience_level.lower(), 1) > request_rank:
+            continue
+        if req.available_days not in t.weekly_frequency_options:
+            continue
+        needed = {e.lower() for e in t.equipment}
+        if needed and (not available or len(needed & available) / len(needed) < 0.6):
+            continue
+        matches.append(t)
+    return matches
+
+
+def test_index_matches_linear_scan(tmp_path: Path, synthetic_catalogue):
+    data_path = tmp_path / "workouts.json"
+    data_path.write_text(json.dumps(synthetic_catalogue(400)), encoding="utf-8")
+    recommender = WorkoutRecommender(data_path=data_path)
+
+    rng = random.Random(11)
+    for _ in range(200):
+        req = RecommendationRequest(
+            goal=rng.choice(["strength", "hypertrophy", "fat loss", "power", "mobility"]),
+            experience_level=rng.choice(["beginner", "intermediate", "advanced", "unknown"]),
+            available_days=rng.randint(2, 7),
+            equipment=rng.sample(["barbell", "dumbbells", "Cables", "machines", "bands"], 3),
+        )
+        expected = _reference_scan(recommender._templates, req)
+        res = recommender.recommend(req)
+        if expected:
+            assert [t.id for t in res.items] == [t.id for t in expected[:3]]
+            assert f"Identified {len(expected)} template(s)" in res.rationale
+        else:
+            assert "No exact template fit" in res.rationale
+
+
+def test_equipment_masks_ignore_case_and_unknown_items():
+    vocab = EquipmentVocabulary()
+    template_mask = vocab.intern(["Barbell", "dumbbells", "barbell"])
+    assert template_mask.bit_count() == 2
+    request_mask = vocab.mask(["BARBELL", "sled"])
+    assert WorkoutRecommender._equipment_overlap(template_mask, request_mask) == 0.5
+    assert WorkoutRecommender._equipment_overlap(0, request_mask) == 1.0
+    assert WorkoutRecommender._equipment_overlap(template_mask, 0) == 0.0
+
+
+def _reference_rank(templates, req: RecommendationRequest) -> list:
+    ranks = {"beginner": 0, "novice": 0, "intermediate": 1, "advanced": 2}
+    available = {e.lower() for e in req.equipment}
+    scored = []
+    for t in templates:
+        gap = min(abs(f - req.available_days) for f in t.weekly_frequency_options)
+        needed = {e.lower() for e in t.equipment}
+        if not needed:
+            equip = 1.0
+        elif not available:
+            equip = 0.0
+        else:
+            equip = len(needed & available) / len(needed)
+        exp_gap = abs(
+            ranks.get(t.experience_level.lower(), 1)
+            - ranks.get(req.experience_level.lower(), 1)
+        )
+        score = (1.0 - min(gap / 4.0, 1.0)) * 0.5 + equip * 0.35 + (1.0 - exp_gap * 0.4) * 0.15
+        scored.append((t, score))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored
+
+
+def test_vectorized_ranking_matches_stable_sort(tmp_path: Path, synthetic_catalogue):
+    data_path = tmp_path / "workouts.json"
+    data_path.write_text(json.dumps(synthetic_catalogue(300, seed=3)), encoding="utf-8")
+    recommender = WorkoutRecommender(data_path=data_path)
+
+    rng = random.Random(5)
+    for _ in range(100):
+        req = RecommendationRequest(
+            goal="mobility",
+            experience_level=rng.choice(["beginner", "intermediate", "advanced"]),
+            available_days=rng.randint(2, 7),
+            equipment=rng.sample(["barbell", "dumbbells", "cables", "bands"], rng.randint(0, 3)),
+        )
+        request_mask = recommender._vocabulary.mask(req.equipment)
+        expected = _reference_rank(recommender._templates, req)
+        scores = recommender._engine.scores(
+            req.available_days, request_mask, recommender._experience_rank(req.experience_level)
+        )
+        for limit in (1, 3, 10):
+            top = recommender._engine.top_k(scores, limit)
+            assert [recommender._templates[p].id for p in top] == [
+                t.id for t, _ in expected[:limit]
+            ]
+            assert [float(scores[p]) for p in top] == [s for _, s in expected[:limit]]
+
+
+def test_template_record_round_trips_to_model():
+    recommender = WorkoutRecommender(data_path=settings.data_path)
+    raw = json.loads(settings.data_path.read_text(encoding="utf-8"))["templates"][0]
+    record = recommender._templates[0]
+    assert not hasattr(record, "__dict__")
+    assert record.to_model() == WorkoutTemplate.model_validate(raw)
+    assert record.to_model().model_dump() == WorkoutTemplate.model_validate(raw).model_dump()
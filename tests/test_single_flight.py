@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.db.models import KnowledgeItem
+from backend.app.db.session import Base
+from backend.app.main import app
+from backend.app.services import chat as chat_module
+from backend.app.services.single_flight import SingleFlight
+
+
+def test_identical_concurrent_prompts_share_one_llm_call(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as s:
+        s.add(KnowledgeItem(title="Deload weeks", content="Deload every fourth to sixth week."))
+        s.commit()
+    prompts = []
+
+    async def slow_llm(prompt, num_predict=None):
+        prompts.append(prompt)
+        await asyncio.sleep(0.2)
+        return "Every four to six weeks."
+
+    monkeypatch.setattr(chat_module, "call_llm", slow_llm)
+    before = chat_module.coalescing_stats().coalesced
+
+    async def one_request():
+        with Session() as s:
+            return await chat_module.chat(s, "How often should I deload?")
+
+    async def burst():
+        return await asyncio.gather(*(one_request() for _ in range(5)))
+
+    responses = asyncio.run(burst())
+    assert len(prompts) == 1
+    assert {r.answer for r in responses} == {"Every four to six weeks."}
+
+    stats = TestClient(app).get("/api/chat/coalescing").json()
+    assert stats["coalesced"] - before == 4
+    assert stats["in_flight"] == 0
+
+
+def test_failure_reaches_every_waiter_and_is_not_remembered():
+    flight: SingleFlight[str] = SingleFlight()
+    runs = 0
+
+    async def failing():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("ollama down")
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(flight.run("k", failing) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await flight.run("k", failing)
+
+    asyncio.run(scenario())
+    assert runs == 2
+    assert flight.stats().coalesced == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_run():
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.create_task(flight.run("k", work))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.run("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
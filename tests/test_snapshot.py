@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import zlib
+from pathlib import Path
+
+import pytest
+
+from backend.app.schemas.workout import RecommendationRequest, WorkoutTemplate
+from backend.app.services import snapshot
+from backend.app.services.recommendation import WorkoutRecommender
+
+
+def _compile(tmp_path: Path, catalogue: dict) -> tuple[Path, Path]:
+    data_path = tmp_path / "workouts.json"
+    data_path.write_text(json.dumps(catalogue), encoding="utf-8")
+    snapshot_path = tmp_path / "workouts.snapshot"
+    WorkoutRecommender(data_path=data_path).write_snapshot(snapshot_path)
+    return data_path, snapshot_path
+
+
+def test_snapshot_load_skips_validation(tmp_path: Path, synthetic_catalogue, monkeypatch):
+    data_path, snapshot_path = _compile(tmp_path, synthetic_catalogue(50))
+    from_json = WorkoutRecommender(data_path=data_path)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("snapshot load should not revalidate templates")
+
+    monkeypatch.setattr(WorkoutTemplate, "model_validate", _fail)
+    from_snapshot = WorkoutRecommender(data_path=data_path, snapshot_path=snapshot_path)
+
+    assert from_snapshot.template_count == 50
+    req = RecommendationRequest(
+        goal="strength", experience_level="advanced", available_days=4, equipment=["barbell"]
+    )
+    assert from_snapshot.recommend(req) == from_json.recommend(req)
+
+
+def test_stale_snapshot_falls_back_to_json(tmp_path: Path, synthetic_catalogue):
+    data_path, snapshot_path = _compile(tmp_path, synthetic_catalogue(50))
+    data_path.write_text(json.dumps(synthetic_catalogue(10)), encoding="utf-8")
+
+    recommender = WorkoutRecommender(data_path=data_path, snapshot_path=snapshot_path)
+    assert recommender.template_count == 10
+
+
+@pytest.mark.parametrize("contents", [b"", b"WKSNAP-not-a-real-header" * 4])
+def test_corrupt_snapshot_falls_back_to_json(tmp_path: Path, synthetic_catalogue, contents):
+    data_path, snapshot_path = _compile(tmp_path, synthetic_catalogue(5))
+    snapshot_path.write_bytes(contents)
+
+    recommender = WorkoutRecommender(data_path=data_path, snapshot_path=snapshot_path)
+    assert recommender.template_count == 5
+
+
+def test_corrupt_snapshot_body_falls_back_to_json(tmp_path: Path, synthetic_catalogue):
+    data_path, snapshot_path = _compile(tmp_path, synthetic_catalogue(5))
+    contents = bytearray(snapshot_path.read_bytes())
+    # Valid header and length, garbage body: caught by the checksum before marshal sees it
+    contents[-16:] = b"\xff" * 16
+    snapshot_path.write_bytes(bytes(contents))
+
+    recommender = WorkoutRecommender(data_path=data_path, snapshot_path=snapshot_path)
+    assert recommender.template_count == 5
+
+
+def test_undecodable_snapshot_body_falls_back_to_json(tmp_path: Path, synthetic_catalogue):
+    data_path, snapshot_path = _compile(tmp_path, synthetic_catalogue(5))
+    header = snapshot._HEADER.unpack_from(snapshot_path.read_bytes())
+    # Checksum matches, but the bytes are not a marshalled record list
+    body = b"\xff not marshal data"
+    fields = (*header[:4], len(body), zlib.crc32(body))
+    snapshot_path.write_bytes(snapshot._HEADER.pack(*fields) + body)
+
+    recommender = WorkoutRecommender(data_path=data_path, snapshot_path=snapshot_path)
+    assert recommender.template_count == 5
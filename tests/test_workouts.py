@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 
 from backend.app.main import app
@@ -36,3 +38,87 @@ def test_fallback_recommendation_when_equipment_is_limited():
     payload = response.json()
     assert payload["items"], "Fallback should still produce recommendations"
     assert "No exact template fit" in payload["rationale"]
+
+
+BATCH_PAYLOAD = {
+    "requests": [
+        {
+            "goal": "hypertrophy",
+            "experience_level": "intermediate",
+            "available_days": 4,
+            "equipment": ["barbell", "dumbbells", "cables", "machines"],
+        },
+        {"goal": "strength", "experience_level": "beginner", "available_days": 3},
+        {
+            "goal": "hypertrophy",
+            "experience_level": "intermediate",
+            "available_days": 4,
+            "equipment": ["barbell", "dumbbells", "cables", "machines"],
+        },
+    ]
+}
+
+
+def test_batch_recommendations_preserve_order():
+    response = client.post("/api/workouts/recommendations/batch", json=BATCH_PAYLOAD)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 3
+    assert results[0]["items"][0]["goal"] == "hypertrophy"
+    assert "No exact template fit" in results[1]["rationale"]
+    assert results[2] == results[0]
+
+
+def test_batch_recommendations_stream_ndjson():
+    response = client.post(
+        "/api/workouts/recommendations/batch",
+        params={"stream": True},
+        json=BATCH_PAYLOAD,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    batch = client.post("/api/workouts/recommendations/batch", json=BATCH_PAYLOAD).json()
+    assert lines == batch["results"]
+
+
+def test_batch_recommendations_reject_empty_batch():
+    response = client.post("/api/workouts/recommendations/batch", json={"requests": []})
+    assert response.status_code == 422
+
+
+def test_repeated_recommendation_is_served_from_cache():
+    params = {
+        "goal": "Hypertrophy",
+        "experience_level": "Intermediate",
+        "available_days": 5,
+        "equipment": ["machines", "cables", "dumbbells", "barbell"],
+    }
+    before = client.get("/api/workouts/recommendations/cache").json()
+    first = client.get("/api/workouts/recommendations", params=params)
+    params["equipment"] = sorted(item.upper() for item in params["equipment"])
+    second = client.get("/api/workouts/recommendations", params=params)
+    after = client.get("/api/workouts/recommendations/cache").json()
+
+    assert first.status_code == second.status_code == 200
+    assert second.headers["content-type"] == "application/json"
+    assert first.json() == second.json()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
+
+
+def test_cached_recommendation_echoes_the_requested_goal():
+    params = {
+        "experience_level": "intermediate",
+        "available_days": 4,
+        "equipment": ["barbell", "dumbbells", "cables", "machines"],
+    }
+    lower = client.get("/api/workouts/recommendations", params={**params, "goal": "hypertrophy"})
+    upper = client.get("/api/workouts/recommendations", params={**params, "goal": "HYPERTROPHY"})
+
+    assert lower.status_code == upper.status_code == 200
+    assert lower.json()["items"] == upper.json()["items"]
+    assert "'hypertrophy'" in lower.json()["rationale"]
+    assert "'HYPERTROPHY'" in upper.json()["rationale"]